@@ -0,0 +1,199 @@
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+# Vectorized pricing of American options on a binomial lattice.
+# All the contracts are priced in the same backward induction: each step of the lattice is a single array operation over all the contracts and nodes,
+# so the cost of pricing a whole chain is (number of steps) NumPy calls rather than one lattice per contract.
+# Inputs follow the same conventions as BSMKernels (spotPrice, strikePrice, isCall, tau, ir, sigma), plus:
+#  - steps: number of time steps of the lattice
+#  - dividendYield: continuous dividend yield of the underlying
+# Two standard accuracy improvements are applied:
+#  - Binomial Black Scholes: the continuation value on the last step of the lattice is the exact European value (this removes the oscillations caused
+#    by the position of the strike relative to the terminal nodes)
+#  - Control variate: the European price is computed on the same lattice, and the lattice error of the American price is largely cancelled by
+#    replacing the European lattice price with the exact Black Scholes Merton value
+
+import numpy as np
+from BSMKernels import bsmPrice, bsmPriceVegaVomma, bsmImpliedVolatility
+
+
+# Price, Delta, Gamma and Theta (per year) of American options.
+# Returns a dictionary of arrays: price, Delta, Gamma, Theta
+def americanLattice(spotPrice, strikePrice, isCall, tau, ir, sigma, steps = 100, dividendYield = 0.0):
+   # Make sure all inputs are flat arrays with the same shape
+   spotPrice, strikePrice, isCall, tau, ir, sigma = np.broadcast_arrays(np.asarray(spotPrice, dtype = float)
+                                                                         , np.asarray(strikePrice, dtype = float)
+                                                                         , np.asarray(isCall, dtype = bool)
+                                                                         , np.asarray(tau, dtype = float)
+                                                                         , np.asarray(ir, dtype = float)
+                                                                         , np.asarray(sigma, dtype = float)
+                                                                         )
+   shape = spotPrice.shape
+   spotPrice, strikePrice, isCall, tau, ir, sigma = [np.ravel(x) for x in (spotPrice, strikePrice, isCall, tau, ir, sigma)]
+   # The Greeks are read from the first two steps of the lattice
+   steps = max(int(steps), 2)
+
+   # Set the sign based on whether it is a Call (+1) or a Put (-1)
+   sign = np.where(isCall, 1.0, -1.0)
+   # Exact European value (with a continuous dividend yield: the BSM price on the dividend adjusted spot price)
+   dividendFactor = np.exp(-dividendYield*tau)
+   europeanPrice = bsmPrice(spotPrice*dividendFactor, strikePrice, isCall, tau, ir, sigma)
+   # Edge cases (tau = 0 or sigma = 0): the option is worth the highest between its intrinsic value and its European value
+   intrinsic = np.maximum(sign*(spotPrice - strikePrice), 0.0)
+   price = np.maximum(europeanPrice, intrinsic)
+   delta = np.where(intrinsic > 0, sign, 0.0)
+   gamma = np.zeros(spotPrice.size)
+   theta = np.zeros(spotPrice.size)
+
+   # Contracts priced on the lattice
+   idx = np.flatnonzero((tau > 0) & (sigma > 0))
+   if idx.size > 0:
+      S0 = spotPrice[idx][:, np.newaxis]
+      K = strikePrice[idx][:, np.newaxis]
+      w = sign[idx][:, np.newaxis]
+      # Lattice parameters (equal probability lattice: the nodes follow the risk neutral drift, which keeps the probabilities close to 1/2 for any volatility)
+      dt = tau[idx]/steps
+      sigmaSqrtDt = sigma[idx]*np.sqrt(dt)
+      drift = (ir[idx] - dividendYield - 0.5*sigma[idx]**2)*dt
+      u = np.exp(drift + sigmaSqrtDt)[:, np.newaxis]
+      d = np.exp(drift - sigmaSqrtDt)[:, np.newaxis]
+      disc = np.exp(-ir[idx]*dt)[:, np.newaxis]
+      # Risk neutral probability of an up move
+      p = (np.exp((ir[idx] - dividendYield)*dt)[:, np.newaxis] - d)/(u - d)
+      # Discounted risk neutral probabilities
+      pUp = disc*p
+      pDown = disc*(1.0 - p)
+      # Underlying prices on the last step before expiration (ascending order): S0 * u^j * d^(steps-1-j)
+      S = S0 * d**(steps - 1) * (u/d)**np.arange(steps)
+      # Continuation value on the last step: exact European value over the remaining time step
+      european = bsmPrice(S*np.exp(-dividendYield*dt)[:, np.newaxis], K, w > 0, dt[:, np.newaxis], ir[idx][:, np.newaxis], sigma[idx][:, np.newaxis])
+      american = np.maximum(european, w*(S - K))
+      # Backward induction
+      for n in range(steps - 2, -1, -1):
+         S = S[:, 1:]/u
+         american = np.maximum(pUp*american[:, 1:] + pDown*american[:, :-1], w*(S - K))
+         european = pUp*european[:, 1:] + pDown*european[:, :-1]
+         if n == 2:
+            S2, american2 = S, american
+         elif n == 1:
+            S1, american1 = S, american
+      # Early exercise premium on top of the exact European value (control variate)
+      price[idx] = np.maximum(europeanPrice[idx] + american[:, 0] - european[:, 0], intrinsic[idx])
+      # Greeks from the first two steps of the lattice
+      delta[idx] = (american1[:, 1] - american1[:, 0])/(S1[:, 1] - S1[:, 0])
+      gamma[idx] = ((american2[:, 2] - american2[:, 1])/(S2[:, 2] - S2[:, 1]) - (american2[:, 1] - american2[:, 0])/(S2[:, 1] - S2[:, 0]))/(0.5*(S2[:, 2] - S2[:, 0]))
+      # Theta: the middle node of the second step (S0*u*d) is not the initial spot price, so the change of the underlying price between the two nodes is
+      # removed with the Delta and Gamma before dividing by the elapsed time
+      dS = S2[:, 1] - S0[:, 0]
+      theta[idx] = (american2[:, 1] - american[:, 0] - delta[idx]*dS - 0.5*gamma[idx]*dS**2)/(2.0*dt)
+
+   return {"price": price.reshape(shape)
+           , "Delta": delta.reshape(shape)
+           , "Gamma": gamma.reshape(shape)
+           , "Theta": theta.reshape(shape)
+           }
+
+
+# Price of American options
+def americanPrice(spotPrice, strikePrice, isCall, tau, ir, sigma, steps = 100, dividendYield = 0.0):
+   return americanLattice(spotPrice, strikePrice, isCall, tau, ir, sigma, steps = steps, dividendYield = dividendYield)["price"]
+
+
+# Implied Volatility of American options: safeguarded secant iterations. The first step uses the Vega of the European option, the following ones the slope
+# between the last two estimates (close to the exercise boundary the early exercise premium flattens the price, and the European Vega overestimates the slope).
+# The search starts from the European IV of the target price, which is typically within a few basis points of the root.
+# Returns a tuple of arrays (IV, converged, iterations), with the same conventions as BSMKernels.bsmImpliedVolatility
+def americanImpliedVolatility(targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0 = None, xtol = 1e-6, maxIter = 20, lowerBound = 0.0001, upperBound = 5.0
+                              , steps = 100, dividendYield = 0.0):
+   # Make sure all inputs are flat arrays with the same shape
+   targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0 = np.broadcast_arrays(np.asarray(targetPrice, dtype = float)
+                                                                                   , np.asarray(spotPrice, dtype = float)
+                                                                                   , np.asarray(strikePrice, dtype = float)
+                                                                                   , np.asarray(isCall, dtype = bool)
+                                                                                   , np.asarray(tau, dtype = float)
+                                                                                   , np.asarray(ir, dtype = float)
+                                                                                   , np.asarray(np.nan if x0 is None else x0, dtype = float)
+                                                                                   )
+   shape = targetPrice.shape
+   targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0 = [np.ravel(x) for x in (targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0)]
+
+   # Price of the given contracts at the given volatility
+   def price(n, s):
+      return americanPrice(spotPrice[n], strikePrice[n], isCall[n], tau[n], ir[n], s, steps = steps, dividendYield = dividendYield)
+
+   # Initialize the output
+   IV = np.zeros(targetPrice.size)
+   converged = np.zeros(targetPrice.size, dtype = bool)
+   iterations = np.zeros(targetPrice.size, dtype = int)
+
+   # Initialize the bracket
+   lo = np.full(targetPrice.size, float(lowerBound))
+   hi = np.full(targetPrice.size, float(upperBound))
+
+   # The price is increasing with the volatility: there is a root only if the target price is within the prices at the boundaries
+   contracts = np.arange(targetPrice.size)
+   with np.errstate(invalid = "ignore"):
+      fLo = price(contracts, lo) - targetPrice
+      fHi = price(contracts, hi) - targetPrice
+      active = np.flatnonzero((tau > 0) & np.isfinite(targetPrice) & (fLo <= 0) & (fHi >= 0))
+
+   # Dividend adjusted spot price (used for the European estimates)
+   adjustedSpotPrice = spotPrice*np.exp(-dividendYield*tau)
+   # Use the European IV wherever the initial guess has not been specified
+   missing = ~np.isfinite(x0)
+   if missing.any():
+      x0 = x0.copy()
+      europeanIV, europeanConverged, _ = bsmImpliedVolatility(targetPrice[missing], adjustedSpotPrice[missing], strikePrice[missing], isCall[missing], tau[missing], ir[missing])
+      x0[missing] = np.where(europeanConverged, europeanIV, np.nan)
+   # Start the search from the initial guess (if it is inside the bracket) or from the middle of the bracket
+   sigma = np.where(np.isfinite(x0) & (lo < x0) & (x0 < hi), x0, 0.5*(lo + hi))
+   # Previous estimate and function value (for the secant steps)
+   sigmaPrev = np.full(targetPrice.size, np.nan)
+   fPrev = np.full(targetPrice.size, np.nan)
+
+   for n in range(maxIter):
+      if active.size == 0:
+         break
+      # Get the current estimate of the active contracts
+      s = sigma[active]
+      f = price(active, s) - targetPrice[active]
+      iterations[active] += 1
+      # Shrink the bracket
+      below = f < 0
+      lo[active] = np.where(below, s, lo[active])
+      hi[active] = np.where(below, hi[active], s)
+      with np.errstate(invalid = "ignore", divide = "ignore", over = "ignore"):
+         # Slope: secant between the last two estimates, or the European Vega on the first step
+         slope = (f - fPrev[active])/(s - sigmaPrev[active])
+         _, vega, _ = bsmPriceVegaVomma(adjustedSpotPrice[active], strikePrice[active], isCall[active], tau[active], ir[active], s)
+         slope = np.where(np.isfinite(slope) & (slope > 0), slope, vega)
+         sNew = s - f/slope
+      sigmaPrev[active] = s
+      fPrev[active] = f
+      # Use a bisection step if the secant step leaves the bracket
+      bisect = ~np.isfinite(sNew) | (sNew <= lo[active]) | (sNew >= hi[active])
+      sNew = np.where(bisect, 0.5*(lo[active] + hi[active]), sNew)
+      # Check for convergence
+      done = (f == 0) | (~bisect & (np.abs(sNew - s) < xtol)) | ((hi[active] - lo[active]) < xtol)
+      sigma[active] = np.where(f == 0, s, sNew)
+      converged[active[done]] = True
+      # Keep only the contracts that have not converged yet
+      active = active[~done]
+
+   # Set the IV only where we found the root
+   IV[converged] = sigma[converged]
+
+   return IV.reshape(shape), converged.reshape(shape), iterations.reshape(shape)
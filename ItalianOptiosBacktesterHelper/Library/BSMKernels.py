@@ -0,0 +1,395 @@
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+# Vectorized Black-Scholes-Merton kernels (European options, no dividends).
+# These are the array counterparts of the scalar methods of the BSM class: every input can be a NumPy array or a scalar,
+# as long as they all broadcast against each other. Inputs:
+#  - spotPrice: price of the underlying
+#  - strikePrice: strike of the contracts
+#  - isCall: boolean array (True -> Call, False -> Put)
+#  - tau: time to expiration as a fraction of the year
+#  - ir: risk free rate
+#  - sigma: volatility
+# The edge cases (tau = 0 or sigma = 0) are handled exactly like the scalar methods, so the two paths can be used interchangeably.
+# bsmPrice, bsmGreeks and bsmImpliedVolatility can run on a compiled backend (see NumbaKernels and useKernelBackend), which is selected at import:
+# Numba if it can be imported, NumPy otherwise. The environment variable BSM_KERNEL_BACKEND = numpy forces the NumPy path.
+
+import os
+import numpy as np
+import NormKernels
+import NumbaKernels
+from NormKernels import normCdf, normPdf, invSqrt2Pi
+
+# Backend of the core kernels currently in use ("numpy" or "numba")
+kernelBackend = "numpy"
+
+
+# Select the backend of the core kernels (None -> BSM_KERNEL_BACKEND environment variable, Numba by default). Numba falls back to NumPy if it is not installed.
+# This is a global setting: it affects all the callers of bsmPrice/bsmGreeks/bsmImpliedVolatility. Returns the backend in use
+def useKernelBackend(backend = None):
+   global kernelBackend
+   if backend == None:
+      backend = os.environ.get("BSM_KERNEL_BACKEND", "numba")
+   backend = backend.lower()
+   if backend not in ["numpy", "numba"]:
+      raise ValueError(f"Invalid kernel backend: {backend}. Valid options are numpy and numba")
+   if backend == "numba" and not NumbaKernels.available:
+      backend = "numpy"
+   kernelBackend = backend
+   return kernelBackend
+
+
+# Use the compiled kernels only when the exact normal CDF/PDF is in use (the NormKernels table is a NumPy-only approximation)
+def useNumba():
+   return kernelBackend == "numba" and NormKernels.normTable == None
+
+
+def bsmD1D2(spotPrice, strikePrice, isCall, tau, ir, sigma):
+   # Make sure all inputs are arrays with the same shape
+   spotPrice, strikePrice, isCall, tau, ir, sigma = np.broadcast_arrays(np.asarray(spotPrice, dtype = float)
+                                                                         , np.asarray(strikePrice, dtype = float)
+                                                                         , np.asarray(isCall, dtype = bool)
+                                                                         , np.asarray(tau, dtype = float)
+                                                                         , np.asarray(ir, dtype = float)
+                                                                         , np.asarray(sigma, dtype = float)
+                                                                         )
+   # sigma * sqrt(tau)
+   sigmaSqrtTau = sigma * np.sqrt(tau)
+   # Check edge cases:
+   #  - The contract is expired -> tau = 0
+   #  - The IV could not be computed (deep ITM or far OTM options) -> sigma = 0
+   edgeCase = (tau == 0) | (sigma == 0)
+   with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+      d1 = (np.log(spotPrice/strikePrice) + (ir + 0.5*sigma**2)*tau)/sigmaSqrtTau
+   # Set the sign based on whether it is a Call (+1) or a Put (-1)
+   sign = np.where(isCall, 1.0, -1.0)
+   # A Call is ITM if the underlying price is above the strike price, a Put if the underlying price is below the strike price
+   itm = np.where(isCall, strikePrice < spotPrice, spotPrice < strikePrice)
+   #  - Deep ITM options: Call -> d1 = Inf, Put -> d1 = -Inf
+   #  - Far OTM options: Call -> d1 = -Inf, Put -> d1 = Inf
+   d1 = np.where(edgeCase, np.where(itm, sign, -sign) * np.inf, d1)
+   # Compute D2
+   d2 = d1 - sigmaSqrtTau
+   return d1, d2
+
+
+# Pricing of a European option based on the Black Scholes Merton model (without dividends)
+def bsmPrice(spotPrice, strikePrice, isCall, tau, ir, sigma, d1 = None, d2 = None):
+   if (d1 is None or d2 is None) and useNumba():
+      return NumbaKernels.bsmPrice(spotPrice, strikePrice, isCall, tau, ir, sigma)
+   # Compute D1 and D2 (unless they have been provided)
+   if d1 is None or d2 is None:
+      d1, d2 = bsmD1D2(spotPrice, strikePrice, isCall, tau, ir, sigma)
+   # X*e^(-r*tau)
+   Xert = strikePrice * np.exp(-ir*tau)
+   # Price the options
+   return np.where(isCall
+                   , normCdf(d1)*spotPrice - normCdf(d2)*Xert
+                   , normCdf(-d2)*Xert - normCdf(-d1)*spotPrice
+                   )
+
+
+# Compute the price, Vega and Vomma in a single pass (these are the function and its derivatives used by the IV solver)
+def bsmPriceVegaVomma(spotPrice, strikePrice, isCall, tau, ir, sigma):
+   # Compute D1 and D2
+   d1, d2 = bsmD1D2(spotPrice, strikePrice, isCall, tau, ir, sigma)
+   # Price
+   price = bsmPrice(spotPrice, strikePrice, isCall, tau, ir, sigma, d1 = d1, d2 = d2)
+   with np.errstate(invalid = "ignore", divide = "ignore", over = "ignore"):
+      # Vega
+      vega = spotPrice * normPdf(d1) * np.sqrt(tau)
+      # Vomma
+      vomma = np.where(sigma == 0, np.inf, vega * d1 * d2 / sigma)
+   return price, vega, vomma
+
+
+# Closed-form estimate of the Implied Volatility, used as the starting point of the IV search (a handful of transcendental functions per contract):
+#  - All prices are converted into the price of the OTM option at the same strike (Put-Call parity), which only carries time value, and normalized
+#    by sqrt(S*X*e^(-r*tau)). x = |log(S/(X*e^(-r*tau)))| is the distance of the strike from the forward
+#  - The normalized OTM price at the total volatility sqrt(2x) (the inflection point of the price as a function of the volatility) has a closed form,
+#    and it splits the prices into two regions (P. Jaeckel, "By Implication", 2006):
+#    - Near the money and above the inflection point, the price is inverted through the upper asymptote of the OTM price (exact at the money)
+#    - In the wings (far OTM or short dated contracts), the price is inverted through the tail expansion of the normal CDF (two fixed point steps)
+#  Where the estimate is not available (e.g. the OTM price is zero) it is NaN, and the search starts from the middle of the bracket
+def bsmIVInitialGuess(targetPrice, spotPrice, strikePrice, isCall, tau, ir):
+   # Make sure all inputs are flat arrays with the same shape
+   targetPrice, spotPrice, strikePrice, isCall, tau, ir = [np.ravel(x) for x in np.broadcast_arrays(np.asarray(targetPrice, dtype = float)
+                                                                                                      , np.asarray(spotPrice, dtype = float)
+                                                                                                      , np.asarray(strikePrice, dtype = float)
+                                                                                                      , np.asarray(isCall, dtype = bool)
+                                                                                                      , np.asarray(tau, dtype = float)
+                                                                                                      , np.asarray(ir, dtype = float)
+                                                                                                      )
+                                                           ]
+   # X*e^(-r*tau)
+   Xert = strikePrice * np.exp(-ir*tau)
+   # The Call is OTM if the discounted strike is above the spot price, otherwise the Put is OTM
+   otmCall = Xert > spotPrice
+   # Convert the prices into OTM prices
+   callPrice = np.where(isCall, targetPrice, targetPrice + spotPrice - Xert)
+   otmPrice = np.where(otmCall, callPrice, callPrice - spotPrice + Xert)
+   with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+      # Normalized OTM price and distance from the forward
+      x = np.abs(np.log(spotPrice/Xert))
+      normPrice = otmPrice/np.sqrt(spotPrice*Xert)
+      # Normalized price at the inflection point and upper bound of the normalized price
+      sigmaC = np.sqrt(2.0*x)
+      maxPrice = np.exp(-0.5*x)
+      priceC = 0.5*maxPrice - np.exp(0.5*x)*normCdf(-sigmaC)
+      # Upper region: invert the upper asymptote of the price
+      upper = -2.0*NormKernels.normPpf((maxPrice - normPrice)/(maxPrice - priceC)*normCdf(-0.5*sigmaC))
+      # Lower region: invert the tail expansion of the price (s = total volatility), price = e^(-x/2)*phi(d1)*s/(d1*d2) = phi(0)*e^(-x^2/(2*s^2) - s^2/8)*s/(d1*d2),
+      # starting from its leading term
+      logPrice = np.log(normPrice)
+      lower = x/np.sqrt(-2.0*logPrice)
+      for n in range(2):
+         lower = x/np.sqrt(2.0*(np.log(invSqrt2Pi*lower/(x**2/lower**2 - 0.25*lower**2)) - 0.125*lower**2 - logPrice))
+      # The tail expansion is only accurate when |d1| is far from zero
+      useLower = (normPrice < priceC) & (x/lower - 0.5*lower > 2.0)
+      return np.where(useLower, lower, upper)/np.sqrt(tau)
+
+
+# Compute the Implied Volatility of an array of contracts from their price.
+# The root is searched with Halley's method on all contracts at once, safeguarded by a bracket [lowerBound, upperBound] that shrinks at every iteration:
+#  - Whenever the Halley step falls outside of the bracket (or it is not finite), a bisection step is taken instead
+#  - Contracts are dropped from the active set as soon as they converge (|step| < xtol)
+#  - Contracts that have not converged after maxIter Halley iterations are solved by bisection on their current bracket
+# Contracts without a root inside the initial bracket (expired, price outside of the no-arbitrage bounds) are not processed.
+# The search starts from x0 (if specified) or from the closed-form estimate returned by bsmIVInitialGuess (where x0 is None/NaN).
+# Returns a tuple of arrays (IV, converged, iterations). The IV is set to zero wherever the solver did not converge.
+def bsmImpliedVolatility(targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0 = None, xtol = 1e-6, maxIter = 20, lowerBound = 0.0001, upperBound = 5.0):
+   if useNumba():
+      return NumbaKernels.bsmImpliedVolatility(targetPrice, spotPrice, strikePrice, isCall, tau, ir
+                                               , x0 = x0, xtol = xtol, maxIter = maxIter, lowerBound = lowerBound, upperBound = upperBound
+                                               )
+   # Make sure all inputs are flat arrays with the same shape
+   targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0 = np.broadcast_arrays(np.asarray(targetPrice, dtype = float)
+                                                                                   , np.asarray(spotPrice, dtype = float)
+                                                                                   , np.asarray(strikePrice, dtype = float)
+                                                                                   , np.asarray(isCall, dtype = bool)
+                                                                                   , np.asarray(tau, dtype = float)
+                                                                                   , np.asarray(ir, dtype = float)
+                                                                                   , np.asarray(np.nan if x0 is None else x0, dtype = float)
+                                                                                   )
+   shape = targetPrice.shape
+   targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0 = [np.ravel(x) for x in (targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0)]
+
+   # Initialize the output
+   IV = np.zeros(targetPrice.size)
+   converged = np.zeros(targetPrice.size, dtype = bool)
+   iterations = np.zeros(targetPrice.size, dtype = int)
+
+   # Initialize the bracket
+   lo = np.full(targetPrice.size, float(lowerBound))
+   hi = np.full(targetPrice.size, float(upperBound))
+
+   # The price is increasing with the volatility: there is a root only if the target price is within the prices at the boundaries
+   with np.errstate(invalid = "ignore"):
+      fLo = bsmPrice(spotPrice, strikePrice, isCall, tau, ir, lo) - targetPrice
+      fHi = bsmPrice(spotPrice, strikePrice, isCall, tau, ir, hi) - targetPrice
+      active = np.flatnonzero((tau > 0) & np.isfinite(targetPrice) & (fLo <= 0) & (fHi >= 0))
+
+   # Use the closed-form estimate wherever the initial guess has not been specified
+   missing = ~np.isfinite(x0)
+   if missing.any():
+      x0 = x0.copy()
+      x0[missing] = bsmIVInitialGuess(targetPrice[missing], spotPrice[missing], strikePrice[missing], isCall[missing], tau[missing], ir[missing])
+   # Start the search from the initial guess (if it is inside the bracket) or from the middle of the bracket
+   sigma = np.where(np.isfinite(x0) & (lo < x0) & (x0 < hi), x0, 0.5*(lo + hi))
+
+   # Safeguarded Halley iterations
+   for n in range(maxIter):
+      if active.size == 0:
+         break
+      # Get the current estimate of the active contracts
+      s = sigma[active]
+      # Evaluate the function and its derivatives
+      price, vega, vomma = bsmPriceVegaVomma(spotPrice[active], strikePrice[active], isCall[active], tau[active], ir[active], s)
+      f = price - targetPrice[active]
+      iterations[active] += 1
+      # Shrink the bracket
+      below = f < 0
+      lo[active] = np.where(below, s, lo[active])
+      hi[active] = np.where(below, hi[active], s)
+      with np.errstate(invalid = "ignore", divide = "ignore", over = "ignore"):
+         # Newton step
+         newton = f/vega
+         # Halley step
+         sNew = s - newton/(1.0 - 0.5*newton*vomma/vega)
+      # Use a bisection step if the Halley step leaves the bracket
+      bisect = ~np.isfinite(sNew) | (sNew <= lo[active]) | (sNew >= hi[active])
+      sNew = np.where(bisect, 0.5*(lo[active] + hi[active]), sNew)
+      # Check for convergence
+      done = (f == 0) | (~bisect & (np.abs(sNew - s) < xtol))
+      sigma[active] = np.where(f == 0, s, sNew)
+      converged[active[done]] = True
+      # Keep only the contracts that have not converged yet
+      active = active[~done]
+
+   # Fallback method (Bisection) for the contracts that did not converge
+   while active.size > 0:
+      # Get the middle of the bracket
+      s = 0.5*(lo[active] + hi[active])
+      f = bsmPrice(spotPrice[active], strikePrice[active], isCall[active], tau[active], ir[active], s) - targetPrice[active]
+      iterations[active] += 1
+      # Shrink the bracket
+      below = f < 0
+      lo[active] = np.where(below, s, lo[active])
+      hi[active] = np.where(below, hi[active], s)
+      sigma[active] = s
+      # Check for convergence
+      done = (f == 0) | ((hi[active] - lo[active]) < xtol)
+      converged[active[done]] = True
+      active = active[~done]
+
+   # Set the IV only where we found the root
+   IV[converged] = sigma[converged]
+
+   return IV.reshape(shape), converged.reshape(shape), iterations.reshape(shape)
+
+
+# Higher order Greeks (without dividends), computed from the d1/d2/pdf(d1) intermediate results. Calls and Puts share the same values.
+# The time derivatives (Charm, Color, Veta) are taken with respect to the passage of time and divided by the number of trading days (daily values, consistently with the Theta).
+# In the edge cases (tau = 0 or sigma = 0) they are all set to zero.
+def bsmHigherOrderGreeks(spotPrice, tau, ir, sigma, d1, d2, pdfD1, tradingDays = 365.0):
+   edgeCase = (tau == 0) | (sigma == 0)
+   with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+      sqrtTau = np.sqrt(tau)
+      sigmaSqrtTau = sigma * sqrtTau
+      # Gamma
+      gamma = pdfD1 / (spotPrice * sigmaSqrtTau)
+      # (2*r*tau - d2*sigma*sqrt(tau)) / (2*tau*sigma*sqrt(tau)): shared by Charm and Color
+      driftTerm = (2.0*ir*tau - d2*sigmaSqrtTau) / (2.0*tau*sigmaSqrtTau)
+      # Vanna: dDelta/dSigma = dVega/dSpot
+      vanna = -pdfD1 * d2 / sigma
+      # Charm: dDelta/dt
+      charm = -pdfD1 * driftTerm / tradingDays
+      # Speed: dGamma/dSpot
+      speed = -gamma/spotPrice * (d1/sigmaSqrtTau + 1.0)
+      # Zomma: dGamma/dSigma
+      zomma = gamma * (d1*d2 - 1.0) / sigma
+      # Color: dGamma/dt
+      color = gamma * (1.0/(2.0*tau) + d1*driftTerm) / tradingDays
+      # Veta: dVega/dt
+      veta = spotPrice * pdfD1 * sqrtTau * (ir*d1/sigmaSqrtTau - (1.0 + d1*d2)/(2.0*tau)) / tradingDays
+
+   return {"Vanna": np.where(edgeCase, 0.0, vanna)
+           , "Charm": np.where(edgeCase, 0.0, charm)
+           , "Speed": np.where(edgeCase, 0.0, speed)
+           , "Zomma": np.where(edgeCase, 0.0, zomma)
+           , "Color": np.where(edgeCase, 0.0, color)
+           , "Veta": np.where(edgeCase, 0.0, veta)
+           }
+
+
+# Compute all the Greeks in a single pass, sharing the d1/d2/pdf/cdf intermediate results
+def bsmGreeks(spotPrice, strikePrice, isCall, tau, ir, sigma, midPrice = None, tradingDays = 365.0):
+   if useNumba():
+      return NumbaKernels.bsmGreeks(spotPrice, strikePrice, isCall, tau, ir, sigma, midPrice = midPrice, tradingDays = tradingDays)
+   # Make sure all inputs are arrays with the same shape
+   spotPrice, strikePrice, isCall, tau, ir, sigma = np.broadcast_arrays(np.asarray(spotPrice, dtype = float)
+                                                                         , np.asarray(strikePrice, dtype = float)
+                                                                         , np.asarray(isCall, dtype = bool)
+                                                                         , np.asarray(tau, dtype = float)
+                                                                         , np.asarray(ir, dtype = float)
+                                                                         , np.asarray(sigma, dtype = float)
+                                                                         )
+   # Compute D1 and D2
+   d1, d2 = bsmD1D2(spotPrice, strikePrice, isCall, tau, ir, sigma)
+
+   # Shared intermediate results
+   sqrtTau = np.sqrt(tau)
+   pdfD1 = normPdf(d1)
+   cdfD1 = normCdf(d1)
+   cdfD2 = normCdf(d2)
+   # N(-x) = 1 - N(x) loses accuracy in the tails, compute them directly
+   cdfMinusD1 = normCdf(-d1)
+   cdfMinusD2 = normCdf(-d2)
+   # e^(-r*tau)
+   ert = np.exp(-ir*tau)
+   # X*e^(-r*tau)
+   Xert = strikePrice * ert
+   # Edge cases
+   zeroSigma = sigma == 0
+   zeroTau = tau == 0
+
+   with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+      # Price
+      price = np.where(isCall, cdfD1*spotPrice - cdfD2*Xert, cdfMinusD2*Xert - cdfMinusD1*spotPrice)
+      # Delta
+      delta = np.where(isCall, cdfD1, -cdfMinusD1)
+      # -S*N'(d1)*sigma/(2*sqrt(tau))
+      SNs = -(spotPrice * pdfD1 * sigma) / (2.0 * sqrtTau)
+      # r*X*e^(-r*tau)
+      rXert = ir * Xert
+      # Theta (divided by the number of trading days to get a daily Theta value)
+      theta = np.where(isCall, SNs - rXert * cdfD2, SNs + rXert * cdfMinusD2)/tradingDays
+      # tau*r*X*e^(-r*tau)
+      tXert = tau * rXert
+      # Rho
+      rho = np.where(isCall, tXert * cdfD2, -tXert * cdfMinusD2)
+      # Vega
+      vega = spotPrice * pdfD1 * sqrtTau
+      # Gamma
+      gamma = np.where(zeroSigma | zeroTau, np.inf, pdfD1 / (spotPrice * sigma * sqrtTau))
+      # Vomma
+      vomma = np.where(zeroSigma, np.inf, vega * d1 * d2 / sigma)
+      # Lambda (a.k.a. elasticity or leverage)
+      if midPrice is None:
+         elasticity = np.full(delta.shape, np.nan)
+      else:
+         elasticity = delta * np.asarray(midPrice, dtype = float) / spotPrice
+
+   greeks = {"d1": d1
+             , "d2": d2
+             , "price": price
+             , "Delta": delta
+             , "Gamma": gamma
+             , "Vega": vega
+             , "Theta": theta
+             , "Rho": rho
+             , "Vomma": vomma
+             , "Elasticity": elasticity
+             }
+   # Add the higher order Greeks
+   greeks.update(bsmHigherOrderGreeks(spotPrice, tau, ir, sigma, d1, d2, pdfD1, tradingDays = tradingDays))
+   return greeks
+
+
+# Value of a multi-leg position across a grid of scenarios, priced in one broadcasted pass.
+#  - spotPrices: the price of the underlying in each scenario (nSpot), or the spot price of each leg in each scenario (nSpot x nLegs)
+#  - strikePrice, isCall, sigma, sides: one entry per leg (nLegs). ir can be either a single rate or one rate per leg. sides is the signed quantity of each leg (+n -> Long, -n -> Short)
+#  - tau: time to expiration of each leg at each point in time of the grid (nTime x nLegs)
+#  - volShifts: absolute shifts applied to the volatility of all legs (nVol). The shifted volatility is floored at zero
+#  - priceFunction: vectorized pricing function f(spotPrice, strikePrice, isCall, tau, ir, sigma) (default: bsmPrice)
+# Returns a (nSpot x nTime x nVol) array with the value of the position in each scenario
+def bsmScenarioValues(spotPrices, strikePrice, isCall, tau, ir, sigma, sides, volShifts = 0.0, priceFunction = None):
+   if priceFunction is None:
+      priceFunction = bsmPrice
+   # Scenario axes: [spot, time, vol, leg]
+   spotPrices = np.asarray(spotPrices, dtype = float)
+   spotPrices = spotPrices.reshape(spotPrices.shape[0], 1, 1, -1) if spotPrices.ndim == 2 else spotPrices.reshape(-1, 1, 1, 1)
+   tau = np.atleast_2d(np.asarray(tau, dtype = float))[np.newaxis, :, np.newaxis, :]
+   volShifts = np.asarray(volShifts, dtype = float).reshape(1, 1, -1, 1)
+   sigma = np.maximum(np.asarray(sigma, dtype = float) + volShifts, 0.0)
+   # Price all legs in all scenarios
+   prices = priceFunction(spotPrices, np.asarray(strikePrice, dtype = float), np.asarray(isCall, dtype = bool), tau, ir, sigma)
+   # Net value of the position
+   return prices @ np.asarray(sides, dtype = float)
+
+
+# Select the backend at import
+useKernelBackend()
@@ -20,26 +20,132 @@ from AlgorithmImports import *
 
 import numpy as np
 from math import *
-from scipy import optimize
-from scipy.stats import norm
+from NormKernels import normCdf, normPdf
+import NormKernels
 from Logger import *
 from ContractUtils import *
-from fred import fred
+from RateProvider import getFredRateProvider
+import BSMKernels
+import AmericanKernels
+import VolSmile
+from IVStore import IVStore
+from GreeksCache import GreeksCache
+from ExpiryTable import ExpiryTable, TradingCalendar
+import ParityForward
 
 class BSM:
 
-   def __init__(self, context, tradingDays = 365.0):
+   # Default parameters
+   defaultParameters = {
+      # Method used to compute the Implied Volatility. Valid options are (case insensitive):
+      # - Halley: the search starts at the latest known IV of the contract (10% if it has never been calculated)
+      # - Rational: the search starts at the closed-form estimate of BSMKernels.bsmIVInitialGuess (inversion of the normalized price of the contract).
+      #   Typically converges in two to four iterations, also for 0-DTE and far OTM contracts
+      "ivMethod": "Halley",
+      # Keep the latest IV of each contract across time bars and use it as the starting point of the next search
+      "useIVStore": True,
+      # Reuse the latest IV (skip the search) if the contract mid-price has not changed by more than this amount since the last calculation (same day only). 
+      # Set it to None to always run the search
+      "ivStoreMidTolerance": 0.0,
+      # Reuse the latest IV (skip the search) only if the underlying price has not changed by more than this percentage (0.001 -> 0.1%)
+      "ivStoreSpotTolerance": 0.0,
+      # Evaluate the normal CDF/PDF by interpolation on a precomputed table with this maximum absolute error (i.e. 1e-7) instead of computing them exactly.
+      # This is a global setting (it affects all the BSM instances). None -> exact evaluation
+      "normTableAccuracy": None,
+      # Maximum number of entries of the Greeks cache (shared by all the BSM instances of the algorithm)
+      "greeksCacheSize": 10000,
+      # Read the IV from a volatility smile (SVI) fitted once per bar for each expiry, instead of solving it for each contract. 
+      # The smile of an expiry is fitted whenever its contracts are filtered by the strategy (filterByExpiry): contracts with an expiry without a smile are still solved
+      "useVolSmile": False,
+      # Minimum number of valid quotes (OTM contracts with a valid IV and a non-crossed market) required to fit the smile
+      "volSmileMinPoints": 5,
+      # Discard the smile if the root mean square error of the fit (in terms of IV) is above this threshold
+      "volSmileMaxRMSE": 0.05,
+      # Refresh the Greeks of a contract (computeGreeks) with a Taylor expansion around its last full computation, instead of solving the IV and recomputing them,
+      # as long as the market has not drifted beyond the error budget below. The budget is checked against the state of the last full computation:
+      "incrementalGreeks": False,
+      #  - Maximum relative move of the underlying price (0.002 -> 0.2%)
+      "incrementalMaxSpotMove": 0.002,
+      #  - Maximum change of the IV (absolute), implied from the change of the mid-price not explained by the move of the underlying and the time decay
+      "incrementalMaxVolMove": 0.005,
+      #  - Maximum time elapsed (the Greeks are always fully recomputed at the start of a new day)
+      "incrementalMaxTime": timedelta(minutes = 30),
+      # Pricing model. Valid options are (case insensitive):
+      # - European: Black Scholes Merton closed formulas (no dividends)
+      # - American: binomial lattice with early exercise (see AmericanKernels). It is used for the IV, the price, Delta, Gamma and Theta, while the other Greeks
+      #   are the BSM values at the American IV
+      "pricingModel": "European",
+      # Number of time steps of the binomial lattice (American model)
+      "latticeSteps": 100,
+      # Continuous dividend yield of the underlying (American model only)
+      "dividendYield": 0.0,
+      # Path of the LEAN market hours database (i.e. data/market-hours/market-hours-database.json). If specified, the time to expiration of 0-DTE contracts
+      # is based on the trading minutes actually left in the session (early closes, time before the open). None -> the market closes at 16:00 every day
+      "marketHoursDatabase": None,
+      # Entry of the market hours database with the trading sessions of the options (the equity entry includes the holidays and the early closes)
+      "marketHoursEntry": "Equity-usa-[*]",
+      # Price the contracts of each expiry with the forward and the discount factor implied by the Put-Call parity of its Call/Put quotes (see ParityForward),
+      # instead of the spot price and the FRED rate. The forward of an expiry is fitted whenever its contracts are filtered by the strategy (filterByExpiry):
+      # the contracts of the expiries without a valid fit still use the spot price and the FRED rate
+      "useParityForward": False,
+      # Minimum number of Call/Put pairs (same strike, valid quotes on both sides) required to fit the forward
+      "parityMinPairs": 3,
+      # Only use the strikes within this percentage from the spot price (0.1 -> +/-10%): the deep ITM quotes are wider and may include an early exercise premium
+      "parityStrikeRange": 0.1,
+      # Discard the fit if the implied rate is outside of the range [-parityMaxRate, parityMaxRate]
+      "parityMaxRate": 0.2
+   }
+
+   def __init__(self, context, tradingDays = 365.0, rateProvider = None):
       # Set the context
       self.context = context
+      # Initialize the parameters dictionary with the default values
+      self.parameters = BSM.defaultParameters.copy()
+      # Override default parameters with values that might have been set in the context
+      for key in self.parameters:
+         if hasattr(context, key):
+            self.parameters[key] = getattr(context, key)
+      # Switch to the table-interpolated normal CDF/PDF if requested
+      if self.parameters["normTableAccuracy"] != None:
+         NormKernels.useNormTable(self.parameters["normTableAccuracy"])
+      # Keep track of the number of iterations needed to compute the IV
+      self.ivStats = {"solves": 0, "contracts": 0, "iterations": 0, "estimates": 0, "failed": 0, "reused": 0, "smile": 0}
+      # Volatility smile of each expiry: expiry -> (lastUpdated, smile)
+      # Forward and discount factor implied by the Put-Call parity of each expiry: expiry -> (lastUpdated, parityForward)
+      # Both are attached to the context, so an expiry fitted by one strategy is not fitted again by the others on the same bar
+      if not hasattr(context, "volSmiles"):
+         context.volSmiles = {}
+      if not hasattr(context, "parityForwards"):
+         context.parityForwards = {}
+      self.volSmiles = context.volSmiles
+      self.parityForwards = context.parityForwards
+      # Latest IV of each contract (keyed by Symbol)
+      self.ivStore = IVStore()
+      self.ivStoreLastEvictedDt = None
+      # Greeks computed for a given market state. The cache is attached to the context, so it is shared across all the strategies
+      if not hasattr(context, "greeksCache"):
+         context.greeksCache = GreeksCache(maxSize = self.parameters["greeksCacheSize"])
+      self.greeksCache = context.greeksCache
+      # State of the last full computation of the Greeks of each contract (keyed by Symbol), used for the incremental refresh
+      self.greeksAnchors = {}
+      self.greeksAnchorsDt = None
+      self.greeksStats = {"full": 0, "incremental": 0}
       # Set the logger
       self.logger = Logger(context, className = type(self).__name__, logLevel = context.logLevel)
       # Initialize the contract utils
       self.contractUtils = ContractUtils(context)
+      # Set the source of the IR (the FRED data is shared across all the instances unless otherwise specified)
+      self.rateProvider = rateProvider or getFredRateProvider()
       # Set the IR
       self.irLastUpdatedDt = None
       self.setRiskFreeRate()
       # Set the number of trading days
       self.tradingDays = tradingDays
+      # Time to expiration, sqrt(tau) and discount factors of each expiry within the current time bar
+      calendar = None
+      if self.parameters["marketHoursDatabase"] != None:
+         calendar = TradingCalendar(self.parameters["marketHoursDatabase"], entry = self.parameters["marketHoursEntry"])
+      self.expiryTable = ExpiryTable(tradingDays = tradingDays, calendar = calendar)
 
    def setRiskFreeRate(self):
 
@@ -52,16 +158,20 @@ class BSM:
          self.irLastUpdatedDt = currentDate
 
          # Get the most recent IR as of the current time 
-         ir = fred.query(f"date <= '{currentDate}'").tail(1)
+         irDate, ir = self.rateProvider.lookup(currentDate)
 
          # Check if we found the rate for the given date
-         if ir.empty:
+         if irDate == None:
             # Use the default rate
             self.irDate = None
             self.riskFreeRate = self.context.riskFreeRate
          else:
-            irDatetime, self.riskFreeRate = ir[["date", "ir"]].values[0]
-            self.irDate = irDatetime.date()
+            self.irDate = irDate
+            self.riskFreeRate = ir
+
+   # Check if the contracts are priced with the American model
+   def isAmerican(self):
+      return self.parameters["pricingModel"].lower() == "american"
 
    def isITM(self, contract, spotPrice = None):
       # Get the current price of the underlying unless otherwise specified
@@ -109,7 +219,7 @@ class BSM:
             #  - Put: d1 = Inf -> Delta = -Norm.CDF(-d1) = 0
             d1 = sign * float('-inf')
       else:
-         d1 = (np.log(spotPrice/strikePrice) + (ir + 0.5*sigma**2)*tau)/(sigma * np.sqrt(tau))
+         d1 = (np.log(spotPrice/strikePrice) + (ir + 0.5*sigma**2)*tau)/(sigma * self.expiryTable.sqrtTau(tau))
       return d1
 
 
@@ -124,22 +234,20 @@ class BSM:
          d1 = self.bsmD1(contract, sigma, tau = tau, ir = ir, spotPrice = spotPrice)
    
       # Compute D2
-      d2 = d1 - sigma * np.sqrt(tau)
+      d2 = d1 - sigma * self.expiryTable.sqrtTau(tau)
       return d2
    
    # Compute the DTE as a time fraction of the year
    def optionTau(self, contract, atTime = None):
+      return self.expiryTau(contract.Expiry, atTime = atTime)
+
+   # Compute the DTE of an expiration date as a time fraction of the year (computed once per time bar, see ExpiryTable)
+   def expiryTau(self, expiry, atTime = None):
+      # Drop the entries of the previous time bar
+      self.expiryTable.refresh(self.context.Time)
       if atTime == None:
          atTime = self.context.Time
-      # Get the expiration date and add 16 hours to the market close
-      expiryDttm = contract.Expiry + timedelta(hours = 16)
-      # Time until market close
-      timeDiff = expiryDttm - atTime
-      # Days to expiration: use the fraction of minutes until market close in case of 0-DTE (390 minutes = 6.5h -> from 9:30 to 16:00)
-      dte = max(0, timeDiff.days, timeDiff.seconds/(60.0*390.0))
-      # DTE as a fraction of a year
-      tau = dte/self.tradingDays
-      return tau
+      return self.expiryTable.tau(expiry, atTime)
 
    # Pricing of a European option based on the Black Scholes Merton model (without dividends)
    def bsmPrice(self, contract, sigma, tau = None, ir = None, spotPrice = None, atTime = None):
@@ -156,20 +264,33 @@ class BSM:
       # Get the current price of the underlying unless otherwise specified
       if spotPrice == None:
          spotPrice = self.contractUtils.getUnderlyingLastPrice(contract)
+
+      # Price the option on the binomial lattice if using the American model
+      if self.isAmerican():
+         return float(AmericanKernels.americanPrice(spotPrice
+                                                    , contract.Strike
+                                                    , contract.Right == OptionRight.Call
+                                                    , tau
+                                                    , ir
+                                                    , sigma
+                                                    , steps = self.parameters["latticeSteps"]
+                                                    , dividendYield = self.parameters["dividendYield"]
+                                                    ))
+
       # Compute D1
       d1 = self.bsmD1(contract, sigma, tau = tau, ir = ir, spotPrice = spotPrice)
       # Compute D2
       d2 = self.bsmD2(contract, sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
       # X*e^(-r*tau)
-      Xert = contract.Strike * np.exp(-ir*tau)
+      Xert = contract.Strike * self.expiryTable.discountFactor(tau, ir)
 
       #Price the option
       if contract.Right == OptionRight.Call:
          # Call Option
-         theoreticalPrice = norm.cdf(d1)*spotPrice - norm.cdf(d2)*Xert
+         theoreticalPrice = normCdf(d1)*spotPrice - normCdf(d2)*Xert
       else:
          # Put Option
-         theoreticalPrice = norm.cdf(-d2)*Xert - norm.cdf(-d1)*spotPrice
+         theoreticalPrice = normCdf(-d2)*Xert - normCdf(-d1)*spotPrice
       return theoreticalPrice
 
 
@@ -193,14 +314,14 @@ class BSM:
       if d2 == None:
          d2 = self.bsmD2(contract, sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
       # -S*N'(d1)*sigma/(2*sqrt(tau))
-      SNs = -(spotPrice * norm.pdf(d1) * sigma) / (2.0 * np.sqrt(tau))
+      SNs = -(spotPrice * normPdf(d1) * sigma) / (2.0 * self.expiryTable.sqrtTau(tau))
       # r*X*e^(-r*tau)
-      rXert = ir * contract.Strike * np.exp(-ir*tau)
+      rXert = ir * contract.Strike * self.expiryTable.discountFactor(tau, ir)
       # Compute Theta (divide by the number of trading days to get a daily Theta value)
       if contract.Right == OptionRight.Call:
-         theta = (SNs  -  rXert * norm.cdf(d2))/self.tradingDays
+         theta = (SNs  -  rXert * normCdf(d2))/self.tradingDays
       else:
-         theta = (SNs  +  rXert * norm.cdf(-d2))/self.tradingDays
+         theta = (SNs  +  rXert * normCdf(-d2))/self.tradingDays
       return theta
 
 
@@ -223,12 +344,12 @@ class BSM:
       if d2 == None:
          d2 = self.bsmD2(contract, sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
       # tau*X*e^(-r*tau)
-      tXert = tau * ir * contract.Strike * np.exp(-ir*tau)
+      tXert = tau * ir * contract.Strike * self.expiryTable.discountFactor(tau, ir)
       # Compute Theta
       if contract.Right == OptionRight.Call:
-         rho = tXert * norm.cdf(d2)
+         rho = tXert * normCdf(d2)
       else:
-         rho = -tXert * norm.cdf(-d2)
+         rho = -tXert * normCdf(-d2)
       return rho
 
 
@@ -247,7 +368,7 @@ class BSM:
       if(sigma == 0 or tau == 0):
          gamma = float('inf')
       else:
-         gamma = norm.pdf(d1) / (spotPrice * sigma * np.sqrt(tau))
+         gamma = normPdf(d1) / (spotPrice * sigma * self.expiryTable.sqrtTau(tau))
       return gamma
 
 
@@ -264,7 +385,7 @@ class BSM:
       if d1 == None:
          d1 = self.bsmD1(contract, sigma, tau = tau, ir = ir, spotPrice = spotPrice)
       # Compute Vega
-      vega = spotPrice * norm.pdf(d1) * np.sqrt(tau)
+      vega = spotPrice * normPdf(d1) * self.expiryTable.sqrtTau(tau)
       return vega
 
 
@@ -286,59 +407,36 @@ class BSM:
       if(sigma == 0):
          vomma = float('inf')
       else:
-         vomma = spotPrice * norm.pdf(d1) * np.sqrt(tau) * d1 * d2 / sigma
+         vomma = spotPrice * normPdf(d1) * self.expiryTable.sqrtTau(tau) * d1 * d2 / sigma
       return vomma
    
    # Compute Implied Volatility from the price of an option
-   def bsmIV(self, contract, tau = None, saveIt = False):
+   def bsmIV(self, contract, tau = None, saveIt = False, spotPrice = None, ir = None):
    
       # Start the timer
       self.context.executionTimer.start()
-   
-      # Inner function used to compute the root
-      def f(sigma, contract, tau):
-         return self.bsmPrice(contract, sigma = sigma, tau = tau) - self.contractUtils.midPrice(contract)
-      # First order derivative  (Vega)  
-      def fprime(sigma, contract, tau):
-         return self.bsmVega(contract, sigma = sigma, tau = tau)
-      # Second order derivative (Vomma)    
-      def fprime2(sigma, contract, tau):
-         return self.bsmVomma(contract, sigma = sigma, tau = tau)
-
-      # Initialize the IV to zero in case anything goes wrong
-      IV = 0
-      # Initialize the flag to mark whether we were able to find the root
-      converged = False
-      
-      # Find the root -> Implied Volatility: Use Halley's method
-      try:
-         # Start the search at the lastest known value for the IV (if previously calculated)
-         x0 = 0.1
-         if hasattr(contract, "BSMImpliedVolatility"):
-            x0 = contract.BSMImpliedVolatility
-         sol = optimize.root_scalar(f, x0 = x0, args = (contract, tau), fprime = fprime, fprime2 = fprime2, method = 'halley', xtol = 1e-6)
-         # Get the convergence status
-         converged = sol.converged
-         # Set the IV if we found the root
-         if converged:
-            IV = sol.root
-      except:
-         pass
-
-      # Fallback method (Bisection) if Halley's optimization failed
-      if not converged:
-         # Find the root -> Implied Volatility
-         try:
-            sol = optimize.root_scalar(f, bracket = [0.0001, 2], args = (contract, tau), xtol = 1e-6)
-            # Get the convergence status
-            converged = sol.converged
-            # Set the IV if we found the root
-            if converged:
-               IV = sol.root
-         except:
-            pass
 
-      
+      # Get the DTE as a fraction of a year
+      if tau == None:
+         tau = self.optionTau(contract)
+
+      # Get the current price of the underlying unless otherwise specified
+      if spotPrice == None:
+         spotPrice = self.contractUtils.getUnderlyingLastPrice(contract)
+
+      # Find the root -> Implied Volatility (the IV is zero in case anything goes wrong)
+      IV, converged, iterations = self.computeChainIV([contract.Strike]
+                                                      , [contract.Right]
+                                                      , [contract.Expiry]
+                                                      , [self.contractUtils.midPrice(contract)]
+                                                      , spotPrice
+                                                      , x0 = self.getIVStartingPoint(contract)
+                                                      , ir = ir
+                                                      , tau = tau
+                                                      , symbols = [contract.Symbol]
+                                                      )
+      IV = float(IV[0])
+
       # Check if we need to save the IV as an attribute of the contract object
       if saveIt:
          contract.BSMImpliedVolatility = IV
@@ -348,7 +446,332 @@ class BSM:
          
       # Return the result
       return IV
-   
+
+   # Get the starting point for the IV search of a contract (NaN -> use the estimate based on the normalized price inversion)
+   def getIVStartingPoint(self, contract):
+      # Start the search at the lastest known value for the IV (if previously calculated)
+      if self.parameters["useIVStore"] and contract.Symbol in self.ivStore.slots:
+         IV = self.ivStore.IV[self.ivStore.slots[contract.Symbol]]
+         if IV > 0:
+            return IV
+      if hasattr(contract, "BSMImpliedVolatility"):
+         return contract.BSMImpliedVolatility
+      elif self.parameters["ivMethod"].lower() == "rational":
+         return float("NaN")
+      else:
+         return 0.1
+
+   # Keep track of the number of iterations needed to compute the IV, and of the number of starting points estimated in closed form (x0 = None/NaN)
+   def updateIVStats(self, converged, iterations, x0 = None):
+      self.ivStats["solves"] += 1
+      self.ivStats["contracts"] += np.size(iterations)
+      self.ivStats["iterations"] += int(np.sum(iterations))
+      if x0 is None:
+         self.ivStats["estimates"] += np.size(iterations)
+      else:
+         self.ivStats["estimates"] += int(np.sum(~np.isfinite(np.broadcast_to(np.asarray(x0, dtype = float), np.shape(iterations)))))
+      self.ivStats["failed"] += int(np.size(converged) - np.sum(converged))
+
+   # Log the IV stats
+   def showIVStats(self):
+      ivStats = self.ivStats
+      self.logger.info(f"IV Stats (ivMethod: {self.parameters['ivMethod']}):")
+      self.logger.info(f"  --> solves: {ivStats['solves']}")
+      self.logger.info(f"  --> contracts: {ivStats['contracts']}")
+      self.logger.info(f"  --> starting points estimated: {ivStats['estimates']}")
+      self.logger.info(f"  --> failed: {ivStats['failed']}")
+      self.logger.info(f"  --> reused: {ivStats['reused']}")
+      self.logger.info(f"  --> from smile: {ivStats['smile']}")
+      if ivStats["contracts"] > 0:
+         self.logger.info(f"  --> iterations per contract: {ivStats['iterations']/ivStats['contracts']:.2f}")
+
+   # Compute the Implied Volatility for a whole chain in one vectorized pass.
+   #  - strikes, rights, expiries, midPrices: one entry per contract (rights can be either OptionRight values or booleans -> True = Call)
+   #  - spotPrice: price of the underlying (or one value per contract)
+   #  - x0: initial guess for the search (one value per contract or a single value for all of them). If None, it is set based on the ivMethod parameter
+   #  - tau: DTE of each contract as a fraction of a year. If None, it is computed from the expiries
+   #  - symbols: Symbol of each contract. If specified, the latest IV of each contract is kept in the IV store across time bars
+   #  - useVolSmile: read the IV from the smile of the expiries fitted on the current bar (if available). If None, it is set based on the useVolSmile parameter
+   # Returns a tuple of arrays (IV, converged, iterations). The IV is set to zero wherever the solver did not converge
+   def computeChainIV(self, strikes, rights, expiries, midPrices, spotPrice, x0 = None, ir = None, atTime = None, tau = None, symbols = None, useVolSmile = None):
+      # Start the timer
+      self.context.executionTimer.start()
+
+      # Use the risk free rate unless otherwise specified
+      if ir is None:
+         self.setRiskFreeRate()
+         ir = self.riskFreeRate
+
+      # Get the DTE of each contract as a fraction of a year
+      if tau is None:
+         tau = self.getExpiryTaus(expiries, atTime = atTime)
+      else:
+         tau = np.broadcast_to(np.asarray(tau, dtype = float), (len(strikes),))
+
+      midPrices = np.asarray(midPrices, dtype = float)
+      spotPrice = np.broadcast_to(np.asarray(spotPrice, dtype = float), midPrices.shape)
+      ir = np.broadcast_to(np.asarray(ir, dtype = float), midPrices.shape)
+      strikes = np.asarray(strikes, dtype = float)
+      isCall = self.getIsCall(rights)
+
+      # Get the IV of the contracts with an expiry for which a smile has been fitted on the current bar
+      if useVolSmile == None:
+         useVolSmile = self.parameters["useVolSmile"]
+      if useVolSmile:
+         smileIV, fromSmile = self.getVolSmileIV(strikes, expiries)
+      else:
+         fromSmile = np.zeros(len(strikes), dtype = bool)
+
+      # Check if we need to use the IV store
+      useIVStore = symbols is not None and self.parameters["useIVStore"]
+
+      if useIVStore:
+         # Get the current date
+         currentDate = self.context.Time.date()
+         # Once a day, remove all the expired contracts from the store
+         if currentDate != self.ivStoreLastEvictedDt:
+            self.ivStoreLastEvictedDt = currentDate
+            self.ivStore.evictExpired(currentDate)
+         # Get the slot of each contract
+         slots = self.ivStore.getSlots(symbols, expiries)
+         lastIV = self.ivStore.IV[slots]
+         hasLastIV = lastIV > 0
+         # Start the search at the lastest known value for the IV (if previously calculated)
+         if x0 is None:
+            if self.parameters["ivMethod"].lower() == "rational" or self.isAmerican():
+               x0 = np.where(hasLastIV, lastIV, np.nan)
+            else:
+               x0 = np.where(hasLastIV, lastIV, 0.1)
+         # Reuse the latest IV of the contracts for which neither the mid-price nor the spot price have moved beyond the tolerance
+         midTolerance = self.parameters["ivStoreMidTolerance"]
+         if midTolerance is None:
+            reuse = np.zeros(len(slots), dtype = bool)
+         else:
+            reuse = (hasLastIV
+                     & (self.ivStore.lastUpdated[slots] == currentDate.toordinal())
+                     & (np.abs(midPrices - self.ivStore.midPrice[slots]) <= midTolerance)
+                     & (np.abs(spotPrice - self.ivStore.spotPrice[slots]) <= self.parameters["ivStoreSpotTolerance"] * spotPrice)
+                     )
+         reuse &= ~fromSmile
+         # Contracts that need to be solved
+         solve = ~reuse & ~fromSmile
+      else:
+         # Set the starting point of the search
+         if x0 is None and self.parameters["ivMethod"].lower() != "rational" and not self.isAmerican():
+            x0 = 0.1
+         reuse = np.zeros(len(strikes), dtype = bool)
+         solve = ~fromSmile
+
+      IV = np.zeros(len(strikes))
+      converged = np.ones(len(strikes), dtype = bool)
+      iterations = np.zeros(len(strikes), dtype = int)
+      if useIVStore:
+         IV[reuse] = lastIV[reuse]
+         self.ivStats["reused"] += int(np.sum(reuse))
+      if useVolSmile:
+         IV[fromSmile] = smileIV[fromSmile]
+         self.ivStats["smile"] += int(np.sum(fromSmile))
+
+      if solve.any():
+         # Only pass the initial guess of the contracts that need to be solved
+         if x0 is not None and np.ndim(x0) > 0:
+            x0 = np.asarray(x0, dtype = float)[solve]
+         # Find the root -> Implied Volatility
+         if self.isAmerican():
+            IV[solve], converged[solve], iterations[solve] = AmericanKernels.americanImpliedVolatility(midPrices[solve]
+                                                                                                      , spotPrice[solve]
+                                                                                                      , strikes[solve]
+                                                                                                      , isCall[solve]
+                                                                                                      , tau[solve]
+                                                                                                      , ir[solve]
+                                                                                                      , x0 = x0
+                                                                                                      , xtol = 1e-6
+                                                                                                      , steps = self.parameters["latticeSteps"]
+                                                                                                      , dividendYield = self.parameters["dividendYield"]
+                                                                                                      )
+         else:
+            IV[solve], converged[solve], iterations[solve] = BSMKernels.bsmImpliedVolatility(midPrices[solve]
+                                                                                             , spotPrice[solve]
+                                                                                             , strikes[solve]
+                                                                                             , isCall[solve]
+                                                                                             , tau[solve]
+                                                                                             , ir[solve]
+                                                                                             , x0 = x0
+                                                                                             , xtol = 1e-6
+                                                                                             )
+         # Update the stats
+         self.updateIVStats(converged[solve], iterations[solve], x0 = x0)
+         # Save the results for the next time bar
+         if useIVStore:
+            self.ivStore.update(slots[solve], IV[solve], spotPrice[solve], midPrices[solve], currentDate)
+
+      # Stop the timer
+      self.context.executionTimer.stop()
+
+      return IV, converged, iterations
+
+   # Get the volatility smile of an expiry (None if no smile has been fitted on the current bar)
+   def getVolSmile(self, expiry):
+      lastUpdated, smile = self.volSmiles.get(expiry, (None, None))
+      if lastUpdated != self.context.Time:
+         return None
+      return smile
+
+   # Evaluate the IV of a list of contracts from the smile of their expiry. Returns a tuple of arrays (IV, fromSmile), where fromSmile is
+   # a boolean array indicating whether a smile was available for the contract
+   def getVolSmileIV(self, strikes, expiries):
+      IV = np.zeros(len(strikes))
+      fromSmile = np.zeros(len(strikes), dtype = bool)
+      for expiry in set(expiries):
+         smile = self.getVolSmile(expiry)
+         if smile != None:
+            mask = np.array([contractExpiry == expiry for contractExpiry in expiries], dtype = bool)
+            IV[mask] = smile.IV(np.asarray(strikes, dtype = float)[mask])
+            fromSmile |= mask
+      return IV, fromSmile
+
+   # Fit the volatility smile of each expiry in the given list of contracts (only once per bar).
+   # The smile is fitted on the IV of the OTM contracts with a valid (non-crossed, non-zero bid) quote
+   def fitVolSmiles(self, contracts):
+      # Start the timer
+      self.context.executionTimer.start()
+
+      # Group the contracts by expiry
+      expiryGroups = {}
+      for contract in contracts:
+         expiryGroups.setdefault(contract.Expiry, []).append(contract)
+
+      # Use the risk free rate
+      self.setRiskFreeRate()
+      ir = self.riskFreeRate
+
+      for expiry, group in expiryGroups.items():
+         # Skip if the smile has already been fitted on this bar
+         if expiry in self.volSmiles and self.volSmiles[expiry][0] == self.context.Time:
+            continue
+         smile = None
+         tau = self.expiryTau(expiry)
+         if tau > 0:
+            parityForward = self.getParityForward(expiry)
+            if parityForward == None:
+               spotPrice = self.contractUtils.getUnderlyingLastPrice(group[0])
+               expiryIR = ir
+               # Forward price of the underlying
+               forward = spotPrice * np.exp(ir*tau)
+            else:
+               # Use the forward implied by the Put-Call parity
+               spotPrice = parityForward.spotPrice
+               expiryIR = parityForward.rate
+               forward = parityForward.forward
+            # Collect the contract details
+            securities = [self.contractUtils.getSecurity(contract) for contract in group]
+            bidPrices = np.array([security.BidPrice for security in securities], dtype = float)
+            askPrices = np.array([security.AskPrice for security in securities], dtype = float)
+            strikes = np.array([contract.Strike for contract in group], dtype = float)
+            isCall = self.getIsCall([contract.Right for contract in group])
+            # Keep the OTM contracts with a valid quote
+            sample = (bidPrices > 0) & (askPrices >= bidPrices) & np.where(isCall, strikes >= forward, strikes < forward)
+            if np.sum(sample) >= self.parameters["volSmileMinPoints"]:
+               # Compute the IV of the sample (vectorized)
+               IV, converged, iterations = self.computeChainIV(strikes[sample]
+                                                               , isCall[sample]
+                                                               , [expiry] * int(np.sum(sample))
+                                                               , 0.5*(bidPrices[sample] + askPrices[sample])
+                                                               , spotPrice
+                                                               , ir = expiryIR
+                                                               , tau = tau
+                                                               , symbols = [contract.Symbol for contract, use in zip(group, sample) if use]
+                                                               , useVolSmile = False
+                                                               )
+               valid = converged & (IV > 0)
+               smile = VolSmile.fitSmile(strikes[sample][valid], IV[valid], forward, tau, minPoints = self.parameters["volSmileMinPoints"])
+               # Discard the smile if it does not fit the data
+               if smile != None and smile.rmse > self.parameters["volSmileMaxRMSE"]:
+                  self.logger.debug(f"Discarding the smile of {expiry}: RMSE = {smile.rmse}")
+                  smile = None
+         self.volSmiles[expiry] = (self.context.Time, smile)
+
+      # Remove the smiles of the expired contracts
+      for expiry in [expiry for expiry in self.volSmiles if expiry.date() < self.context.Time.date()]:
+         self.volSmiles.pop(expiry)
+
+      # Stop the timer
+      self.context.executionTimer.stop()
+
+   # Get the forward and discount factor implied by the Put-Call parity of an expiry (None if no valid fit is available on the current bar)
+   def getParityForward(self, expiry):
+      lastUpdated, parityForward = self.parityForwards.get(expiry, (None, None))
+      if lastUpdated != self.context.Time:
+         return None
+      return parityForward
+
+   # Get the spot price and the interest rate used to price each contract: the values implied by the Put-Call parity of its expiry (if available)
+   # or the given spot prices and the risk free rate. Returns a tuple of arrays (spotPrices, ir)
+   def getParityInputs(self, expiries, spotPrices):
+      self.setRiskFreeRate()
+      spotPrices = np.array(spotPrices, dtype = float)
+      ir = np.full(len(expiries), self.riskFreeRate, dtype = float)
+      for expiry in set(expiries):
+         parityForward = self.getParityForward(expiry)
+         if parityForward != None:
+            mask = np.array([contractExpiry == expiry for contractExpiry in expiries], dtype = bool)
+            spotPrices[mask] = parityForward.spotPrice
+            ir[mask] = parityForward.rate
+      return spotPrices, ir
+
+   # Fit the forward and the discount factor of each expiry in the given list of contracts from the Put-Call parity (only once per bar).
+   # The Calls and Puts are matched by strike, and the fits of all the expiries are solved at once with a least squares regression of (C - P) on the strike
+   def fitParityForwards(self, contracts):
+      # Start the timer
+      self.context.executionTimer.start()
+
+      # Keep the contracts of the expiries that have not been fitted on this bar
+      contracts = [contract for contract in contracts
+                     if not (contract.Expiry in self.parityForwards and self.parityForwards[contract.Expiry][0] == self.context.Time)
+                   ]
+      if contracts:
+         # Assign an index to each expiry
+         expiries = sorted(set(contract.Expiry for contract in contracts))
+         expiryIdx = {expiry: n for n, expiry in enumerate(expiries)}
+         spotPrice = self.contractUtils.getUnderlyingLastPrice(contracts[0])
+         # Collect the contract details
+         securities = [self.contractUtils.getSecurity(contract) for contract in contracts]
+         bidPrices = np.array([security.BidPrice for security in securities], dtype = float)
+         askPrices = np.array([security.AskPrice for security in securities], dtype = float)
+         strikes = np.array([contract.Strike for contract in contracts], dtype = float)
+         isCall = self.getIsCall([contract.Right for contract in contracts])
+         groups = np.array([expiryIdx[contract.Expiry] for contract in contracts], dtype = int)
+         # Keep the contracts with a valid quote and a strike close to the spot price
+         sample = np.flatnonzero((bidPrices > 0) & (askPrices >= bidPrices) & (np.abs(strikes/spotPrice - 1) <= self.parameters["parityStrikeRange"]))
+         # Match the Calls and Puts with the same expiry and strike
+         callIdx, putIdx = ParityForward.matchParityPairs(groups[sample], strikes[sample], isCall[sample])
+         callIdx = sample[callIdx]
+         putIdx = sample[putIdx]
+         midPrices = 0.5*(bidPrices + askPrices)
+         # Weight each pair by the inverse of its bid/ask spread (floored at one cent)
+         spreads = np.maximum(askPrices - bidPrices, 0.01)
+         fits = ParityForward.fitParityForwards(groups[callIdx]
+                                                , strikes[callIdx]
+                                                , midPrices[callIdx]
+                                                , midPrices[putIdx]
+                                                , np.array([self.expiryTau(expiry) for expiry in expiries])
+                                                , weights = 1.0/(spreads[callIdx] + spreads[putIdx])
+                                                , minPairs = self.parameters["parityMinPairs"]
+                                                )
+         for expiry, parityForward in zip(expiries, fits):
+            # Discard the fit if the implied rate is not plausible
+            if parityForward != None and abs(parityForward.rate) > self.parameters["parityMaxRate"]:
+               self.logger.debug(f"Discarding the Put-Call parity forward of {expiry}: implied rate = {parityForward.rate}")
+               parityForward = None
+            self.parityForwards[expiry] = (self.context.Time, parityForward)
+
+      # Remove the forwards of the expired contracts
+      for expiry in [expiry for expiry in self.parityForwards if expiry.date() < self.context.Time.date()]:
+         self.parityForwards.pop(expiry)
+
+      # Stop the timer
+      self.context.executionTimer.stop()
+
    # Compute the Delta of an option
    def bsmDelta(self, contract, sigma, tau = None, d1 = None, ir = None, spotPrice = None, atTime = None):
       if d1 == None:
@@ -362,9 +785,9 @@ class BSM:
          
       # Compute option delta (rounded to 2 digits)
       if contract.Right == OptionRight.Call:
-         delta = norm.cdf(d1)
+         delta = normCdf(d1)
       else:
-         delta = -norm.cdf(-d1)
+         delta = -normCdf(-d1)
       return delta
    
    def computeGreeks(self, contract, sigma = None, ir = None, spotPrice = None, atTime = None, saveIt = False):
@@ -373,19 +796,53 @@ class BSM:
       
       # Avoid recomputing the Greeks if we have already done it for this time bar
       if hasattr(contract, "BSMGreeks") and contract.BSMGreeks.lastUpdated == self.context.Time:
+         # Stop the timer
+         self.context.executionTimer.stop()
          return contract.BSMGreeks
-      
+
+      # Use the forward and the discount factor implied by the Put-Call parity of the expiry (if available), unless the market state has been specified
+      if spotPrice == None and ir == None and atTime == None:
+         parityForward = self.getParityForward(contract.Expiry)
+         if parityForward != None:
+            spotPrice = parityForward.spotPrice
+            ir = parityForward.rate
+
+      # Get the current price of the underlying unless otherwise specified
+      if spotPrice == None:
+         spotPrice = self.contractUtils.getUnderlyingLastPrice(contract)
+
+      # The Greeks can only be shared if they are computed for the current market state
+      useCache = sigma == None and atTime == None
+      if useCache:
+         # Check if the Greeks have already been computed for this market state (possibly on a different instance of the contract)
+         cacheKey = self.greeksCacheKey(contract, spotPrice, ir)
+         cachedEntry = self.greeksCache.get(cacheKey)
+         if cachedEntry is not None:
+            IV, greeks = cachedEntry
+            # Check if we need to save the IV and the Greeks as attributes of the contract object
+            if saveIt:
+               contract.BSMImpliedVolatility = IV
+               contract.BSMGreeks = greeks
+            # Stop the timer
+            self.context.executionTimer.stop()
+            return greeks
+
+      # Check if the Greeks can be refreshed incrementally from the last full computation
+      useIncremental = useCache and ir == None and self.parameters["incrementalGreeks"]
+      if useIncremental:
+         greeks = self.incrementalGreeks(contract, spotPrice, saveIt = saveIt)
+         if greeks is not None:
+            # Stop the timer
+            self.context.executionTimer.stop()
+            return greeks
+
       # Get the DTE as a fraction of a year
       tau = self.optionTau(contract, atTime = atTime)
       
       if sigma == None:
          # Compute Implied Volatility
-         sigma = self.bsmIV(contract, tau = tau, saveIt = saveIt)
+         sigma = self.bsmIV(contract, tau = tau, saveIt = saveIt, spotPrice = spotPrice, ir = ir)
       ### if (sigma == None)
-      
-      # Get the current price of the underlying unless otherwise specified
-      if spotPrice == None:
-         spotPrice = self.contractUtils.getUnderlyingLastPrice(contract)
          
       # Compute D1
       d1 = self.bsmD1(contract, sigma, tau = tau, ir = ir, spotPrice = spotPrice)
@@ -402,6 +859,24 @@ class BSM:
       gamma = self.bsmGamma(contract, sigma, tau = tau, d1 = d1, ir = ir, spotPrice = spotPrice)
       vomma = self.bsmVomma(contract, sigma, tau = tau, d1 = d1, d2 = d2, ir = ir, spotPrice = spotPrice)
       
+      # Higher order derivatives
+      higherOrderGreeks = BSMKernels.bsmHigherOrderGreeks(spotPrice, tau, self.riskFreeRate if ir == None else ir, sigma, d1, d2, normPdf(d1), tradingDays = self.tradingDays)
+
+      # American model: the sensitivities to the underlying price and to the time are read from the binomial lattice
+      if self.isAmerican():
+         lattice = AmericanKernels.americanLattice(spotPrice
+                                                   , contract.Strike
+                                                   , contract.Right == OptionRight.Call
+                                                   , tau
+                                                   , self.riskFreeRate if ir == None else ir
+                                                   , sigma
+                                                   , steps = self.parameters["latticeSteps"]
+                                                   , dividendYield = self.parameters["dividendYield"]
+                                                   )
+         delta = float(lattice["Delta"])
+         gamma = float(lattice["Gamma"])
+         theta = float(lattice["Theta"])/self.tradingDays
+
       # Lambda (a.k.a. elasticity or leverage)
       elasticity = delta * self.contractUtils.midPrice(contract)/spotPrice
       
@@ -417,35 +892,360 @@ class BSM:
                          , IV = sigma
                          , IR = self.riskFreeRate
                          , lastUpdated = self.context.Time
+                         , **{greek.lower(): float(value) for greek, value in higherOrderGreeks.items()}
                          )
       
       # Check if we need to save the Greeks as an attribute of the contract object
       if saveIt:
          contract.BSMGreeks = greeks
 
+      # Add the Greeks to the cache
+      if useCache:
+         self.greeksCache.put(cacheKey, (sigma, greeks))
+
+      # Keep the state of this computation as the starting point of the incremental refresh
+      if useIncremental:
+         self.greeksStats["full"] += 1
+         anchor = (sigma, delta, gamma, vega, theta, vomma, float(higherOrderGreeks["Vanna"]), float(higherOrderGreeks["Speed"]), float(higherOrderGreeks["Zomma"]))
+         # The expansion needs finite Greeks and a non-zero Vega (used to imply the change of the IV)
+         if vega > 0 and all(np.isfinite(value) for value in anchor):
+            self.greeksAnchors[contract.Symbol] = (self.context.Time, spotPrice, tau, self.contractUtils.midPrice(contract), greeks, anchor)
+         else:
+            self.greeksAnchors.pop(contract.Symbol, None)
+
       # Stop the timer
       self.context.executionTimer.stop()
    
       return greeks
+
+   # Refresh the Greeks of a contract with a Taylor expansion around the state of their last full computation:
+   #  - The change of the mid-price that is not explained by the move of the underlying (Delta/Gamma) and the time decay (Theta) is attributed to a change of the IV (Vega)
+   #  - Delta is updated through Gamma and Vanna, Gamma through Speed and Zomma, Vega through Vanna and Vomma. The other Greeks are kept
+   # Returns None if there is no previous computation for this contract or if the market has drifted beyond the error budget (a full recomputation is needed)
+   def incrementalGreeks(self, contract, spotPrice, saveIt = False):
+      # The anchors are only valid within the same day
+      currentDate = self.context.Time.date()
+      if currentDate != self.greeksAnchorsDt:
+         self.greeksAnchors.clear()
+         self.greeksAnchorsDt = currentDate
+         return None
+
+      # Get the state of the last full computation
+      anchor = self.greeksAnchors.get(contract.Symbol)
+      if anchor == None:
+         return None
+      anchorTime, anchorSpotPrice, anchorTau, anchorMidPrice, anchorGreeks, (sigma, delta, gamma, vega, theta, vomma, vanna, speed, zomma) = anchor
+
+      # Check the error budget: time elapsed
+      if self.context.Time - anchorTime > self.parameters["incrementalMaxTime"]:
+         return None
+      # Check the error budget: move of the underlying
+      dS = spotPrice - anchorSpotPrice
+      if abs(dS) > self.parameters["incrementalMaxSpotMove"] * anchorSpotPrice:
+         return None
+
+      # Time elapsed (in days, consistently with the Theta)
+      dDays = (anchorTau - self.optionTau(contract)) * self.tradingDays
+      # Get the mid-price of the contract
+      midPrice = self.contractUtils.midPrice(contract)
+      # Change of the mid-price explained by the move of the underlying and the time decay
+      dPrice = delta*dS + 0.5*gamma*dS**2 + theta*dDays
+      # The rest is attributed to a change of the IV
+      dSigma = (midPrice - anchorMidPrice - dPrice)/vega
+      # Check the error budget: change of the IV
+      if abs(dSigma) > self.parameters["incrementalMaxVolMove"]:
+         return None
+
+      # Update the Greeks
+      IV = sigma + dSigma
+      delta = delta + gamma*dS + vanna*dSigma
+      greeks = BSMGreeks(delta = delta
+                         , gamma = gamma + speed*dS + zomma*dSigma
+                         , vega = vega + vanna*dS + vomma*dSigma
+                         , theta = theta
+                         , rho = anchorGreeks.Rho
+                         , vomma = vomma
+                         , elasticity = delta * midPrice/spotPrice
+                         , IV = IV
+                         , IR = self.riskFreeRate
+                         , lastUpdated = self.context.Time
+                         , vanna = vanna
+                         , charm = anchorGreeks.Charm
+                         , speed = speed
+                         , zomma = zomma
+                         , color = anchorGreeks.Color
+                         , veta = anchorGreeks.Veta
+                         )
+
+      # Check if we need to save the IV and the Greeks as attributes of the contract object
+      if saveIt:
+         contract.BSMImpliedVolatility = IV
+         contract.BSMGreeks = greeks
+
+      self.greeksStats["incremental"] += 1
+      return greeks
+
+   # Key of the Greeks cache: identifies the market state used to compute the Greeks of a contract
+   def greeksCacheKey(self, contract, spotPrice, ir = None, midPrice = None):
+      # Use the risk free rate unless otherwise specified
+      if ir == None:
+         self.setRiskFreeRate()
+         ir = self.riskFreeRate
+      # Get the mid-price of the contract unless otherwise specified
+      if midPrice == None:
+         midPrice = self.contractUtils.midPrice(contract)
+      return (contract.Symbol, self.context.Time, float(spotPrice), float(midPrice), ir, self.tradingDays)
+
+   # Log the Greeks cache stats
+   def showGreeksCacheStats(self):
+      greeksCache = self.greeksCache
+      self.logger.info(f"Greeks Cache Stats (size: {len(greeksCache)}/{greeksCache.maxSize}):")
+      self.logger.info(f"  --> hits: {greeksCache.hits}")
+      self.logger.info(f"  --> misses: {greeksCache.misses}")
+      self.logger.info(f"  --> evictions: {greeksCache.evictions}")
+      self.logger.info(f"  --> hit rate: {greeksCache.hitRate():.2%}")
+      if self.parameters["incrementalGreeks"]:
+         greeksStats = self.greeksStats
+         self.logger.info(f"  --> full computations: {greeksStats['full']}")
+         self.logger.info(f"  --> incremental refreshes: {greeksStats['incremental']}")
    
    
+   # Convert a list of option rights into booleans (True -> Call)
+   def getIsCall(self, rights):
+      rights = np.asarray(rights)
+      if rights.dtype == bool:
+         return rights
+      return np.array([right == OptionRight.Call for right in rights], dtype = bool)
+
+   # Compute the DTE of a list of expiration dates as a fraction of the year
+   def getExpiryTaus(self, expiries, atTime = None):
+      # Drop the entries of the previous time bar
+      self.expiryTable.refresh(self.context.Time)
+      if atTime == None:
+         atTime = self.context.Time
+      # All contracts with the same expiry share the same tau: it is only computed once for each expiration date
+      return self.expiryTable.expiryTaus(expiries, atTime)
+
+   # Compute the Greeks for a whole chain in one vectorized pass.
+   #  - strikes, rights, expiries: one entry per contract (rights can be either OptionRight values or booleans -> True = Call)
+   #  - sigma: the volatility of each contract (or a single value for all of them). If None, the IV is implied from the mid-prices
+   #  - spotPrice, midPrices: price of the underlying and mid-price of each contract (or a single value for all of them)
+   # Returns a dictionary of NumPy arrays: Delta, Gamma, Vega, Theta, Rho, Vomma, Elasticity, IV, plus the intermediate d1, d2, price and tau
+   def computeChainGreeks(self, strikes, rights, expiries, sigma, spotPrice, midPrices = None, ir = None, atTime = None):
+      # Start the timer
+      self.context.executionTimer.start()
+
+      # Use the risk free rate unless otherwise specified
+      if ir is None:
+         self.setRiskFreeRate()
+         ir = self.riskFreeRate
+
+      # Convert the option rights into booleans (True -> Call)
+      isCall = self.getIsCall(rights)
+      # Get the DTE of each contract as a fraction of a year
+      tau = self.getExpiryTaus(expiries, atTime = atTime)
+
+      if sigma is None:
+         # Compute the Implied Volatility of each contract
+         sigma, converged, iterations = self.computeChainIV(strikes, isCall, expiries, midPrices, spotPrice, ir = ir, atTime = atTime)
+
+      # Compute all the Greeks in one pass
+      greeks = BSMKernels.bsmGreeks(spotPrice
+                                    , np.asarray(strikes, dtype = float)
+                                    , isCall
+                                    , tau
+                                    , ir
+                                    , sigma
+                                    , midPrice = midPrices
+                                    , tradingDays = self.tradingDays
+                                    )
+      # American model: the price and the sensitivities to the underlying price and to the time are read from the binomial lattice
+      if self.isAmerican():
+         lattice = AmericanKernels.americanLattice(spotPrice
+                                                   , np.asarray(strikes, dtype = float)
+                                                   , isCall
+                                                   , tau
+                                                   , ir
+                                                   , sigma
+                                                   , steps = self.parameters["latticeSteps"]
+                                                   , dividendYield = self.parameters["dividendYield"]
+                                                   )
+         greeks["price"] = lattice["price"]
+         greeks["Delta"] = lattice["Delta"]
+         greeks["Gamma"] = lattice["Gamma"]
+         greeks["Theta"] = lattice["Theta"]/self.tradingDays
+         if midPrices is not None:
+            greeks["Elasticity"] = greeks["Delta"] * np.asarray(midPrices, dtype = float) / spotPrice
+      greeks["IV"] = np.broadcast_to(np.asarray(sigma, dtype = float), tau.shape)
+      greeks["IR"] = ir
+      greeks["tau"] = tau
+
+      # Stop the timer
+      self.context.executionTimer.stop()
+
+      return greeks
+
+   # Get the vectorized pricing function of the current pricing model: f(spotPrice, strikePrice, isCall, tau, ir, sigma)
+   def getPriceFunction(self):
+      if self.isAmerican():
+         steps = self.parameters["latticeSteps"]
+         dividendYield = self.parameters["dividendYield"]
+         return lambda spotPrice, strikePrice, isCall, tau, ir, sigma: AmericanKernels.americanPrice(spotPrice, strikePrice, isCall, tau, ir, sigma
+                                                                                                   , steps = steps
+                                                                                                   , dividendYield = dividendYield
+                                                                                                   )
+      return BSMKernels.bsmPrice
+
+   # Compute the value of a multi-leg position across a grid of scenarios (spot prices x points in time x volatility shifts) in one vectorized pass.
+   #  - sides: signed quantity of each contract (+n -> Long, -n -> Short)
+   #  - spotPrices: price of the underlying in each scenario. If the rate is not specified and useParityForward is enabled, the legs of the expiries
+   #    with a Put-Call parity fit are priced with its spot price and rate (the same inputs used to solve their IV): the scenarios are then applied as
+   #    relative moves of the underlying price to the spot price of each leg
+   #  - atTimes: points in time at which the position is evaluated (default: current time)
+   #  - volShifts: absolute shifts applied to the volatility of each contract (default: no shift)
+   #  - sigma: the volatility of each contract (default: the Implied Volatility stored in the contract)
+   # Returns a NumPy array of shape (len(spotPrices), len(atTimes), len(volShifts))
+   def computeScenarioValues(self, contracts, sides, spotPrices, atTimes = None, volShifts = None, sigma = None, ir = None):
+      # Start the timer
+      self.context.executionTimer.start()
+
+      expiries = [contract.Expiry for contract in contracts]
+      spotPrices = np.asarray(spotPrices, dtype = float)
+
+      # Use the risk free rate unless otherwise specified
+      if ir is None:
+         if self.parameters["useParityForward"] and contracts:
+            # Spot price and rate of each leg (implied by the Put-Call parity of its expiry, if available)
+            underlyingPrice = self.contractUtils.getUnderlyingLastPrice(contracts[0])
+            legSpotPrices, ir = self.getParityInputs(expiries, [underlyingPrice] * len(contracts))
+            # Spot price of each leg in each scenario -> [spot, leg]
+            spotPrices = np.multiply.outer(spotPrices/underlyingPrice, legSpotPrices)
+         else:
+            self.setRiskFreeRate()
+            ir = self.riskFreeRate
+
+      # Evaluate the position at the current time unless otherwise specified
+      if atTimes is None:
+         atTimes = [self.context.Time]
+
+      # No volatility shift unless otherwise specified
+      if volShifts is None:
+         volShifts = [0.0]
+
+      # Use the Implied Volatility of each contract unless otherwise specified
+      if sigma is None:
+         sigma = [contract.BSMImpliedVolatility for contract in contracts]
+
+      # DTE of each contract at each point in time
+      tau = np.array([self.getExpiryTaus(expiries, atTime = atTime) for atTime in atTimes])
+
+      values = BSMKernels.bsmScenarioValues(spotPrices
+                                            , [contract.Strike for contract in contracts]
+                                            , self.getIsCall([contract.Right for contract in contracts])
+                                            , tau
+                                            , ir
+                                            , sigma
+                                            , sides
+                                            , volShifts = volShifts
+                                            , priceFunction = self.getPriceFunction()
+                                            )
+
+      # Stop the timer
+      self.context.executionTimer.stop()
+
+      return values
+
+
    # Compute and store the Greeks for a list of contracts
    def setGreeks(self, contracts, sigma = None, ir = None):
       # Start the timer
       self.context.executionTimer.start()
 
       if isinstance(contracts, list):
-         # Loop through all contracts
-         for contract in contracts:
-            # Get the current price of the underlying
-            spotPrice = self.contractUtils.getUnderlyingLastPrice(contract)
-            # Compute the Greeks for the contract
-            self.computeGreeks(contract, sigma = sigma, ir = ir, spotPrice = spotPrice, saveIt = True)
+         # Avoid recomputing the Greeks if we have already done it for this time bar
+         contracts = [contract for contract in contracts
+                        if not (hasattr(contract, "BSMGreeks") and contract.BSMGreeks.lastUpdated == self.context.Time)
+                      ]
+         if contracts:
+            # Get the current price of the underlying (only once for each underlying)
+            underlyingPrices = {}
+            spotPrices = []
+            for contract in contracts:
+               if contract.UnderlyingSymbol not in underlyingPrices:
+                  underlyingPrices[contract.UnderlyingSymbol] = self.contractUtils.getUnderlyingLastPrice(contract)
+               spotPrices.append(underlyingPrices[contract.UnderlyingSymbol])
+            midPrices = [self.contractUtils.midPrice(contract) for contract in contracts]
+            # Use the forward and the discount factor implied by the Put-Call parity of each expiry (if available), unless the rate has been specified
+            irs = [ir] * len(contracts)
+            useParityForward = ir == None and self.parameters["useParityForward"]
+            if useParityForward:
+               spotPrices, irs = self.getParityInputs([contract.Expiry for contract in contracts], spotPrices)
+               spotPrices = spotPrices.tolist()
+               irs = irs.tolist()
+
+            if sigma == None:
+               # Retrieve the Greeks that have already been computed for the current market state (possibly on a different instance of the contract)
+               cacheKeys = [self.greeksCacheKey(contract, spotPrice, ir = contractIR, midPrice = midPrice)
+                              for contract, spotPrice, contractIR, midPrice in zip(contracts, spotPrices, irs, midPrices)
+                            ]
+               missing = []
+               for n, (contract, cacheKey) in enumerate(zip(contracts, cacheKeys)):
+                  cachedEntry = self.greeksCache.get(cacheKey)
+                  if cachedEntry is None:
+                     missing.append(n)
+                  else:
+                     contract.BSMImpliedVolatility, contract.BSMGreeks = cachedEntry
+               # Only compute the Greeks of the contracts that were not in the cache
+               contracts = [contracts[n] for n in missing]
+               spotPrices = [spotPrices[n] for n in missing]
+               midPrices = [midPrices[n] for n in missing]
+               irs = [irs[n] for n in missing]
+               cacheKeys = [cacheKeys[n] for n in missing]
+
+         if contracts:
+            spotPrices = np.array(spotPrices, dtype = float)
+            # Rate of each contract (if implied by the Put-Call parity)
+            if useParityForward:
+               ir = np.array(irs, dtype = float)
+
+            # Collect the contract details
+            strikes = [contract.Strike for contract in contracts]
+            rights = [contract.Right for contract in contracts]
+            expiries = [contract.Expiry for contract in contracts]
+
+            if sigma == None:
+               # Compute the Implied Volatility of all the contracts in one pass (starting from the latest known IV of each contract)
+               symbols = [contract.Symbol for contract in contracts]
+               sigmas, converged, iterations = self.computeChainIV(strikes, rights, expiries, midPrices, spotPrices, ir = ir, symbols = symbols)
+               # Save the IV as an attribute of each contract object
+               for contract, IV in zip(contracts, sigmas):
+                  contract.BSMImpliedVolatility = float(IV)
+            else:
+               sigmas = sigma
+
+            # Compute the Greeks for all the contracts in one pass
+            greeks = self.computeChainGreeks(strikes
+                                             , rights
+                                             , expiries
+                                             , sigmas
+                                             , spotPrices
+                                             , midPrices = midPrices
+                                             , ir = ir
+                                             )
+
+            # Store the Greeks of all the contracts in a single block
+            greeksBlock = GreeksBlock(greeks, len(contracts), lastUpdated = self.context.Time)
+            # Attach a view of the block to each contract object
+            for n, contract in enumerate(contracts):
+               contract.BSMGreeks = greeksBlock[n]
+               # Add the Greeks to the cache
+               if sigma == None:
+                  self.greeksCache.put(cacheKeys[n], (contract.BSMImpliedVolatility, contract.BSMGreeks))
       else:
          # Get the current price of the underlying
          spotPrice = self.contractUtils.getUnderlyingLastPrice(contracts)
-         # Compute the Greeks on a single contract
-         self.computeGreeks(contracts, sigma = sigma, ir = ir, spotPrice = spotPrice, saveIt = True)
+         # Compute the Greeks on a single contract (at the current price of the underlying, or at the Put-Call parity forward of its expiry)
+         self.computeGreeks(contracts, sigma = sigma, ir = ir, saveIt = True)
          
          # Log the contract details
          self.logger.trace(f"Contract: {contracts.Symbol}")
@@ -469,21 +1269,100 @@ class BSM:
       return
    
 
-class BSMGreeks:
-   def __init__(self, delta = None, gamma = None, vega = None, theta = None, rho = None, vomma = None, elasticity = None, IV = None, IR = None, lastUpdated = None, precision = 5):
-      self.Delta = self.roundIt(delta, precision)
-      self.Gamma = self.roundIt(gamma, precision)
-      self.Vega = self.roundIt(vega, precision)
-      self.Theta = self.roundIt(theta, precision)
-      self.Rho = self.roundIt(rho, precision)
-      self.Vomma = self.roundIt(vomma, precision)
-      self.Elasticity = self.roundIt(elasticity, precision)
-      self.IV = self.roundIt(IV, precision)
-      self.IR = self.roundIt(IR, precision)
+# Greeks of a block of contracts (i.e. all the contracts priced in one pass), stored as a single 2D array with one row per contract and one column per Greek.
+# The values are kept at full precision: the rounding is only applied when they are reported (BSMGreeks.asDict)
+class GreeksBlock:
+
+   # Names of the columns
+   fields = ["Delta", "Gamma", "Vega", "Theta", "Rho", "Vomma", "Elasticity", "Vanna", "Charm", "Speed", "Zomma", "Color", "Veta", "IV", "IR"]
+   fieldIndex = {field: n for n, field in enumerate(fields)}
+   # Speed and Color can be very small for high priced underlyings: these are rounded to significant digits rather than decimal places
+   significantFields = {"Vanna", "Charm", "Speed", "Zomma", "Color", "Veta"}
+
+   __slots__ = ("values", "lastUpdated")
+
+   # columns: dictionary with the values of each Greek (one value per contract or a single value for all of them). Missing Greeks are set to NaN
+   def __init__(self, columns, size, lastUpdated = None):
+      self.values = np.full((size, len(GreeksBlock.fields)), np.nan)
+      for n, field in enumerate(GreeksBlock.fields):
+         value = columns.get(field)
+         if value is not None:
+            self.values[:, n] = value
       self.lastUpdated = lastUpdated
-      
+
+   def __len__(self):
+      return len(self.values)
+
+   # View of the Greeks of a single contract
+   def __getitem__(self, row):
+      return BSMGreeks(block = self, row = row)
+
+
+# Accessor of a Greek column of a BSMGreeks view
+def greeksField(column):
+   return property(lambda self: self.block.values[self.row, column])
+
+
+# Greeks of a single contract: a view on one row of a GreeksBlock (no data is copied).
+# It can also be created from individual values, in which case it owns a single row block
+class BSMGreeks:
+
+   __slots__ = ("block", "row", "precision")
+
+   def __init__(self, delta = None, gamma = None, vega = None, theta = None, rho = None, vomma = None, elasticity = None, IV = None, IR = None, lastUpdated = None, precision = 5
+                , vanna = None, charm = None, speed = None, zomma = None, color = None, veta = None, block = None, row = 0):
+      if block == None:
+         block = GreeksBlock({"Delta": delta, "Gamma": gamma, "Vega": vega, "Theta": theta, "Rho": rho, "Vomma": vomma, "Elasticity": elasticity
+                              , "Vanna": vanna, "Charm": charm, "Speed": speed, "Zomma": zomma, "Color": color, "Veta": veta, "IV": IV, "IR": IR
+                              }
+                             , 1
+                             , lastUpdated = lastUpdated
+                             )
+      self.block = block
+      self.row = row
+      # Precision used when reporting the values
+      self.precision = precision
+
+   Delta = greeksField(GreeksBlock.fieldIndex["Delta"])
+   Gamma = greeksField(GreeksBlock.fieldIndex["Gamma"])
+   Vega = greeksField(GreeksBlock.fieldIndex["Vega"])
+   Theta = greeksField(GreeksBlock.fieldIndex["Theta"])
+   Rho = greeksField(GreeksBlock.fieldIndex["Rho"])
+   Vomma = greeksField(GreeksBlock.fieldIndex["Vomma"])
+   Elasticity = greeksField(GreeksBlock.fieldIndex["Elasticity"])
+   Vanna = greeksField(GreeksBlock.fieldIndex["Vanna"])
+   Charm = greeksField(GreeksBlock.fieldIndex["Charm"])
+   Speed = greeksField(GreeksBlock.fieldIndex["Speed"])
+   Zomma = greeksField(GreeksBlock.fieldIndex["Zomma"])
+   Color = greeksField(GreeksBlock.fieldIndex["Color"])
+   Veta = greeksField(GreeksBlock.fieldIndex["Veta"])
+   IV = greeksField(GreeksBlock.fieldIndex["IV"])
+   IR = greeksField(GreeksBlock.fieldIndex["IR"])
+
+   @property
+   def lastUpdated(self):
+      return self.block.lastUpdated
+
+   # Get the (rounded) values as a dictionary
+   def asDict(self, precision = None):
+      precision = precision or self.precision
+      result = {}
+      for field, value in zip(GreeksBlock.fields, self.block.values[self.row].tolist()):
+         if field in GreeksBlock.significantFields:
+            result[field] = self.roundSignificant(value, precision)
+         else:
+            result[field] = self.roundIt(value, precision)
+      result["lastUpdated"] = self.lastUpdated
+      return result
+
    def roundIt(self, value, precision = None):
-      if precision:
+      if precision and value != None:
          return round(value, precision)
       else:
          return value
+
+   def roundSignificant(self, value, precision = None):
+      if precision and value != None:
+         return float(f"{value:.{precision}g}")
+      else:
+         return value
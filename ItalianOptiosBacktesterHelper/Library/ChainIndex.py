@@ -0,0 +1,212 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+import numpy as np
+from ContractUtils import *
+
+# Index of an option chain, built once per slice.
+# It behaves like the list of contracts it was built from (it can be iterated, indexed, etc.), so it can be passed anywhere a chain is expected.
+# In addition, the contracts are grouped by expiry and by type (Put/Call) into strike-sorted arrays (ChainSide), which are used by the StrategyBuilder
+# to answer the ATM, strike-range and price-range lookups with a binary search instead of filtering and sorting the whole chain every time.
+class ChainIndex:
+
+   def __init__(self, context, contracts, sides = None):
+      # Set the context
+      self.context = context
+      # Initialize the contract utils
+      self.contractUtils = ContractUtils(context)
+      # Contracts in the original order
+      self.contracts = list(contracts)
+      # Group the contracts by expiry (each group keeps the original order)
+      self.expiryGroups = {}
+      for contract in self.contracts:
+         self.expiryGroups.setdefault(contract.Expiry, []).append(contract)
+      # Strike-sorted arrays, built on first use for each (expiry, right). This is shared with the indexes returned by filterByExpiry
+      self.sides = {} if sides == None else sides
+
+   def __iter__(self):
+      return iter(self.contracts)
+
+   def __len__(self):
+      return len(self.contracts)
+
+   def __getitem__(self, key):
+      return self.contracts[key]
+
+   def __bool__(self):
+      return len(self.contracts) > 0
+
+   # List of expiry dates in the chain
+   def expiries(self):
+      return list(self.expiryGroups)
+
+   # Returns True if all the contracts have the same expiry date
+   def isSingleExpiry(self):
+      return len(self.expiryGroups) == 1
+
+   # Return a new index with only the contracts expiring on the given date
+   def filterByExpiry(self, expiry):
+      return ChainIndex(self.context, self.expiryGroups.get(expiry, []), sides = self.sides)
+
+   # Get the strike-sorted contracts of the given type (OptionRight.Put|OptionRight.Call) expiring on the given date.
+   # The expiry can be omitted if the index contains a single expiry date.
+   def getSide(self, right, expiry = None):
+      if expiry == None:
+         if not self.expiryGroups:
+            return ChainSide(self.contractUtils, [])
+         if not self.isSingleExpiry():
+            raise ValueError("The expiry must be specified when the chain contains multiple expiration dates")
+         expiry = next(iter(self.expiryGroups))
+      key = (expiry, right)
+      if key not in self.sides:
+         # Get the contracts of the requested type, along with their position within the expiry group
+         contracts = [(n, contract) for n, contract in enumerate(self.expiryGroups.get(expiry, [])) if contract.Right == right]
+         self.sides[key] = ChainSide(self.contractUtils
+                                     , [contract for n, contract in contracts]
+                                     , positions = [n for n, contract in contracts]
+                                     )
+      return self.sides[key]
+
+
+# Contracts of a single type and expiry, sorted by ascending strike (contracts with the same strike keep their original order)
+class ChainSide:
+
+   def __init__(self, contractUtils, contracts, positions = None):
+      self.contractUtils = contractUtils
+      # Position of each contract in the original list (used to preserve the original order when combining multiple sides)
+      if positions == None:
+         positions = range(len(contracts))
+      # Sort the contracts by strike
+      order = sorted(range(len(contracts)), key = lambda n: contracts[n].Strike)
+      self.contracts = [contracts[n] for n in order]
+      self.positions = [positions[n] for n in order]
+      self.strikes = np.array([contract.Strike for contract in self.contracts], dtype = float)
+      self.symbols = [contract.Symbol for contract in self.contracts]
+      # Prices are only pulled when needed
+      self.bids = None
+      self.asks = None
+      self.mids = None
+
+   def __len__(self):
+      return len(self.contracts)
+
+   # Pull the bid/ask/mid prices of all the contracts
+   def loadPrices(self):
+      securities = [self.contractUtils.getSecurity(contract) for contract in self.contracts]
+      self.bids = np.array([security.BidPrice for security in securities], dtype = float)
+      self.asks = np.array([security.AskPrice for security in securities], dtype = float)
+      self.mids = 0.5*(self.bids + self.asks)
+
+   def getMids(self):
+      if self.mids is None:
+         self.loadPrices()
+      return self.mids
+
+   # Get the range of positions [start, end) of the contracts with fromStrike <= Strike <= toStrike
+   def strikeRange(self, fromStrike = None, toStrike = None):
+      start = 0 if fromStrike == None else int(np.searchsorted(self.strikes, fromStrike, side = "left"))
+      end = len(self.strikes) if toStrike == None else int(np.searchsorted(self.strikes, toStrike, side = "right"))
+      return start, max(start, end)
+
+   # Get the contracts (sorted by ascending strike) within the given Strike and mid-price ranges
+   def getContracts(self, fromStrike = 0, toStrike = float("inf"), fromPrice = 0, toPrice = float("inf")):
+      start, end = self.strikeRange(fromStrike, toStrike)
+      mids = self.getMids()[start:end]
+      # Price constraint (based on the mid-price)
+      idx = np.flatnonzero((fromPrice <= mids) & (mids <= toPrice)) + start
+      return [self.contracts[n] for n in idx]
+
+   # Get the candidates for the n contracts with the strike closest to the given price: the n closest strikes are all within n positions on either side of
+   # the insertion point. Returns a list of tuples (position, contract) sorted by ascending strike
+   def nearest(self, price, n = 1):
+      idx = int(np.searchsorted(self.strikes, price))
+      return [(self.positions[k], self.contracts[k]) for k in range(max(0, idx - n), min(len(self.strikes), idx + n))]
+
+
+# Snapshot of the option chain at a given time bar, built once and shared (read-only) by all the strategies.
+# On top of the ChainIndex (contracts bucketed by expiry and right, strike-sorted quote arrays), it keeps the market state resolved for the bar:
+#  - the price of the underlying (resolved once for each underlying)
+#  - the list of expiries within each DTE range requested by the strategies
+#  - the per-expiry preparation for pricing (Put-Call parity forward, volatility smile, Greeks of the whole expiry), done at most once per bar
+# The snapshots returned by filterByExpiry share this state with the parent, so an expiry prepared by one strategy is not prepared again by the next one.
+class ChainSnapshot(ChainIndex):
+
+   def __init__(self, context, contracts, sides = None, state = None):
+      super().__init__(context, contracts, sides = sides)
+      # State shared by the snapshot of the whole chain and by all the snapshots returned by filterByExpiry
+      if state == None:
+         state = {"time": context.Time, "spotPrices": {}, "expiryLists": {}, "prepared": set()}
+         # Register the new expiries of the chain in the calendar of the algorithm (if any) and drop the past ones
+         expiryCalendar = getattr(context, "expiryCalendar", None)
+         if expiryCalendar != None:
+            expiryCalendar.update(self.expiryGroups)
+            expiryCalendar.evict(context.Time.date())
+      self.state = state
+
+   # Time bar of the snapshot
+   @property
+   def time(self):
+      return self.state["time"]
+
+   # Return a new snapshot with only the contracts expiring on the given date
+   def filterByExpiry(self, expiry):
+      return ChainSnapshot(self.context, self.expiryGroups.get(expiry, []), sides = self.sides, state = self.state)
+
+   # Price of the underlying of the given contract (the first contract of the chain if not specified)
+   def getSpotPrice(self, contract = None):
+      if contract == None:
+         if not self.contracts:
+            return None
+         contract = self.contracts[0]
+      spotPrices = self.state["spotPrices"]
+      if contract.UnderlyingSymbol not in spotPrices:
+         spotPrices[contract.UnderlyingSymbol] = self.contractUtils.getUnderlyingLastPrice(contract)
+      return spotPrices[contract.UnderlyingSymbol]
+
+   # List of the expiry dates with minDte <= DTE <= maxDte, sorted in reverse order (computed once for each DTE range)
+   def getExpiryList(self, minDte, maxDte):
+      key = (minDte, maxDte)
+      expiryLists = self.state["expiryLists"]
+      if key not in expiryLists:
+         currentDate = self.time.date()
+         expiryCalendar = getattr(self.context, "expiryCalendar", None)
+         if expiryCalendar != None:
+            # Binary search on the calendar, keeping only the expiries with contracts in this chain
+            expiryLists[key] = [expiry for expiry in expiryCalendar.getExpiries(currentDate, minDte, maxDte, reverse = True) if expiry in self.expiryGroups]
+         else:
+            expiryLists[key] = sorted([expiry for expiry in self.expiryGroups if minDte <= (expiry.date() - currentDate).days <= maxDte], reverse = True)
+      return expiryLists[key]
+
+   # Prepare the pricing of the contracts of an expiry (only once per bar, regardless of how many strategies request it):
+   #  - fit the forward from the Put-Call parity and the volatility smile (if enabled in the BSM parameters)
+   #  - compute the Greeks of all the contracts (computeGreeks = True)
+   # The fitted forwards and smiles are shared by all the BSM instances of the algorithm, and the Greeks are stored in the contract objects
+   def prepareExpiry(self, expiry, bsm, computeGreeks = False):
+      prepared = self.state["prepared"]
+      contracts = self.expiryGroups.get(expiry, [])
+      if (expiry, "fits") not in prepared:
+         prepared.add((expiry, "fits"))
+         if bsm.parameters["useParityForward"]:
+            bsm.fitParityForwards(contracts)
+         if bsm.parameters["useVolSmile"]:
+            bsm.fitVolSmiles(contracts)
+      if computeGreeks and (expiry, "greeks") not in prepared:
+         prepared.add((expiry, "greeks"))
+         bsm.setGreeks(list(contracts))
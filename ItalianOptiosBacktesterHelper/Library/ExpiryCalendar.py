@@ -0,0 +1,81 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+import numpy as np
+from bisect import bisect_left
+
+# Sorted calendar of the expiration dates of the option universe, maintained incrementally:
+#  - new expiries are inserted as they are listed (OnSecuritiesChanged) or first seen in a chain
+#  - past expiries are evicted once a day
+# The expiries with a DTE in a given range are found with a binary search on the array of dates, instead of collecting and sorting the expiry
+# of every contract in the chain at every scheduled run.
+class ExpiryCalendar:
+
+   def __init__(self):
+      # Expiration dates (sorted in ascending order)
+      self.expiries = []
+      # Day number (ordinal) of each expiration date, used for the binary search
+      self.ordinals = np.zeros(0, dtype = int)
+      # Set of the expiries in the calendar (fast membership test)
+      self.known = set()
+      # Date of the last eviction
+      self.lastEvictedDt = None
+
+   def __len__(self):
+      return len(self.expiries)
+
+   def __contains__(self, expiry):
+      return expiry in self.known
+
+   # Add an expiration date to the calendar. Returns True if the date was not already in the calendar
+   def add(self, expiry):
+      if expiry in self.known:
+         return False
+      self.known.add(expiry)
+      position = bisect_left(self.expiries, expiry)
+      self.expiries.insert(position, expiry)
+      self.ordinals = np.insert(self.ordinals, position, expiry.toordinal())
+      return True
+
+   # Add a list of expiration dates. Returns the number of new dates
+   def update(self, expiries):
+      return sum(self.add(expiry) for expiry in expiries if expiry not in self.known)
+
+   # Remove the expiration dates before the given date (only once a day)
+   def evict(self, currentDate):
+      if currentDate == self.lastEvictedDt:
+         return
+      self.lastEvictedDt = currentDate
+      position = int(np.searchsorted(self.ordinals, currentDate.toordinal(), side = "left"))
+      if position > 0:
+         self.known.difference_update(self.expiries[:position])
+         self.expiries = self.expiries[position:]
+         self.ordinals = self.ordinals[position:]
+
+   # Get the expiration dates with minDte <= DTE <= maxDte (DTE in calendar days from currentDate), sorted in ascending order (reverse = False) or
+   # in reverse order (reverse = True)
+   def getExpiries(self, currentDate, minDte, maxDte, reverse = False):
+      currentOrdinal = currentDate.toordinal()
+      start = int(np.searchsorted(self.ordinals, currentOrdinal + minDte, side = "left"))
+      end = int(np.searchsorted(self.ordinals, currentOrdinal + maxDte, side = "right"))
+      expiries = self.expiries[start:max(start, end)]
+      if reverse:
+         expiries.reverse()
+      return expiries
@@ -0,0 +1,156 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+import json
+import numpy as np
+from datetime import datetime, timedelta
+
+# Regular trading session of each day, read from the LEAN market hours database (data/market-hours/market-hours-database.json).
+# Only the "market" segments are used: the session of a date starts at the first market segment and ends at the last one, unless the date is a holiday
+# (no session) or an early close. All times are expressed in the time zone of the selected entry.
+class TradingCalendar:
+
+   # Parsed entries, keyed by (path, entry): the database is only read once
+   loadedEntries = {}
+
+   weekdays = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+   def __init__(self, path, entry = "Equity-usa-[*]"):
+      key = (path, entry)
+      if key not in TradingCalendar.loadedEntries:
+         with open(path) as file:
+            TradingCalendar.loadedEntries[key] = json.load(file)["entries"][entry]
+      hours = TradingCalendar.loadedEntries[key]
+      # Regular session of each weekday (None -> market closed)
+      self.sessions = []
+      for weekday in TradingCalendar.weekdays:
+         segments = [segment for segment in hours.get(weekday, []) if segment["state"] == "market"]
+         if segments:
+            self.sessions.append((self.parseTime(segments[0]["start"]), self.parseTime(segments[-1]["end"])))
+         else:
+            self.sessions.append(None)
+      # Holidays and early closes / late opens
+      self.holidays = set(datetime.strptime(day, "%m/%d/%Y").date() for day in hours.get("holidays", []))
+      self.earlyCloses = {datetime.strptime(day, "%m/%d/%Y").date(): self.parseTime(time) for day, time in hours.get("earlyCloses", {}).items()}
+      self.lateOpens = {datetime.strptime(day, "%m/%d/%Y").date(): self.parseTime(time) for day, time in hours.get("lateOpens", {}).items()}
+
+   # Convert a time string (hh:mm:ss or d:hh:mm:ss) into a timedelta since midnight
+   def parseTime(self, value):
+      fields = [int(field) for field in value.split(":")]
+      if len(fields) == 4:
+         days, hours, minutes, seconds = fields
+      else:
+         days, (hours, minutes, seconds) = 0, fields
+      return timedelta(days = days, hours = hours, minutes = minutes, seconds = seconds)
+
+   # Open and close of the regular session of the given date: (open, close) datetimes or None if the market is closed
+   def session(self, day):
+      session = self.sessions[day.weekday()]
+      if session is None or day in self.holidays:
+         return None
+      start, end = session
+      midnight = datetime(day.year, day.month, day.day)
+      return midnight + self.lateOpens.get(day, start), midnight + self.earlyCloses.get(day, end)
+
+
+# Time to expiration (tau), its square root and the discount factors of each expiry, computed once per time bar.
+# All the contracts of an expiry share the same tau, so the scalar methods of the BSM class (called for every Greek of every contract) and the
+# vectorized chain computations all read it from here instead of recomputing the time difference, the 0-DTE fraction, sqrt(tau) and exp(-r*tau).
+# The table is cleared at the start of each time bar.
+class ExpiryTable:
+
+   def __init__(self, tradingDays = 365.0, calendar = None, sessionMinutes = 390.0):
+      # Number of days in a year
+      self.tradingDays = tradingDays
+      # Trading calendar used to compute the time left on the expiration day (0-DTE). None -> assume the market closes at 16:00
+      self.calendar = calendar
+      # Length of a regular session in minutes (390 minutes = 6.5h -> from 9:30 to 16:00)
+      self.sessionMinutes = sessionMinutes
+      # Time bar of the current entries
+      self.lastUpdated = None
+      # (expiry, atTime) -> tau
+      self.taus = {}
+      # tau -> sqrt(tau)
+      self.sqrtTaus = {}
+      # (tau, ir) -> exp(-ir*tau)
+      self.discountFactors = {}
+      # Stats
+      self.hits = 0
+      self.misses = 0
+
+   def __len__(self):
+      return len(self.taus)
+
+   # Start a new time bar: drop the entries of the previous one
+   def refresh(self, currentTime):
+      if currentTime != self.lastUpdated:
+         self.lastUpdated = currentTime
+         self.taus.clear()
+         self.sqrtTaus.clear()
+         self.discountFactors.clear()
+
+   # DTE of an expiration date as a fraction of the year
+   def tau(self, expiry, atTime):
+      key = (expiry, atTime)
+      tau = self.taus.get(key)
+      if tau is None:
+         self.misses += 1
+         tau = self.computeTau(expiry, atTime)
+         self.taus[key] = tau
+      else:
+         self.hits += 1
+      return tau
+
+   # DTE of a list of expiration dates as a fraction of the year (NumPy array)
+   def expiryTaus(self, expiries, atTime):
+      return np.array([self.tau(expiry, atTime) for expiry in expiries], dtype = float)
+
+   # sqrt(tau)
+   def sqrtTau(self, tau):
+      sqrtTau = self.sqrtTaus.get(tau)
+      if sqrtTau is None:
+         sqrtTau = np.sqrt(tau)
+         self.sqrtTaus[tau] = sqrtTau
+      return sqrtTau
+
+   # e^(-r*tau)
+   def discountFactor(self, tau, ir):
+      key = (tau, ir)
+      discountFactor = self.discountFactors.get(key)
+      if discountFactor is None:
+         discountFactor = np.exp(-ir*tau)
+         self.discountFactors[key] = discountFactor
+      return discountFactor
+
+   def computeTau(self, expiry, atTime):
+      # Get the expiration date and add 16 hours to the market close
+      expiryDttm = expiry + timedelta(hours = 16)
+      # Time until market close
+      timeDiff = expiryDttm - atTime
+      # Days to expiration: use the fraction of minutes until market close in case of 0-DTE (390 minutes = 6.5h -> from 9:30 to 16:00)
+      dte = max(0, timeDiff.days, timeDiff.seconds/(60.0*self.sessionMinutes))
+      # Use the actual trading minutes left on the expiration day (early closes, time before the open) if the calendar is available
+      if self.calendar != None and atTime.date() == expiry.date():
+         session = self.calendar.session(expiry.date())
+         if session != None:
+            sessionOpen, sessionClose = session
+            dte = max(0.0, (sessionClose - max(atTime, sessionOpen)).total_seconds())/(60.0*self.sessionMinutes)
+      # DTE as a fraction of a year
+      return dte/self.tradingDays
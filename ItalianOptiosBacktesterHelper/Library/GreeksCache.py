@@ -0,0 +1,71 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+from collections import OrderedDict
+
+# Size-bounded LRU cache of the Greeks computed by the BSM model.
+# The entries are keyed by the market state used to compute them (Symbol, time, spot price, mid-price, interest rate, ...), so the results
+# are shared by all the OptionContract objects referring to the same contract within a time bar, regardless of which instance they were computed on.
+class GreeksCache:
+
+   def __init__(self, maxSize = 10000):
+      # Maximum number of entries
+      self.maxSize = maxSize
+      # Cached entries (the most recently used ones are at the end)
+      self.entries = OrderedDict()
+      # Stats
+      self.hits = 0
+      self.misses = 0
+      self.evictions = 0
+
+   def __len__(self):
+      return len(self.entries)
+
+   def __contains__(self, key):
+      return key in self.entries
+
+   # Get the entry for the given key (None if not found)
+   def get(self, key):
+      entry = self.entries.get(key)
+      if entry is None:
+         self.misses += 1
+      else:
+         self.hits += 1
+         # Mark the entry as the most recently used
+         self.entries.move_to_end(key)
+      return entry
+
+   # Add an entry to the cache, evicting the least recently used ones if the cache is full
+   def put(self, key, entry):
+      self.entries[key] = entry
+      self.entries.move_to_end(key)
+      while len(self.entries) > self.maxSize:
+         self.entries.popitem(last = False)
+         self.evictions += 1
+
+   def clear(self):
+      self.entries.clear()
+
+   # Fraction of lookups that have been served from the cache
+   def hitRate(self):
+      lookups = self.hits + self.misses
+      if lookups == 0:
+         return 0.0
+      return self.hits/lookups
@@ -0,0 +1,101 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+import numpy as np
+
+# Keeps the state of the latest IV calculation of each contract (keyed by Symbol) across time bars.
+# The OptionContract objects are created from scratch at every slice, so they cannot be used to carry this information from one bar to the next.
+# The data is stored in NumPy arrays (one slot per contract) so it can be read/written for a whole chain at once.
+class IVStore:
+
+   def __init__(self, capacity = 1024):
+      # Map each Symbol to its slot
+      self.slots = {}
+      # List of the slots that have been released (expired contracts)
+      self.freeSlots = []
+      # Symbol stored in each slot
+      self.symbols = [None] * capacity
+      # Expiration date of the contract (ordinal)
+      self.expiry = np.zeros(capacity, dtype = int)
+      # Latest IV
+      self.IV = np.full(capacity, np.nan)
+      # Price of the underlying at the time of the latest IV calculation
+      self.spotPrice = np.full(capacity, np.nan)
+      # Mid-price of the contract at the time of the latest IV calculation
+      self.midPrice = np.full(capacity, np.nan)
+      # Date (ordinal) of the latest IV calculation
+      self.lastUpdated = np.zeros(capacity, dtype = int)
+      # Number of slots used so far
+      self.size = 0
+
+   def __len__(self):
+      return len(self.slots)
+
+   # Double the size of all the arrays
+   def grow(self):
+      capacity = len(self.symbols)
+      self.symbols.extend([None] * capacity)
+      self.expiry = np.concatenate([self.expiry, np.zeros(capacity, dtype = int)])
+      self.IV = np.concatenate([self.IV, np.full(capacity, np.nan)])
+      self.spotPrice = np.concatenate([self.spotPrice, np.full(capacity, np.nan)])
+      self.midPrice = np.concatenate([self.midPrice, np.full(capacity, np.nan)])
+      self.lastUpdated = np.concatenate([self.lastUpdated, np.zeros(capacity, dtype = int)])
+
+   # Get the slot of each Symbol (a new slot is assigned to the Symbols that are not in the store yet)
+   def getSlots(self, symbols, expiries):
+      slots = np.empty(len(symbols), dtype = int)
+      for n, (symbol, expiry) in enumerate(zip(symbols, expiries)):
+         slot = self.slots.get(symbol)
+         if slot == None:
+            # Reuse a free slot if available, else take the next one
+            if self.freeSlots:
+               slot = self.freeSlots.pop()
+            else:
+               if self.size == len(self.symbols):
+                  self.grow()
+               slot = self.size
+               self.size += 1
+            # Initialize the slot
+            self.slots[symbol] = slot
+            self.symbols[slot] = symbol
+            self.expiry[slot] = expiry.toordinal()
+            self.IV[slot] = np.nan
+            self.spotPrice[slot] = np.nan
+            self.midPrice[slot] = np.nan
+            self.lastUpdated[slot] = 0
+         slots[n] = slot
+      return slots
+
+   # Store the result of the latest IV calculation
+   def update(self, slots, IV, spotPrice, midPrice, lastUpdated):
+      self.IV[slots] = IV
+      self.spotPrice[slots] = spotPrice
+      self.midPrice[slots] = midPrice
+      self.lastUpdated[slots] = lastUpdated.toordinal()
+
+   # Release the slots of all the contracts that have expired before the given date
+   def evictExpired(self, currentDate):
+      currentDate = currentDate.toordinal()
+      for symbol in list(self.slots):
+         slot = self.slots[symbol]
+         if self.expiry[slot] < currentDate:
+            self.slots.pop(symbol)
+            self.symbols[slot] = None
+            self.freeSlots.append(slot)
@@ -0,0 +1,139 @@
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+# Standard normal CDF/PDF (and inverse CDF) kernels used by the pricing code.
+# scipy.stats.norm.cdf/pdf validate the arguments and dispatch through the distribution object on every call, which dominates the cost when they are
+# called on single floats. These functions go straight to math.erfc/math.exp for scalars and to the scipy.special.ndtr / np.exp ufuncs for arrays.
+# Optionally (useNormTable), both functions can be evaluated by linear interpolation on a precomputed table with a given maximum absolute error.
+
+import math
+import numpy as np
+from scipy.special import ndtr
+
+# 1/sqrt(2)
+invSqrt2 = 1.0/math.sqrt(2.0)
+# 1/sqrt(2*pi)
+invSqrt2Pi = 1.0/math.sqrt(2.0*math.pi)
+
+# Interpolation table currently in use (None -> exact evaluation)
+normTable = None
+
+
+# Precomputed CDF/PDF values on a uniform grid, evaluated by linear interpolation.
+# The error of the linear interpolation is bounded by h^2/8 * max|f''| (h = grid step), with max|CDF''| = PDF(1) and max|PDF''| = PDF(0):
+# the step is chosen so that the error of both functions stays below the requested accuracy.
+class NormTable:
+   def __init__(self, accuracy = 1e-7):
+      self.accuracy = accuracy
+      # Grid step
+      self.step = math.sqrt(8.0 * accuracy / invSqrt2Pi)
+      # Beyond this point the PDF is within the accuracy from 0 (and so is the CDF from 0/1, since the tail is smaller than the PDF for x > 1)
+      self.xMax = 1.0
+      while math.exp(-0.5*self.xMax**2)*invSqrt2Pi > accuracy:
+         self.xMax += 0.5
+      # Number of intervals
+      self.size = int(math.ceil(2.0*self.xMax/self.step))
+      self.step = 2.0*self.xMax/self.size
+      self.invStep = 1.0/self.step
+      # Grid and tabulated values
+      self.x = np.linspace(-self.xMax, self.xMax, self.size + 1)
+      self.cdfValues = ndtr(self.x)
+      self.pdfValues = np.exp(-0.5*self.x**2) * invSqrt2Pi
+      # Python lists are faster than NumPy arrays when accessing a single element
+      self.cdfList = self.cdfValues.tolist()
+      self.pdfList = self.pdfValues.tolist()
+
+   def interpolate(self, x, values, valueList, left, right):
+      if isinstance(x, float):
+         # Position of x on the grid
+         u = (x + self.xMax)*self.invStep
+         if u != u:
+            # NaN
+            return u
+         if u <= 0:
+            return left
+         if u >= self.size:
+            return right
+         n = int(u)
+         return valueList[n] + (u - n)*(valueList[n+1] - valueList[n])
+      else:
+         # Position of x on the grid (the grid is uniform, so there is no need for a binary search)
+         u = (np.asarray(x, dtype = float) + self.xMax)*self.invStep
+         isNaN = np.isnan(u)
+         u = np.clip(np.where(isNaN, 0.0, u), 0.0, self.size)
+         n = np.minimum(u.astype(np.intp), self.size - 1)
+         result = values[n] + (u - n)*(values[n+1] - values[n])
+         # Propagate NaN
+         return np.where(isNaN, np.nan, result)
+
+   def cdf(self, x):
+      return self.interpolate(x, self.cdfValues, self.cdfList, 0.0, 1.0)
+
+   def pdf(self, x):
+      return self.interpolate(x, self.pdfValues, self.pdfList, 0.0, 0.0)
+
+
+# Switch to the table-interpolated approximation with the given maximum absolute error (None -> switch back to the exact evaluation).
+# This is a global setting: it affects all the callers of normCdf/normPdf
+def useNormTable(accuracy = 1e-7):
+   global normTable
+   if accuracy == None:
+      normTable = None
+   elif normTable == None or normTable.accuracy != accuracy:
+      normTable = NormTable(accuracy)
+   return normTable
+
+
+# Cumulative distribution function of the standard normal distribution
+def normCdf(x):
+   if normTable != None:
+      return normTable.cdf(x)
+   if isinstance(x, float):
+      return 0.5*math.erfc(-x*invSqrt2)
+   return ndtr(x)
+
+
+# Probability density function of the standard normal distribution
+def normPdf(x):
+   if normTable != None:
+      return normTable.pdf(x)
+   if isinstance(x, float):
+      return math.exp(-0.5*x*x)*invSqrt2Pi
+   return np.exp(-0.5*np.square(x))*invSqrt2Pi
+
+
+# Coefficients of the rational approximation of the inverse CDF (P. J. Acklam): central region and tails
+ppfA = [-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02, 1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00]
+ppfB = [-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02, 6.680131188771972e+01, -1.328068155288572e+01, 1.0]
+ppfC = [-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00, -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00]
+ppfD = [7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00, 1.0]
+# The tails are used below this probability (and above 1 - ppfLow)
+ppfLow = 0.02425
+
+
+# Inverse of the standard normal CDF (rational approximation, relative error below 1.2e-9). NaN outside of the interval (0, 1)
+def normPpf(p):
+   p = np.asarray(p, dtype = float)
+   with np.errstate(divide = "ignore", invalid = "ignore"):
+      # Central region
+      q = p - 0.5
+      r = q*q
+      central = np.polyval(ppfA, r)*q/np.polyval(ppfB, r)
+      # Tails
+      t = np.sqrt(-2.0*np.log(np.minimum(p, 1.0 - p)))
+      tail = np.polyval(ppfC, t)/np.polyval(ppfD, t)
+      result = np.where(np.abs(q) <= 0.5 - ppfLow, central, np.where(q < 0, tail, -tail))
+   return np.where((p > 0) & (p < 1), result, np.nan)
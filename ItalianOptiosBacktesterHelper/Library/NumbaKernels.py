@@ -0,0 +1,329 @@
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+# Compiled (Numba) backend of the core BSMKernels: price, Greeks and Implied Volatility.
+# Each kernel is a plain loop over the contracts that evaluates the same formulas as the NumPy version, element by element, so there are no
+# temporary arrays and the IV search of each contract stops as soon as it converges. The edge cases (tau = 0 or sigma = 0) follow the same
+# conventions as BSMKernels, and the results match the NumPy path to the last few ulps (the normal CDF is evaluated with erfc instead of scipy's ndtr).
+# Numba is an optional dependency: if it cannot be imported, available is False and BSMKernels stays on the NumPy path. The kernels below are
+# still defined (as plain Python functions), which keeps them testable without Numba but far too slow for any real use.
+
+import math
+import numpy as np
+
+try:
+   from numba import njit
+   available = True
+except ImportError:
+   available = False
+
+   # No-op replacement of the Numba decorator
+   def njit(*args, **kwargs):
+      if len(args) == 1 and callable(args[0]):
+         return args[0]
+      return lambda func: func
+
+# 1/sqrt(2)
+invSqrt2 = 1.0/math.sqrt(2.0)
+# 1/sqrt(2*pi)
+invSqrt2Pi = 1.0/math.sqrt(2.0*math.pi)
+
+# Coefficients of the rational approximation of the inverse normal CDF (same as NormKernels, as tuples so that Numba treats them as constants)
+ppfA = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02, 1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+ppfB = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02, 6.680131188771972e+01, -1.328068155288572e+01)
+ppfC = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00, -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+ppfD = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
+ppfLow = 0.02425
+
+# Greeks returned by greeksKernel (in this order)
+greeksFields = ["d1", "d2", "price", "Delta", "Gamma", "Vega", "Theta", "Rho", "Vomma", "Vanna", "Charm", "Speed", "Zomma", "Color", "Veta"]
+
+
+# IEEE division (plain Python raises ZeroDivisionError, NumPy returns +/-Inf or NaN)
+@njit(cache = True)
+def ieeeDiv(a, b):
+   if b == 0.0:
+      if a == 0.0 or a != a:
+         return math.nan
+      return math.copysign(math.inf, a) * math.copysign(1.0, b)
+   return a/b
+
+
+# IEEE logarithm (plain Python raises ValueError for x <= 0)
+@njit(cache = True)
+def ieeeLog(x):
+   if x == 0.0:
+      return -math.inf
+   if not x > 0.0:
+      return math.nan
+   return math.log(x)
+
+
+@njit(cache = True)
+def normCdf(x):
+   return 0.5*math.erfc(-x*invSqrt2)
+
+
+@njit(cache = True)
+def normPdf(x):
+   return math.exp(-0.5*x*x)*invSqrt2Pi
+
+
+@njit(cache = True)
+def d1d2(spotPrice, strikePrice, isCall, tau, ir, sigma):
+   sigmaSqrtTau = sigma * math.sqrt(tau)
+   if tau == 0.0 or sigma == 0.0:
+      # Edge cases: Deep ITM options -> Call: d1 = Inf, Put: d1 = -Inf. Far OTM options -> Call: d1 = -Inf, Put: d1 = Inf
+      sign = 1.0 if isCall else -1.0
+      itm = strikePrice < spotPrice if isCall else spotPrice < strikePrice
+      d1 = (sign if itm else -sign) * math.inf
+   else:
+      d1 = (ieeeLog(ieeeDiv(spotPrice, strikePrice)) + (ir + 0.5*sigma**2)*tau)/sigmaSqrtTau
+   return d1, d1 - sigmaSqrtTau
+
+
+@njit(cache = True)
+def price(spotPrice, strikePrice, isCall, tau, ir, sigma):
+   d1, d2 = d1d2(spotPrice, strikePrice, isCall, tau, ir, sigma)
+   Xert = strikePrice * math.exp(-ir*tau)
+   if isCall:
+      return normCdf(d1)*spotPrice - normCdf(d2)*Xert
+   return normCdf(-d2)*Xert - normCdf(-d1)*spotPrice
+
+
+@njit(cache = True)
+def priceKernel(spotPrice, strikePrice, isCall, tau, ir, sigma, out):
+   for i in range(out.size):
+      out[i] = price(spotPrice[i], strikePrice[i], isCall[i], tau[i], ir[i], sigma[i])
+
+
+@njit(cache = True)
+def greeksKernel(spotPrice, strikePrice, isCall, tau, ir, sigma, tradingDays, out):
+   for i in range(spotPrice.size):
+      S = spotPrice[i]
+      K = strikePrice[i]
+      t = tau[i]
+      r = ir[i]
+      s = sigma[i]
+      d1, d2 = d1d2(S, K, isCall[i], t, r, s)
+      sqrtTau = math.sqrt(t)
+      pdfD1 = normPdf(d1)
+      Xert = K * math.exp(-r*t)
+      # Price, Delta, Theta and Rho
+      SNs = ieeeDiv(-(S * pdfD1 * s), 2.0 * sqrtTau)
+      rXert = r * Xert
+      if isCall[i]:
+         cdfD1 = normCdf(d1)
+         cdfD2 = normCdf(d2)
+         out[2, i] = cdfD1*S - cdfD2*Xert
+         out[3, i] = cdfD1
+         out[6, i] = (SNs - rXert * cdfD2)/tradingDays
+         out[7, i] = t * rXert * cdfD2
+      else:
+         cdfMinusD1 = normCdf(-d1)
+         cdfMinusD2 = normCdf(-d2)
+         out[2, i] = cdfMinusD2*Xert - cdfMinusD1*S
+         out[3, i] = -cdfMinusD1
+         out[6, i] = (SNs + rXert * cdfMinusD2)/tradingDays
+         out[7, i] = -t * rXert * cdfMinusD2
+      out[0, i] = d1
+      out[1, i] = d2
+      # Vega
+      vega = S * pdfD1 * sqrtTau
+      out[5, i] = vega
+      # Vomma
+      out[8, i] = math.inf if s == 0.0 else vega * d1 * d2 / s
+      if t == 0.0 or s == 0.0:
+         # Gamma
+         out[4, i] = math.inf
+         # Higher order Greeks
+         for n in range(9, 15):
+            out[n, i] = 0.0
+         continue
+      out[4, i] = pdfD1 / (S * s * sqrtTau)
+      sigmaSqrtTau = s * sqrtTau
+      gamma = pdfD1 / (S * sigmaSqrtTau)
+      driftTerm = (2.0*r*t - d2*sigmaSqrtTau) / (2.0*t*sigmaSqrtTau)
+      # Vanna, Charm, Speed, Zomma, Color, Veta
+      out[9, i] = -pdfD1 * d2 / s
+      out[10, i] = -pdfD1 * driftTerm / tradingDays
+      out[11, i] = -gamma/S * (d1/sigmaSqrtTau + 1.0)
+      out[12, i] = gamma * (d1*d2 - 1.0) / s
+      out[13, i] = gamma * (1.0/(2.0*t) + d1*driftTerm) / tradingDays
+      out[14, i] = S * pdfD1 * sqrtTau * (r*d1/sigmaSqrtTau - (1.0 + d1*d2)/(2.0*t)) / tradingDays
+
+
+# Same approximation as NormKernels.normPpf, for a single probability
+@njit(cache = True)
+def normPpf(p):
+   if not (p > 0.0 and p < 1.0):
+      return math.nan
+   q = p - 0.5
+   if abs(q) <= 0.5 - ppfLow:
+      r = q*q
+      return (((((ppfA[0]*r + ppfA[1])*r + ppfA[2])*r + ppfA[3])*r + ppfA[4])*r + ppfA[5])*q/(((((ppfB[0]*r + ppfB[1])*r + ppfB[2])*r + ppfB[3])*r + ppfB[4])*r + 1.0)
+   t = math.sqrt(-2.0*math.log(min(p, 1.0 - p)))
+   tail = (((((ppfC[0]*t + ppfC[1])*t + ppfC[2])*t + ppfC[3])*t + ppfC[4])*t + ppfC[5])/((((ppfD[0]*t + ppfD[1])*t + ppfD[2])*t + ppfD[3])*t + 1.0)
+   return tail if q < 0.0 else -tail
+
+
+# IEEE square root (plain Python raises ValueError for x < 0)
+@njit(cache = True)
+def ieeeSqrt(x):
+   if not x >= 0.0:
+      return math.nan
+   return math.sqrt(x)
+
+
+# Same estimate as BSMKernels.bsmIVInitialGuess, for a single contract
+@njit(cache = True)
+def ivInitialGuess(targetPrice, spotPrice, strikePrice, isCall, tau, ir):
+   Xert = strikePrice * math.exp(-ir*tau)
+   # Convert the price into the OTM price
+   otmCall = Xert > spotPrice
+   callPrice = targetPrice if isCall else targetPrice + spotPrice - Xert
+   otmPrice = callPrice if otmCall else callPrice - spotPrice + Xert
+   # Normalized OTM price and distance from the forward
+   x = abs(ieeeLog(ieeeDiv(spotPrice, Xert)))
+   normPrice = ieeeDiv(otmPrice, math.sqrt(spotPrice*Xert))
+   # Normalized price at the inflection point and upper bound of the normalized price
+   sigmaC = math.sqrt(2.0*x)
+   maxPrice = math.exp(-0.5*x)
+   priceC = 0.5*maxPrice - math.exp(0.5*x)*normCdf(-sigmaC)
+   # Lower region: invert the tail expansion of the price
+   if normPrice < priceC:
+      logPrice = ieeeLog(normPrice)
+      lower = ieeeDiv(x, ieeeSqrt(-2.0*logPrice))
+      for n in range(2):
+         lower = ieeeDiv(x, ieeeSqrt(2.0*(ieeeLog(ieeeDiv(invSqrt2Pi*lower, ieeeDiv(x**2, lower**2) - 0.25*lower**2)) - 0.125*lower**2 - logPrice)))
+      if ieeeDiv(x, lower) - 0.5*lower > 2.0:
+         return lower/math.sqrt(tau)
+   # Upper region: invert the upper asymptote of the price
+   return -2.0*normPpf(ieeeDiv(maxPrice - normPrice, maxPrice - priceC)*normCdf(-0.5*sigmaC))/math.sqrt(tau)
+
+
+# Same algorithm as BSMKernels.bsmImpliedVolatility (safeguarded Halley iterations + bisection fallback), one contract at a time
+@njit(cache = True)
+def ivKernel(targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0, xtol, maxIter, lowerBound, upperBound, IV, converged, iterations):
+   for i in range(targetPrice.size):
+      target = targetPrice[i]
+      S = spotPrice[i]
+      K = strikePrice[i]
+      call = isCall[i]
+      t = tau[i]
+      r = ir[i]
+      IV[i] = 0.0
+      converged[i] = False
+      iterations[i] = 0
+      # Initialize the bracket: there is a root only if the target price is within the prices at the boundaries
+      lo = lowerBound
+      hi = upperBound
+      fLo = price(S, K, call, t, r, lo) - target
+      fHi = price(S, K, call, t, r, hi) - target
+      if not (t > 0.0 and math.isfinite(target) and fLo <= 0.0 and fHi >= 0.0):
+         continue
+      # Initial guess
+      x = x0[i]
+      if not math.isfinite(x):
+         x = ivInitialGuess(target, S, K, call, t, r)
+      sigma = x if math.isfinite(x) and lo < x and x < hi else 0.5*(lo + hi)
+      done = False
+      # Safeguarded Halley iterations
+      for n in range(maxIter):
+         s = sigma
+         d1, d2 = d1d2(S, K, call, t, r, s)
+         Xert = K * math.exp(-r*t)
+         if call:
+            f = normCdf(d1)*S - normCdf(d2)*Xert - target
+         else:
+            f = normCdf(-d2)*Xert - normCdf(-d1)*S - target
+         vega = S * normPdf(d1) * math.sqrt(t)
+         vomma = math.inf if s == 0.0 else vega * d1 * d2 / s
+         iterations[i] += 1
+         # Shrink the bracket
+         if f < 0.0:
+            lo = s
+         else:
+            hi = s
+         # Halley step
+         newton = ieeeDiv(f, vega)
+         sNew = s - ieeeDiv(newton, 1.0 - ieeeDiv(0.5*newton*vomma, vega))
+         # Use a bisection step if the Halley step leaves the bracket
+         bisect = not math.isfinite(sNew) or sNew <= lo or sNew >= hi
+         if bisect:
+            sNew = 0.5*(lo + hi)
+         # Check for convergence
+         done = f == 0.0 or (not bisect and abs(sNew - s) < xtol)
+         sigma = s if f == 0.0 else sNew
+         if done:
+            break
+      # Fallback method (Bisection)
+      while not done:
+         s = 0.5*(lo + hi)
+         f = price(S, K, call, t, r, s) - target
+         iterations[i] += 1
+         if f < 0.0:
+            lo = s
+         else:
+            hi = s
+         sigma = s
+         done = f == 0.0 or (hi - lo) < xtol
+      converged[i] = True
+      IV[i] = sigma
+
+
+# Broadcast the inputs against each other and flatten them into contiguous arrays. Returns the common shape and the flat arrays
+def flatten(spotPrice, strikePrice, isCall, tau, ir, *args):
+   arrays = np.broadcast_arrays(np.asarray(spotPrice, dtype = float)
+                                , np.asarray(strikePrice, dtype = float)
+                                , np.asarray(isCall, dtype = bool)
+                                , np.asarray(tau, dtype = float)
+                                , np.asarray(ir, dtype = float)
+                                , *[np.asarray(x, dtype = float) for x in args]
+                                )
+   return arrays[0].shape, [np.ascontiguousarray(np.ravel(x)) for x in arrays]
+
+
+# Array interface, with the same signature and output as the BSMKernels functions
+def bsmPrice(spotPrice, strikePrice, isCall, tau, ir, sigma):
+   shape, (spotPrice, strikePrice, isCall, tau, ir, sigma) = flatten(spotPrice, strikePrice, isCall, tau, ir, sigma)
+   out = np.empty(spotPrice.size)
+   priceKernel(spotPrice, strikePrice, isCall, tau, ir, sigma, out)
+   return out.reshape(shape)
+
+
+def bsmGreeks(spotPrice, strikePrice, isCall, tau, ir, sigma, midPrice = None, tradingDays = 365.0):
+   shape, (spotPrice, strikePrice, isCall, tau, ir, sigma) = flatten(spotPrice, strikePrice, isCall, tau, ir, sigma)
+   out = np.empty((len(greeksFields), spotPrice.size))
+   greeksKernel(spotPrice, strikePrice, isCall, tau, ir, sigma, float(tradingDays), out)
+   greeks = {field: out[n].reshape(shape) for n, field in enumerate(greeksFields)}
+   # Lambda (a.k.a. elasticity or leverage)
+   if midPrice is None:
+      greeks["Elasticity"] = np.full(shape, np.nan)
+   else:
+      with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+         greeks["Elasticity"] = greeks["Delta"] * np.asarray(midPrice, dtype = float) / spotPrice.reshape(shape)
+   return greeks
+
+
+def bsmImpliedVolatility(targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0 = None, xtol = 1e-6, maxIter = 20, lowerBound = 0.0001, upperBound = 5.0):
+   shape, (spotPrice, strikePrice, isCall, tau, ir, targetPrice, x0) = flatten(spotPrice, strikePrice, isCall, tau, ir, targetPrice, np.nan if x0 is None else x0)
+   IV = np.empty(spotPrice.size)
+   converged = np.empty(spotPrice.size, dtype = bool)
+   iterations = np.empty(spotPrice.size, dtype = int)
+   ivKernel(targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0, float(xtol), int(maxIter), float(lowerBound), float(upperBound)
+            , IV, converged, iterations)
+   return IV.reshape(shape), converged.reshape(shape), iterations.reshape(shape)
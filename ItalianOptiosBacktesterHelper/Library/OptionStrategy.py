@@ -375,42 +375,127 @@ class OptionStrategy(OptionStrategyCore):
       # Stop the timer
       self.context.executionTimer.stop()
 
-   def isStopLoss(self, openPosition, positionValue):
+   # Check which positions have hit the Stop Loss. positionValues is the output of getPositionValues for the given positions. Returns a boolean mask
+   def isStopLoss(self, positions, positionValues):
       # Get the strategy parameters
       parameters = self.parameters
-   
+
       # Get the Stop Loss multiplier
       stopLossMultiplier = parameters["stopLossMultiplier"]
       capStopLoss = parameters["capStopLoss"]
-      
-      # Get the amount of credit received to open the position
-      openPremium = openPosition["open"]["premium"]
-      # Get the quantity used to open the position
-      positionQuantity = openPosition["orderQuantity"]
-      # Maximum Loss (pre-computed at the time of creating the order)
-      maxLoss = openPosition["maxLoss"] * positionQuantity
-      if capStopLoss:
-         # Add the premium to compute the net loss
-         netMaxLoss = maxLoss + openPremium
-      else:
-         netMaxLoss = float("-Inf")
-   
-      stopLoss = None
+
+      stopLossFlg = np.zeros(len(positions), dtype = bool)
       # Check if we are using a stop loss
       if stopLossMultiplier != None:
+         # Get the amount of credit received to open each position
+         openPremium = positionValues["openPremium"]
+         # Maximum Loss (pre-computed at the time of creating the order)
+         maxLoss = np.array([position["maxLoss"] * position["orderQuantity"] for position in positions], dtype = float)
+         if capStopLoss:
+            # Add the premium to compute the net loss
+            netMaxLoss = maxLoss + openPremium
+         else:
+            netMaxLoss = np.full(len(positions), float("-Inf"))
          # Set the stop loss amount
-         stopLoss = -abs(openPremium) * stopLossMultiplier
-         
-      # Extract the positionPnL (per share)
-      positionPnL = positionValue["positionPnL"]
-
-      # Check if we've hit the stop loss threshold
-      stopLossFlg = False
-      if stopLoss != None and netMaxLoss <= positionPnL <= stopLoss:
-         stopLossFlg = True
-   
+         stopLoss = -np.abs(openPremium) * stopLossMultiplier
+         # Check if we've hit the stop loss threshold
+         positionPnL = positionValues["positionPnL"]
+         stopLossFlg = (netMaxLoss <= positionPnL) & (positionPnL <= stopLoss)
+
       return stopLossFlg
 
+   # Evaluate the exit rules of a list of fully filled positions at once. Returns the position values (see getPositionValues) plus one boolean
+   # mask per exit rule, the Days In Trade of each position, the close flag and the close reason of each position
+   def getExitSignals(self, positions):
+      # Start the timer
+      self.context.executionTimer.start()
+
+      # Get the context
+      context = self.context
+      # Get the strategy parameters
+      parameters = self.parameters
+
+      # Get the current value of the positions
+      signals = self.getPositionValues(positions)
+      positionPnL = signals["positionPnL"]
+      openPremium = signals["openPremium"]
+
+      # How many days to expiration are left and how many days each position has been in trade for
+      currentDte = np.array([(position["expiry"].date() - context.Time.date()).days for position in positions], dtype = int)
+      currentDit = np.array([(context.Time.date() - context.allPositions[position["orderId"]]["openFilledDttm"].date()).days for position in positions], dtype = int)
+
+      # Stop Loss
+      stopLossFlg = self.isStopLoss(positions, signals)
+
+      # Get the target profit amount (if it has been set at the time of creating the order), else use the profitTarget parameter (NaN -> no target)
+      targetProfit = np.array([position.get("targetProfit", None) for position in positions], dtype = float)
+      if parameters["profitTarget"] != None:
+         targetProfit = np.where(np.isnan(targetProfit), np.abs(openPremium) * parameters["profitTarget"], targetProfit)
+      profitTargetFlg = positionPnL >= targetProfit
+
+      # Check for DIT stop
+      hardDitStopFlg = np.zeros(len(positions), dtype = bool)
+      softDitStopFlg = np.zeros(len(positions), dtype = bool)
+      if (parameters["ditThreshold"] != None # The ditThreshold has been specified
+          and parameters["dte"] > parameters["ditThreshold"] # We are using the ditThreshold only if the open DTE was larger than the threshold
+          ):
+         # We have reached the DIT threshold
+         ditThresholdFlg = currentDit >= parameters["ditThreshold"]
+         # Hard DIT cutoff
+         if parameters["forceDitThreshold"] == True:
+            hardDitStopFlg = ditThresholdFlg
+         elif parameters["hardDitThreshold"] != None:
+            hardDitStopFlg = ditThresholdFlg & (currentDit >= parameters["hardDitThreshold"])
+         # Soft DIT cutoff: close as soon as it is profitable
+         softDitStopFlg = ditThresholdFlg & ~hardDitStopFlg & (positionPnL >= 0)
+
+      # Check for DTE stop
+      hardDteStopFlg = np.zeros(len(positions), dtype = bool)
+      softDteStopFlg = np.zeros(len(positions), dtype = bool)
+      if (parameters["dteThreshold"] != None # The dteThreshold has been specified
+          and parameters["dte"] > parameters["dteThreshold"] # We are using the dteThreshold only if the open DTE was larger than the threshold
+          ):
+         # We have reached the DTE threshold
+         dteThresholdFlg = currentDte <= parameters["dteThreshold"]
+         if parameters["forceDteThreshold"] == True:
+            hardDteStopFlg = dteThresholdFlg
+         else:
+            softDteStopFlg = dteThresholdFlg & (positionPnL >= 0)
+
+      # Check if this is the last trading day before expiration and we have reached the cutoff time
+      expiryCutoffFlg = np.array([context.Time >= position["expiryMarketCloseCutoffDttm"] for position in positions], dtype = bool)
+
+      # Check if this is the last trading day before the end of the backtest and we have reached the cutoff time
+      endOfBacktestCutoffFlg = np.full(len(positions), self.endOfBacktestCutoffDttm != None and context.Time >= self.endOfBacktestCutoffDttm)
+
+      # Exit rules in order of precedence of the close reason
+      exitRules = [(profitTargetFlg, "Profit target")
+                   , (stopLossFlg, "Stop Loss trigger")
+                   , (hardDitStopFlg, "Hard DIT cutoff")
+                   , (softDitStopFlg, "Soft DIT cutoff")
+                   , (hardDteStopFlg, "Hard DTE cutoff")
+                   , (softDteStopFlg, "Soft DTE cutoff")
+                   , (expiryCutoffFlg, "Expiration date cutoff")
+                   , (endOfBacktestCutoffFlg, "End of Backtest Liquidation")
+                   ]
+      closeFlg = np.zeros(len(positions), dtype = bool)
+      closeReason = np.full(len(positions), None, dtype = object)
+      for ruleFlg, reason in reversed(exitRules):
+         closeFlg |= ruleFlg
+         closeReason[ruleFlg] = reason
+
+      signals.update({"currentDit": currentDit
+                      , "stopLossFlg": stopLossFlg
+                      , "endOfBacktestCutoffFlg": endOfBacktestCutoffFlg
+                      , "closeFlg": closeFlg
+                      , "closeReason": closeReason
+                      })
+
+      # Stop the timer
+      self.context.executionTimer.stop()
+
+      return signals
+
    def managePositions(self):
       # Start the timer
       self.context.executionTimer.start()
@@ -432,6 +517,13 @@ class OptionStrategy(OptionStrategyCore):
       # Flag to control whether we need to manage the limit orders again at the end of the loop below
       manageLimitOrders = False
 
+      # Fully filled positions with no pending orders to close: value them and evaluate the exit rules all at once
+      activePositionKeys = [positionKey for positionKey, position in self.openPositions.items()
+                              if position["open"]["filled"] == True and not self.workingOrders.get(position["orderTag"])
+                            ]
+      activePositions = {positionKey: n for n, positionKey in enumerate(activePositionKeys)}
+      exitSignals = self.getExitSignals([self.openPositions[positionKey] for positionKey in activePositionKeys])
+
       # Loop through all open positions
       for positionKey in list(self.openPositions):
          # Skip this contract if in the meantime it has been removed by the onOrderEvent
@@ -446,16 +538,11 @@ class OptionStrategy(OptionStrategyCore):
          orderTag = position["orderTag"]
          # Get the book position
          bookPosition = context.allPositions[orderId]
-         # How many days to expiration are left for this position
-         currentDte = (position["expiry"].date() - context.Time.date()).days
 
 
          # Check if this is a fully filled position
          if position["open"]["filled"] == True:
 
-            # How many days has this position been in trade for
-            currentDit = (context.Time.date() - bookPosition["openFilledDttm"].date()).days
-
             # Check if we have any pending working orders to close
             if self.workingOrders.get(orderTag):
 
@@ -488,24 +575,19 @@ class OptionStrategy(OptionStrategyCore):
                #        -> stopLossMultiplier <= 1
                #        -> maxLoss = openPremium
 
-               # Get the amount of credit received to open the position
-               openPremium = position["open"]["premium"]
-               
-               # Get the target profit amount (if it has been set at the time of creating the order)
-               targetProfit = position.get("targetProfit", None)
-               # Set the target profit amount if the above step returned no value
-               if targetProfit == None and parameters["profitTarget"] != None:
-                  targetProfit = abs(openPremium) * parameters["profitTarget"]
-               
-               # Get the current value of the position
-               positionDetails = self.getPositionValue(position)
-               # Extract the positionPnL (per share)
-               positionPnL = positionDetails["positionPnL"]
+               # Index of the position in the exit signals
+               n = activePositions[positionKey]
 
                # Exit if the positionPnL is not available (bid-ask spread is too wide)
-               if positionPnL == None:
+               if not exitSignals["validPnL"][n]:
+                  self.logger.trace(f"The Bid-Ask spread is too wide. Open Premium: {exitSignals['openPremium'][n]},  Mid-Price: {exitSignals['orderMidPrice'][n]},  Bid-Ask Spread: {exitSignals['bidAskSpread'][n]}")
                   return
 
+               # Extract the positionPnL (per share)
+               positionPnL = float(exitSignals["positionPnL"][n])
+               # How many days has this position been in trade for
+               currentDit = int(exitSignals["currentDit"][n])
+
                # Keep track of the P&L range throughout the life of the position (mark the DIT of when the Min/Max PnL occurs)
                if 100*positionPnL < bookPosition["P&L.Max"]:
                   bookPosition["P&L.Min.DIT"] = currentDit
@@ -514,88 +596,22 @@ class OptionStrategy(OptionStrategyCore):
                   bookPosition["P&L.Max.DIT"] = currentDit
                   bookPosition["P&L.Max"] = max(bookPosition["P&L.Max"], 100*positionPnL)
 
-               # Initialize the closeReason
-               closeReason = None
-               
-               # Check if we've hit the stop loss threshold
-               stopLossFlg = self.isStopLoss(position, positionDetails)
-               if stopLossFlg:
-                  closeReason = "Stop Loss trigger"
-                  
-               # Check if we hit the profit target
-               profitTargetFlg = False
-               if targetProfit != None and positionPnL >= targetProfit:
-                  profitTargetFlg = True
-                  closeReason = "Profit target"
-
-               hardDitStopFlg = False
-               softDitStopFlg = False
-               # Check for DTE stop
-               if (parameters["ditThreshold"] != None # The dteThreshold has been specified
-                   and parameters["dte"] > parameters["ditThreshold"] # We are using the dteThreshold only if the open DTE was larger than the threshold
-                   and currentDit >= parameters["ditThreshold"] # We have reached the DTE threshold
-                   ):
-                  # Check if this is a hard DTE cutoff
-                  if (parameters["forceDitThreshold"] == True
-                      or (parameters["hardDitThreshold"] != None and currentDit >= parameters["hardDitThreshold"])
-                      ):
-                     hardDitStopFlg = True
-                     closeReason = closeReason or "Hard DIT cutoff"
-                  # Check if this is a soft DTE cutoff
-                  elif positionPnL >= 0:
-                     softDitStopFlg = True
-                     closeReason = closeReason or "Soft DIT cutoff"
-
-               hardDteStopFlg = False
-               softDteStopFlg = False
-               # Check for DTE stop
-               if (parameters["dteThreshold"] != None # The dteThreshold has been specified
-                   and parameters["dte"] > parameters["dteThreshold"] # We are using the dteThreshold only if the open DTE was larger than the threshold
-                   and currentDte <= parameters["dteThreshold"] # We have reached the DTE threshold
-                   ):
-                  # Check if this is a hard DTE cutoff
-                  if parameters["forceDteThreshold"] == True:
-                     hardDteStopFlg = True
-                     closeReason = closeReason or "Hard DTE cutoff"
-                  # Check if this is a soft DTE cutoff
-                  elif positionPnL >= 0:
-                     softDteStopFlg = True
-                     closeReason = closeReason or "Soft DTE cutoff"
-
-               # Check if this is the last trading day before expiration and we have reached the cutoff time
-               expiryCutoffFlg = context.Time >= position["expiryMarketCloseCutoffDttm"]
-               if expiryCutoffFlg:
-                  closeReason = closeReason or "Expiration date cutoff"
-
-               # Check if this is the last trading day before expiration and we have reached the cutoff time
-               endOfBacktestCutoffFlg = False
-               if self.endOfBacktestCutoffDttm != None and context.Time >= self.endOfBacktestCutoffDttm:
-                  endOfBacktestCutoffFlg = True
-                  closeReason = closeReason or "End of Backtest Liquidation"
-                  # Set the stopLossFlg = True to force a Market Order 
-                  stopLossFlg = True
+               # Exit rules (see getExitSignals). Stop losses and the End of Backtest liquidation are executed through a Market Order
+               stopLossFlg = bool(exitSignals["stopLossFlg"][n] or exitSignals["endOfBacktestCutoffFlg"][n])
+               closeReason = exitSignals["closeReason"][n]
 
                # Update the stats of each contract
                if parameters["includeLegDetails"] and context.Time.minute % parameters["legDatailsUpdateFrequency"] == 0:
-                  for contract in position["contracts"]:
-                     self.updateContractStats(bookPosition, position, contract)
+                  self.updatePositionStats(bookPosition, position, position["contracts"])
                   if parameters["trackLegDetails"]:
                      underlyingPrice = context.GetLastKnownPrice(context.Securities[context.underlyingSymbol]).Price
                      context.positionTracking[orderId][context.Time][f"{self.name}.underlyingPrice"] = underlyingPrice
                      context.positionTracking[orderId][context.Time][f"{self.name}.PnL"] = positionPnL
 
                # Check if we need to close the position
-               if (profitTargetFlg # We hit the profit target
-                   or stopLossFlg # We hit the stop loss (making sure we don't exceed the max loss in case of spreads)
-                   or hardDteStopFlg # The position must be closed when reaching the DTE threshold (hard stop)
-                   or softDteStopFlg # Soft DTE stop: close as soon as it is profitable
-                   or hardDitStopFlg # The position must be closed when reaching the DIT threshold (hard stop)
-                   or softDitStopFlg # Soft DIT stop: close as soon as it is profitable
-                   or expiryCutoffFlg # This is the last trading day before expiration, we have reached the cutoff time
-                   or endOfBacktestCutoffFlg # This is the last trading day before the end of the backtest -> Liquidate all positions
-                   ):
+               if exitSignals["closeFlg"][n]:
                   # Close the position
-                  self.closePosition(positionDetails, closeReason, stopLossFlg = stopLossFlg)
+                  self.closePosition(self.getPositionDetails(exitSignals, n), closeReason, stopLossFlg = stopLossFlg)
                   # Need to manage any Limit orders that have been added
                   manageLimitOrders = True
 
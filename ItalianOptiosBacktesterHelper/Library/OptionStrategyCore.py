@@ -22,6 +22,8 @@ import re
 import numpy as np
 from Logger import *
 from OptionStrategyOrder import *
+from ChainIndex import *
+from PositionBook import *
 
 class OptionStrategyCore(OptionStrategyOrder):
 
@@ -67,7 +69,10 @@ class OptionStrategyCore(OptionStrategyOrder):
          return
          
       # Check if the epiryList was specified as an input
-      if expiryList == None or dte != context.dte or dteWindow != context.dteWindow:
+      if isinstance(chain, ChainSnapshot) and (expiryList == None or dte != context.dte or dteWindow != context.dteWindow):
+         # Get the list of expiry dates from the snapshot of the chain (computed once per bar for each DTE range)
+         expiryList = chain.getExpiryList(minDte, maxDte)
+      elif expiryList == None or dte != context.dte or dteWindow != context.dteWindow:
          # List of expiry dates, sorted in reverse order
          expiryList = sorted(set([contract.Expiry for contract in chain
                                     if minDte <= (contract.Expiry.date() - context.Time.date()).days <= maxDte
@@ -138,15 +143,31 @@ class OptionStrategyCore(OptionStrategyOrder):
       # Check if the expiry date has been specified
       if expiry != None:
          # Filter contracts based on the requested expiry date
-         filteredChain = [contract for contract in chain if contract.Expiry == expiry]
+         if isinstance(chain, ChainIndex):
+            # Keep the strike-sorted arrays of the index
+            filteredChain = chain.filterByExpiry(expiry)
+         else:
+            filteredChain = [contract for contract in chain if contract.Expiry == expiry]
       else:
          # No filtering
          filteredChain = chain
 
-      # Check if we need to compute the Greeks for every single contract (this is expensive!)
-      # By defauls, the Greeks are only calculated while searching for the strike with the requested delta, so there should be no need to set computeGreeks = True
-      if computeGreeks:
-         self.bsm.setGreeks(filteredChain)
+      if isinstance(chain, ChainSnapshot) and expiry != None:
+         # The snapshot of the chain is shared by all the strategies: the expiry is only prepared (forward, smile, Greeks) once per bar
+         chain.prepareExpiry(expiry, self.bsm, computeGreeks = computeGreeks)
+      else:
+         # Fit the forward and the discount factor of the selected expiry from the Put-Call parity (only once per bar)
+         if self.bsm.parameters["useParityForward"]:
+            self.bsm.fitParityForwards(filteredChain)
+
+         # Fit the volatility smile of the selected expiry (only once per bar)
+         if self.bsm.parameters["useVolSmile"]:
+            self.bsm.fitVolSmiles(filteredChain)
+
+         # Check if we need to compute the Greeks for every single contract (this is expensive!)
+         # By defauls, the Greeks are only calculated while searching for the strike with the requested delta, so there should be no need to set computeGreeks = True
+         if computeGreeks:
+            self.bsm.setGreeks(list(filteredChain))
 
       # Stop the timer
       self.context.executionTimer.stop()
@@ -347,8 +368,21 @@ class OptionStrategyCore(OptionStrategyOrder):
          positionTracking[f"{self.name}.underlyingPrice"] = underlyingPrice
          positionTracking[f"{self.name}.PnL"] = 0
 
-      # Add this position to the global dictionary
-      context.allPositions[orderId] = position
+      # Add this position to the book. The layout of the record (field ids) is resolved once for each combination of legs
+      layoutKey = tuple(sidesDesc)
+      if layoutKey not in self.positionLayouts:
+         self.positionLayouts[layoutKey] = context.allPositions.resolve(position)
+      bookPosition = context.allPositions.add(orderId, position, layout = self.positionLayouts[layoutKey])
+      # Layout of the stats of each leg in the book (slots of the Min/Max/Close/EMA/Avg fields), resolved once for each combination of legs
+      if parameters["includeLegDetails"]:
+         if layoutKey not in self.statsLayouts:
+            self.statsLayouts[layoutKey] = LegStatsLayout(bookPosition.book
+                                                          , self.name
+                                                          , sidesDesc
+                                                          , [greek.title() for greek in parameters["greeksIncluded"]] + ["midPrice", "IV", "PnL"]
+                                                          , emaMemory
+                                                          )
+         order["statsLayout"] = self.statsLayouts[layoutKey]
       # Add the details of this order to the openPositions dictionary.
       self.openPositions[positionKey] = order
 
@@ -486,139 +520,184 @@ class OptionStrategyCore(OptionStrategyOrder):
       # Get the strategy parameters
       parameters = self.parameters
       
-      orderId = openPosition["orderId"]
-      
-      # Get the side of the contract at the time of opening: -1 -> Short   +1 -> Long
-      contractSide = openPosition["contractSide"][contract.Symbol]
+      # Get the description of the contract
       contractSideDesc = openPosition["contractSideDesc"][contract.Symbol]
-      orderQuantity = openPosition["orderQuantity"]
       
       # Set the prefix used to identify each field to be updated
       fieldPrefix = f"{self.name}.{contractSideDesc}"
 
       # Store the Open/Close Fill Price (if specified)
-      closeFillPrice = None
+      closeFillPrices = {}
       if orderType != None:
          bookPosition[f"{fieldPrefix}.{orderType}MidPrice"] = self.contractUtils.midPrice(contract)
          bookPosition[f"{fieldPrefix}.{orderType}BidAskSpread"] = self.contractUtils.bidAskSpread(contract)
          bookPosition[f"{fieldPrefix}.{orderType}FillPrice"] = fillPrice
          if orderType == "close":
-            closeFillPrice = fillPrice
+            closeFillPrices[contract.Symbol] = fillPrice
+
+      # Update the stats of the contract
+      self.updatePositionStats(bookPosition, openPosition, [contract], closeFillPrices = closeFillPrices)
+
+      # Stop the timer
+      self.context.executionTimer.stop()
+
+   # Update the stats (Min, Max, Close, EMA, Avg) of the Greeks, mid-price, IV and PnL of the given contracts of a position.
+   # The stats of all the contracts are updated at once in the position book, using the layout resolved when the position was opened
+   def updatePositionStats(self, bookPosition, openPosition, contracts, closeFillPrices = {}):
+
+      # Get the context
+      context = self.context
+      # Get the strategy parameters
+      parameters = self.parameters
 
       # Exit if we don't need to include the details
       if not parameters["includeLegDetails"] or context.Time.minute % parameters["legDatailsUpdateFrequency"] != 0:
          return
-         
+
+      # Start the timer
+      self.context.executionTimer.start()
+
+      orderId = openPosition["orderId"]
+      orderQuantity = openPosition["orderQuantity"]
+      # Get the layout of the stats fields in the book
+      statsLayout = openPosition["statsLayout"]
+      # Get the position book and the row of the position
+      book = bookPosition.book
+      row = bookPosition.row
+
       # Get the EMA memory factor
       emaMemory = parameters["emaMemory"]
       # Compute the decay such that the contribution of each new value drops to 5% after emaMemory iterations
       emaDecay = 0.05**(1.0/emaMemory)
-      
-      # Update the counter (used for the average)
-      bookPosition["statsUpdateCount"] += 1
-      statsUpdateCount = bookPosition["statsUpdateCount"]
-            
-      # Compute the mid-price of the contract
-      midPrice = self.contractUtils.midPrice(contract)
-      # Use the fill price if the position has been closed, else use the midPrice for the intermediate PnL calculations
-      closeFillPrice = closeFillPrice or midPrice * np.sign(contractSide)
-      
 
-      # Compute the Greeks (retrieve it as a dictionary)
-      greeks = self.bsm.computeGreeks(contract).__dict__
-      # Add the midPrice and PnL values to the greeks dictionary to generalize the processing loop
-      greeks["midPrice"] = midPrice
-      
-      # List of variables for which we are going to update the stats
-      #vars = ["midPrice", "Delta", "Gamma", "Vega", "Theta", "Rho", "Vomma", "Elasticity", "IV"]
-      vars = [var.title() for var in parameters["greeksIncluded"]] + ["midPrice", "IV"]
-      
-      # Get the fill price at the open
-      openFillPrice = bookPosition[f"{fieldPrefix}.openFillPrice"]
-      # Check if the fill price is set 
-      if not math.isnan(openFillPrice):
+      # Leg index of each contract
+      legs = np.array([statsLayout.legs[openPosition["contractSideDesc"][contract.Symbol]] for contract in contracts], dtype = int)
+      # Fill price at the open of each leg
+      openFillPrices = book.block[row, statsLayout.openFillPriceSlots[legs]]
+      # Latest value of each variable (rows: contracts, columns: variables)
+      values = np.zeros((len(contracts), len(statsLayout.vars)))
+      # Flag of the variables to update: the PnL is only updated once the fill price at the open is set
+      active = np.ones(values.shape, dtype = bool)
+      active[:, statsLayout.isPnL] = ~np.isnan(openFillPrices)[:, np.newaxis]
+
+      for n, contract in enumerate(contracts):
+         # Get the side of the contract at the time of opening: -1 -> Short   +1 -> Long
+         contractSide = openPosition["contractSide"][contract.Symbol]
+         # Compute the mid-price of the contract
+         midPrice = self.contractUtils.midPrice(contract)
+         # Use the fill price if the position has been closed, else use the midPrice for the intermediate PnL calculations
+         closeFillPrice = closeFillPrices.get(contract.Symbol) or midPrice * np.sign(contractSide)
+         # Compute the Greeks (retrieve the rounded values as a dictionary)
+         greeks = self.bsm.computeGreeks(contract).asDict()
+         # Add the midPrice and PnL values to the greeks dictionary to generalize the processing loop
+         greeks["midPrice"] = midPrice
          # Compute the PnL of the contract (100 shares per contract)
-         PnL = 100 * (openFillPrice + closeFillPrice)*abs(contractSide)*orderQuantity
-         
-         # Add the PnL to the list of variables for which we want to update the stats
-         vars.append("PnL")         
-         greeks["PnL"] = PnL
-      
-      for var in vars:
-         # Set the name of the field to be updated
-         fieldName = f"{fieldPrefix}.{var}"
-         # Get the latest value from the dictionary
-         fieldValue = greeks[var]
-         # Special case for the PnL
-         if var == "PnL" and statsUpdateCount == 2:
-            # Initialize the EMA for the PnL
-            bookPosition[f"{fieldName}.EMA({emaMemory})"] = fieldValue
-         # Update the Min field
-         bookPosition[f"{fieldName}.Min"] = min(bookPosition[f"{fieldName}.Min"], fieldValue)
-         # Update the Max field
-         bookPosition[f"{fieldName}.Max"] = max(bookPosition[f"{fieldName}.Max"], fieldValue)
-         # Update the Close field (this is the most recent value of the greek)
-         bookPosition[f"{fieldName}.Close"] = fieldValue
-         # Update the EMA field (IMPORTANT: this must be done before we update the Avg field!)
-         bookPosition[f"{fieldName}.EMA({emaMemory})"] = emaDecay * bookPosition[f"{fieldName}.EMA({emaMemory})"] + (1-emaDecay)*fieldValue
-         # Update the Avg field
-         bookPosition[f"{fieldName}.Avg"] = (bookPosition[f"{fieldName}.Avg"]*(statsUpdateCount-1) + fieldValue)/statsUpdateCount
-         if parameters["trackLegDetails"] and var == "IV":
+         greeks["PnL"] = 100 * (openFillPrices[n] + closeFillPrice)*abs(contractSide)*orderQuantity
+         values[n] = [greeks[var] for var in statsLayout.vars]
+
+         if parameters["trackLegDetails"]:
             if context.Time not in context.positionTracking[orderId]:
                context.positionTracking[orderId][context.Time] = {"orderId": orderId
                                                                   , "Time": context.Time
                                                                   }
-            context.positionTracking[orderId][context.Time][fieldName] = fieldValue
+            context.positionTracking[orderId][context.Time][f"{self.name}.{openPosition['contractSideDesc'][contract.Symbol]}.IV"] = greeks["IV"]
+
+      # Update the stats of all the variables of all the contracts
+      statsLayout.update(book, row, legs, values, active, emaDecay)
      
       # Stop the timer
       self.context.executionTimer.stop()
 
-   def getPositionValue(self, position):
+   # Value a list of open positions at once:
+   #  - the quotes of all the legs of all the positions are gathered into arrays (one Securities lookup per leg)
+   #  - the mid-price, Limit order price and bid-ask spread of each position are the sums over its legs (segment sums)
+   # Returns a dictionary of arrays with one entry per position (and the per-leg arrays needed to build the order parameters)
+   def getPositionValues(self, positions):
       # Start the timer
       self.context.executionTimer.start()
 
-      # Get the context
-      context = self.context
       # Get the strategy parameters
       parameters = self.parameters
 
-      # Initialize result dictionary
-      positionDetails = {"orderParameters":[]}
+      # Legs of all the positions and position index of each leg
+      contracts = [contract for position in positions for contract in position["contracts"]]
+      legCounts = [len(position["contracts"]) for position in positions]
+      legPositions = np.repeat(np.arange(len(positions)), legCounts)
+      # First leg of each position
+      legOffsets = np.concatenate([[0], np.cumsum(legCounts)]).astype(int)
+
+      # Get the latest quotes of all the legs
+      securities = [self.contractUtils.getSecurity(contract) for contract in contracts]
+      bidPrices = np.array([security.BidPrice for security in securities], dtype = float)
+      askPrices = np.array([security.AskPrice for security in securities], dtype = float)
+      # Reverse the original contract side
+      orderSides = -np.array([position["contractSide"][contract.Symbol] for position in positions for contract in position["contracts"]], dtype = float)
+
+      # Get the latest mid-price
+      midPrices = 0.5*(bidPrices + askPrices)
+      # Adjusted mid-price (including slippage)
+      adjustedMidPrices = midPrices + orderSides * parameters["slippage"]
+
+      # Sum over the legs of each position
+      def positionSum(values):
+         return np.bincount(legPositions, weights = values, minlength = len(positions))
+
+      # Total order mid-price
+      orderMidPrice = positionSum(-orderSides * midPrices)
+      # Total Limit order mid-price (including slippage)
+      limitOrderPrice = positionSum(-orderSides * adjustedMidPrices)
+      # Bid-Ask spread
+      bidAskSpread = positionSum(np.abs(askPrices - bidPrices))
+
+      # Get the amount of credit received to open each position and the quantity
+      openPremium = np.array([position["open"]["premium"] for position in positions], dtype = float)
+      orderQuantity = np.array([position["orderQuantity"] for position in positions], dtype = float)
+      # Compute the PnL of each position
+      positionPnL = openPremium + orderMidPrice*orderQuantity
+
+      # Check if the mid-price is positive: avoid closing the position if the Bid-Ask spread is too wide (more than 25% of the credit received)
+      validPnL = np.ones(len(positions), dtype = bool)
+      if parameters["validateBidAskSpread"]:
+         validPnL = ~(bidAskSpread > parameters["bidAskSpreadRatio"]*openPremium)
 
-      # Get the amount of credit received to open the position
-      openPremium = position["open"]["premium"]
+      # Stop the timer
+      self.context.executionTimer.stop()
+
+      return {"positions": positions
+              , "contracts": contracts
+              , "legOffsets": legOffsets
+              , "orderSides": orderSides
+              , "limitPrices": adjustedMidPrices
+              , "openPremium": openPremium
+              , "orderMidPrice": orderMidPrice
+              , "limitOrderPrice": limitOrderPrice
+              , "bidAskSpread": bidAskSpread
+              , "positionPnL": positionPnL
+              , "validPnL": validPnL
+              }
+
+   # Details of the n-th position valued by getPositionValues (the format expected by closePosition)
+   def getPositionDetails(self, positionValues, n):
+      position = positionValues["positions"][n]
       orderQuantity = position["orderQuantity"]
 
-      # Loop through all legs of the open position
-      orderMidPrice = 0.0
-      limitOrderPrice = 0.0
-      bidAskSpread = 0.0
-      for contract in position["contracts"]:
-         # Reverse the original contract side
-         orderSide = -position["contractSide"][contract.Symbol]
-         # Compute the Bid-Ask spread
-         bidAskSpread += self.contractUtils.bidAskSpread(contract)
-         # Get the latest mid-price
-         midPrice = self.contractUtils.midPrice(contract)
-         # Adjusted mid-price (including slippage)
-         adjustedMidPrice = midPrice + orderSide * parameters["slippage"]
-         # Total order mid-price
-         orderMidPrice -= orderSide * midPrice
-         # Total Limit order mid-price (including slippage)
-         limitOrderPrice -= orderSide * adjustedMidPrice
-         # Add the parameters needed to place a Market/Limit order if needed
+      # Initialize result dictionary
+      positionDetails = {"orderParameters":[]}
+
+      # Add the parameters needed to place a Market/Limit order for each leg
+      for leg in range(positionValues["legOffsets"][n], positionValues["legOffsets"][n+1]):
          positionDetails["orderParameters"].append(
-               {"symbol": contract.Symbol
-                , "orderSide": orderSide
+               {"symbol": positionValues["contracts"][leg].Symbol
+                , "orderSide": int(positionValues["orderSides"][leg])
                 , "orderQuantity": orderQuantity
-                , "limitPrice": adjustedMidPrice
+                , "limitPrice": float(positionValues["limitPrices"][leg])
                }
             )
 
-      # Check if the mid-price is positive: avoid closing the position if the Bid-Ask spread is too wide (more than 25% of the credit received)
-      positionPnL = openPremium + orderMidPrice*orderQuantity
-      if self.parameters["validateBidAskSpread"] and bidAskSpread > parameters["bidAskSpreadRatio"]*openPremium:
-         self.logger.trace(f"The Bid-Ask spread is too wide. Open Premium: {openPremium},  Mid-Price: {orderMidPrice},  Bid-Ask Spread: {bidAskSpread}")
+      # Get the position PnL (None if the Bid-Ask spread is too wide)
+      positionPnL = float(positionValues["positionPnL"][n])
+      if not positionValues["validPnL"][n]:
+         self.logger.trace(f"The Bid-Ask spread is too wide. Open Premium: {positionValues['openPremium'][n]},  Mid-Price: {positionValues['orderMidPrice'][n]},  Bid-Ask Spread: {positionValues['bidAskSpread'][n]}")
          positionPnL = None
 
       # Set Order Id and expiration
@@ -627,16 +706,12 @@ class OptionStrategyCore(OptionStrategyOrder):
       # Set the order tag
       positionDetails["orderTag"] = position["orderTag"]
       # Store the full mid-price of the position
-      positionDetails["orderMidPrice"] = orderMidPrice
+      positionDetails["orderMidPrice"] = float(positionValues["orderMidPrice"][n])
       # Store the Limit Order mid-price of the position (including slippage)
-      positionDetails["limitOrderPrice"] = limitOrderPrice
+      positionDetails["limitOrderPrice"] = float(positionValues["limitOrderPrice"][n])
       # Store the full bid-ask spead of the position
-      positionDetails["bidAskSpread"] = bidAskSpread
+      positionDetails["bidAskSpread"] = float(positionValues["bidAskSpread"][n])
       # Store the position PnL
       positionDetails["positionPnL"] = positionPnL
 
-      # Stop the timer
-      self.context.executionTimer.stop()
-
       return positionDetails
-   
@@ -23,6 +23,7 @@ from Logger import *
 from BSMLibrary import *
 from StrategyBuilder import *
 from ContractUtils import *
+from PayoffProfile import PayoffProfile
 
 class OptionStrategyOrderCore:
 
@@ -59,11 +60,16 @@ class OptionStrategyOrderCore:
       # - Theta: the profit target is calculated based on the theta value of the position evaluated at self.thetaProfitDays from the time of entering the trade
       # - TReg: the profit target is calculated as a percentage of the TReg (MaxLoss + openPremium)
       # - Margin: the profit target is calculted as a percentage of the margin requirement (calculated based on self.portfolioMarginStress percentage upside/downside movement of the underlying)
+      # - Stress: the profit target is calculated as a percentage of the worst case P&L over the stress grid (see stressGridSpotSteps and stressGridVolShifts)
       , "profitTargetMethod": "Premium"
       # Number of days into the future at which the theta of the position is calculated. Used if profitTargetMethod = "Theta"
       , "thetaProfitDays": None
       # Upside/Downside stress applied to the underlying to calculate the portfolio margin requirement of the position
       , "portfolioMarginStress": 0.12
+      # Stress grid used to estimate the worst case margin requirement of the position (stressMargin): the underlying is moved across stressGridSpotSteps
+      # evenly spaced points within +/- portfolioMarginStress, and the IV of all the legs is shifted by each of the stressGridVolShifts (absolute values)
+      , "stressGridSpotSteps": 9
+      , "stressGridVolShifts": [-0.05, 0.05, 0.1]
       # Limit Order Management
       , "useLimitOrders": True
       , "limitOrderRelativePriceAdjustment": 0
@@ -96,7 +102,7 @@ class OptionStrategyOrderCore:
       , "includeCancelledOrders": True
       # Controls whether to include details on each leg (open/close fill price and descriptive statistics about mid-price, Greeks, and IV)
       , "includeLegDetails": False
-      # Controls which greeks are included in the output log
+      # Controls which greeks are included in the output log (the higher order Greeks Vanna, Charm, Speed, Zomma, Color and Veta are also available)
       , "greeksIncluded": ["Delta", "Gamma", "Vega", "Theta", "Rho", "Vomma", "Elasticity"]
       # Controls whether to track the details on each leg across the life of the trade
       , "trackLegDetails": False
@@ -139,8 +145,8 @@ class OptionStrategyOrderCore:
       self.bsm = BSM(context)
       # Initialize the contract utils
       self.contractUtils = ContractUtils(context)
-      # Initialize the Strategy Builder
-      self.strategyBuilder = StrategyBuilder(context)
+      # Initialize the Strategy Builder (share the same pricing model)
+      self.strategyBuilder = StrategyBuilder(context, bsm = self.bsm)
 
       # Initialize the parameters dictionary with the default values
       self.parameters = OptionStrategyOrderCore.defaultParameters.copy()
@@ -164,6 +170,10 @@ class OptionStrategyOrderCore:
       self.limitOrders = {}
       # Create FIFO list to keep track of all the recently closed positions (needed for the Dynamic DTE selection)
       self.recentlyClosedDTE = []
+      # Layouts of the records of this strategy in the position book (one for each combination of legs)
+      self.positionLayouts = {}
+      # Layouts of the stats of the legs in the position book (one for each combination of legs)
+      self.statsLayouts = {}
       
       # Keep track of the number of open positions that are specific to this strategy
       self.currentActivePositions = 0
@@ -287,6 +297,12 @@ class OptionStrategyOrderCore:
       rho = {}
       vomma = {}
       elasticity = {}
+      vanna = {}
+      charm = {}
+      speed = {}
+      zomma = {}
+      color = {}
+      veta = {}
       IV = {}
       midPrices = {}
       contractExpiry = {}
@@ -342,14 +358,22 @@ class OptionStrategyOrderCore:
          # Set the strike in the dictionary -> "<short|long><Call|Put>": <strike>
          strikes[f"{orderSideDesc}"] = contract.Strike
          contractExpiry[f"{orderSideDesc}"] = contract.Expiry
+         # Get the Greeks (rounded values, as they are reported in the output)
+         legGreeks = contract.BSMGreeks.asDict()
          # Set the Greeks and IV in the dictionary -> "<short|long><Call|Put>": <greek|IV>
-         delta[f"{orderSideDesc}"] = contract.BSMGreeks.Delta
-         gamma[f"{orderSideDesc}"] = contract.BSMGreeks.Gamma
-         vega[f"{orderSideDesc}"] = contract.BSMGreeks.Vega
-         theta[f"{orderSideDesc}"] = contract.BSMGreeks.Theta
-         rho[f"{orderSideDesc}"] = contract.BSMGreeks.Rho
-         vomma[f"{orderSideDesc}"] = contract.BSMGreeks.Vomma
-         elasticity[f"{orderSideDesc}"] = contract.BSMGreeks.Elasticity
+         delta[f"{orderSideDesc}"] = legGreeks["Delta"]
+         gamma[f"{orderSideDesc}"] = legGreeks["Gamma"]
+         vega[f"{orderSideDesc}"] = legGreeks["Vega"]
+         theta[f"{orderSideDesc}"] = legGreeks["Theta"]
+         rho[f"{orderSideDesc}"] = legGreeks["Rho"]
+         vomma[f"{orderSideDesc}"] = legGreeks["Vomma"]
+         elasticity[f"{orderSideDesc}"] = legGreeks["Elasticity"]
+         vanna[f"{orderSideDesc}"] = legGreeks["Vanna"]
+         charm[f"{orderSideDesc}"] = legGreeks["Charm"]
+         speed[f"{orderSideDesc}"] = legGreeks["Speed"]
+         zomma[f"{orderSideDesc}"] = legGreeks["Zomma"]
+         color[f"{orderSideDesc}"] = legGreeks["Color"]
+         veta[f"{orderSideDesc}"] = legGreeks["Veta"]
          IV[f"{orderSideDesc}"] = contract.BSMImpliedVolatility
 
          # Get the latest mid-price
@@ -418,38 +442,43 @@ class OptionStrategyOrderCore:
             orderQuantity = math.floor(orderQuantity)
 
 
-      # Internal function to evaluate the P&L of the position
-      def fValue(spotPrice, contracts, sides = None, atTime = None, openPremium = None):
-         # Compute the theoretical value at the given Spot price and point in time
-         prices = np.array([self.bsm.bsmPrice(contract
-                                              , sigma = contract.BSMImpliedVolatility
-                                              , spotPrice = spotPrice
-                                              , atTime = atTime
-                                              )
-                              for contract in contracts
-                            ]
-                           )
-         # Total value of the position
-         value = openPremium + sum(prices * np.array(sides))
-         return value
-
       # Get the current price of the underlying
       security = context.Securities[context.underlyingSymbol]
       underlyingPrice = context.GetLastKnownPrice(security).Price
 
+      # Get the payoff at expiration of the position
+      payoffProfile = self.getPayoffProfile(contracts, sides, premium = orderMidPrice)
       # Compute MaxLoss
-      maxLoss = self.computeOrderMaxLoss(contracts, sides)
+      maxLoss = self.computeOrderMaxLoss(contracts, sides, payoffProfile = payoffProfile)
       # Get the Profit Target percentage is specified (default is 50%)
       profitTargetPct = parameters.get("profitTarget", 0.5)
       #Compute T-Reg margin based on the MaxLoss
       TReg = min(0, orderMidPrice + maxLoss) * orderQuantity
 
+      # Determine the method used to calculate the profit target
+      profitTargetMethod = (parameters.get("profitTargetMethod", "Premium") or "Premium").lower()
+      thetaProfitDays = parameters.get("thetaProfitDays", 0) or 0
+
       portfolioMarginStress = parameters.get("portfolioMarginStress")
+      # Spot shocks: the first three are used for the portfolio margin (no move, downside and upside stress), followed by the stress grid
+      spotShocks = [0.0, -portfolioMarginStress, portfolioMarginStress]
+      stressGridSpotSteps = parameters.get("stressGridSpotSteps") or 0
+      if stressGridSpotSteps > 1:
+         spotShocks += list(np.linspace(-portfolioMarginStress, portfolioMarginStress, stressGridSpotSteps))
+      # Volatility shifts: the first one is the current IV
+      volShifts = [0.0] + list(parameters.get("stressGridVolShifts") or [])
+      # Points in time: the current time, followed by T+[thetaProfitDays] (only needed if the profit target is based on the theta)
+      atTimes = [context.Time]
+      if profitTargetMethod == "theta" and thetaProfitDays > 0:
+         atTimes.append(context.Time + timedelta(days = thetaProfitDays))
+
+      # Evaluate the P&L of the position across all the scenarios in one pass -> [spotShock, atTime, volShift]
+      scenarioPnL = midPrice + self.bsm.computeScenarioValues(contracts, sides, underlyingPrice * (1 + np.array(spotShocks)), atTimes = atTimes, volShifts = volShifts)
+
       # Compute the projected P&L of the position following a % movement of the underlying up or down
-      portfolioMargin = min(0
-                            , fValue(underlyingPrice * (1-portfolioMarginStress), contracts, sides = sides, atTime = context.Time, openPremium = midPrice)
-                            , fValue(underlyingPrice * (1+portfolioMarginStress), contracts, sides = sides, atTime = context.Time, openPremium = midPrice)
-                            ) * orderQuantity
+      portfolioMargin = min(0, scenarioPnL[1, 0, 0], scenarioPnL[2, 0, 0]) * orderQuantity
+      # Worst case P&L over the whole spot/volatility stress grid
+      stressMargin = min(0, scenarioPnL[:, 0, :].min()) * orderQuantity
 
 
       # Create order details
@@ -474,6 +503,12 @@ class OptionStrategyOrderCore:
                , "rho": rho
                , "vomma": vomma
                , "elasticity": elasticity
+               , "vanna": vanna
+               , "charm": charm
+               , "speed": speed
+               , "zomma": zomma
+               , "color": color
+               , "veta": veta
                , "IV": IV
                , "contracts": contracts
                , "targetPremium": targetPremium
@@ -481,8 +516,11 @@ class OptionStrategyOrderCore:
                , "orderQuantity": orderQuantity
                , "creditStrategy": sell
                , "maxLoss": maxLoss
+               , "maxGain": payoffProfile.maxGain()
+               , "breakevens": payoffProfile.breakevens()
                , "TReg": TReg
                , "portfolioMargin": portfolioMargin
+               , "stressMargin": stressMargin
                , "open": {"orders": []
                           , "fills": 0
                           , "filled": False
@@ -508,14 +546,11 @@ class OptionStrategyOrderCore:
             }
 
 
-      # Determine the method used to calculate the profit target
-      profitTargetMethod = (parameters.get("profitTargetMethod", "Premium") or "Premium").lower()
-      thetaProfitDays = parameters.get("thetaProfitDays", 0) or 0
       # Set a custom profit target unless we are using the default Premium based methodology
       if profitTargetMethod != "premium":
          if profitTargetMethod == "theta" and thetaProfitDays > 0:
-            # Calculate the P&L of the position at T+[thetaProfitDays]
-            thetaPnL = fValue(underlyingPrice, contracts, sides = sides, atTime = context.Time + timedelta(days = thetaProfitDays), openPremium = midPrice)
+            # Get the P&L of the position at T+[thetaProfitDays]
+            thetaPnL = scenarioPnL[0, 1, 0]
             # Profit target is a percentage of the P&L calculated at T+[thetaProfitDays]
             profitTargetAmt = profitTargetPct * abs(thetaPnL) * orderQuantity
          elif profitTargetMethod == "treg":
@@ -524,6 +559,9 @@ class OptionStrategyOrderCore:
          elif profitTargetMethod == "margin":
             # Profit target is a percentage of the margin requirement
             profitTargetAmt = profitTargetPct * abs(portfolioMargin) * orderQuantity
+         elif profitTargetMethod == "stress":
+            # Profit target is a percentage of the worst case P&L over the stress grid
+            profitTargetAmt = profitTargetPct * abs(stressMargin) * orderQuantity
          else:
             pass
          # Set the target profit for the position
@@ -552,21 +590,27 @@ class OptionStrategyOrderCore:
       # Return the payoff
       return payoff
       
-   def computeOrderMaxLoss(self, contracts, sides):
+   # Get the payoff at expiration of the position as a piecewise-linear function of the underlying price
+   def getPayoffProfile(self, contracts, sides, premium = 0.0):
+      return PayoffProfile([contract.Strike for contract in contracts]
+                           , [contract.Right == OptionRight.Call for contract in contracts]
+                           , sides
+                           , premium = premium
+                           )
+
+   def computeOrderMaxLoss(self, contracts, sides, payoffProfile = None):
       # Exit if there are no contracts to process
       if len(contracts) == 0:
          return 0
 
-      # Get the current price of the underlying
+      # Get the payoff profile of the position (unless it has been provided)
+      if payoffProfile == None:
+         payoffProfile = self.getPayoffProfile(contracts, sides)
+      # Lowest payoff at zero and at each strike
+      maxLoss = payoffProfile.y.min()
+      # The loss above the highest strike could be unbounded: evaluate it at the extreme (spotPrice = 10x higher)
       UnderlyingLastPrice = self.contractUtils.getUnderlyingLastPrice(contracts[0])
-      # Evaluate the payoff at the extreme (spotPrice = 0)
-      maxLoss = self.getPayoff(0, contracts, sides)
-      # Evaluate the payoff at each strike
-      for contract in contracts:
-         maxLoss = min(maxLoss, self.getPayoff(contract.Strike, contracts, sides))
-
-      # Evaluate the payoff at the extreme (spotPrice = 10x higher)
-      maxLoss = min(maxLoss, self.getPayoff(UnderlyingLastPrice*10, contracts, sides))      
+      maxLoss = min(maxLoss, payoffProfile.evaluate(UnderlyingLastPrice*10))
       # Cap the payoff at zero: we are only interested in losses
       maxLoss = min(0, maxLoss)
       # Return the max loss
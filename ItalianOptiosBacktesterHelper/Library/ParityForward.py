@@ -0,0 +1,113 @@
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+# Forward price and discount factor of each expiry, implied by the Put-Call parity of the quoted Call/Put pairs:
+#    C(K) - P(K) = DF * (F - K) = DF*F - DF*K
+# The difference between the Call and the Put mid-prices is a linear function of the strike: a (weighted) least squares fit of this line gives the
+# discount factor (-slope) and the forward (intercept/DF). The fits of all the expiries are solved at once, from the per-expiry sums of the regression.
+# The forward absorbs the dividends and the discount factor the funding rate, so pricing with spotPrice = F*DF and ir = -log(DF)/tau makes the
+# BSM model (no dividends) consistent with the quotes of the chain.
+
+import numpy as np
+
+
+# Forward and discount factor of a single expiry
+class ParityForward:
+
+   def __init__(self, forward, discountFactor, tau, pairs = None, rmse = None):
+      # Forward price of the underlying
+      self.forward = forward
+      # Discount factor to the expiration date
+      self.discountFactor = discountFactor
+      # Time to expiration (fraction of the year) used to convert the discount factor into a rate
+      self.tau = tau
+      # Number of Call/Put pairs used for the fit and root mean square error of the fit (C - P)
+      self.pairs = pairs
+      self.rmse = rmse
+
+   # Implied (continuously compounded) interest rate
+   @property
+   def rate(self):
+      return float(-np.log(self.discountFactor)/self.tau)
+
+   # Present value of the forward: the spot price to use in a model without dividends
+   @property
+   def spotPrice(self):
+      return float(self.forward * self.discountFactor)
+
+
+# Match the Calls and Puts with the same strike within each group (expiry).
+# Returns a tuple of arrays (callIdx, putIdx) with the positions of the matched contracts in the input arrays
+def matchParityPairs(groups, strikes, isCall):
+   groups = np.asarray(groups)
+   strikes = np.asarray(strikes, dtype = float)
+   isCall = np.asarray(isCall, dtype = bool)
+   if groups.size < 2:
+      return np.zeros(0, dtype = int), np.zeros(0, dtype = int)
+   # Sort by group, then strike, then right (Puts first)
+   order = np.lexsort((isCall, strikes, groups))
+   sortedGroups = groups[order]
+   sortedStrikes = strikes[order]
+   sortedIsCall = isCall[order]
+   # A pair is a Put immediately followed by a Call of the same group and strike
+   pairs = ((sortedGroups[:-1] == sortedGroups[1:])
+            & (sortedStrikes[:-1] == sortedStrikes[1:])
+            & ~sortedIsCall[:-1]
+            & sortedIsCall[1:]
+            )
+   return order[1:][pairs], order[:-1][pairs]
+
+
+# Fit the forward and the discount factor of each group from the matched pairs, in one pass:
+#  - groups: group (expiry) index of each pair (0 .. nGroups-1)
+#  - strikes, callPrices, putPrices: strike and mid-prices of the Call and of the Put of each pair
+#  - taus: time to expiration of each group
+#  - weights: weight of each pair in the fit (i.e. the inverse of the bid/ask spreads). Default: equal weights
+# Returns a list with one ParityForward per group (None if the group has less than minPairs pairs or if the fit is degenerate)
+def fitParityForwards(groups, strikes, callPrices, putPrices, taus, weights = None, minPairs = 3):
+   groups = np.asarray(groups, dtype = int)
+   strikes = np.asarray(strikes, dtype = float)
+   taus = np.asarray(taus, dtype = float)
+   nGroups = taus.size
+   y = np.asarray(callPrices, dtype = float) - np.asarray(putPrices, dtype = float)
+   if weights is None:
+      weights = np.ones(y.size)
+   weights = np.asarray(weights, dtype = float)
+
+   # Weighted sums of the regression of (C - P) on the strike
+   def groupSum(values):
+      return np.bincount(groups, weights = values, minlength = nGroups)
+
+   pairs = np.bincount(groups, minlength = nGroups)
+   sw = groupSum(weights)
+   sx = groupSum(weights * strikes)
+   sy = groupSum(weights * y)
+   sxx = groupSum(weights * strikes * strikes)
+   sxy = groupSum(weights * strikes * y)
+   with np.errstate(divide = "ignore", invalid = "ignore"):
+      # Slope (-DF) and intercept (DF*F) of the line
+      slope = (sw*sxy - sx*sy)/(sw*sxx - sx*sx)
+      intercept = (sy - slope*sx)/sw
+      discountFactor = -slope
+      forward = intercept/discountFactor
+      # Fitting error
+      residuals = y - (intercept[groups] + slope[groups]*strikes)
+      rmse = np.sqrt(groupSum(weights * residuals**2)/sw)
+
+   valid = (pairs >= minPairs) & (taus > 0) & np.isfinite(forward) & (forward > 0) & (discountFactor > 0)
+   return [ParityForward(float(forward[n]), float(discountFactor[n]), float(taus[n]), pairs = int(pairs[n]), rmse = float(rmse[n])) if valid[n] else None
+           for n in range(nGroups)
+           ]
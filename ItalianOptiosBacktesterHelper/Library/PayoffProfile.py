@@ -0,0 +1,84 @@
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+# Payoff at expiration of a multi-leg option position, represented as a piecewise-linear function of the underlying price.
+# Each leg contributes a kink at its strike, where the slope of the payoff increases by the signed quantity of the leg (for both Calls and Puts):
+#  - Below the lowest strike the slope is -(sum of the Put quantities), and at zero the payoff is sum(Put quantity * Strike)
+#  - Above the highest strike the slope is the sum of the Call quantities
+# The payoff at every node (zero and each distinct strike) is obtained by integrating the slopes in one pass, so the max loss, max gain and breakevens
+# are computed exactly (including the unbounded tail) without evaluating the position leg by leg at each candidate price.
+
+import numpy as np
+
+
+class PayoffProfile:
+
+   # strikes, isCall, sides: one entry per leg (sides is the signed quantity of each leg: +n -> Long, -n -> Short)
+   # premium: net premium of the position (credit > 0, debit < 0), added to the payoff when computing the breakevens
+   def __init__(self, strikes, isCall, sides, premium = 0.0):
+      strikes = np.asarray(strikes, dtype = float)
+      isCall = np.asarray(isCall, dtype = bool)
+      sides = np.asarray(sides, dtype = float)
+      self.premium = premium
+      # Distinct strikes (sorted) and the change of slope at each of them
+      breakpoints, legIdx = np.unique(strikes, return_inverse = True)
+      slopeChange = np.bincount(legIdx.ravel(), weights = sides, minlength = len(breakpoints))
+      # Slope below the lowest strike (Puts only) and above the highest strike (Calls only)
+      self.leftSlope = -float(np.sum(sides[~isCall]))
+      self.rightSlope = float(np.sum(sides[isCall]))
+      # Nodes of the piecewise-linear function: zero and each distinct strike
+      self.x = np.concatenate(([0.0], breakpoints))
+      # Slope of each segment between two consecutive nodes
+      slopes = self.leftSlope + np.concatenate(([0.0], np.cumsum(slopeChange)[:-1]))
+      # Payoff at each node
+      value0 = float(np.sum(sides[~isCall] * strikes[~isCall]))
+      self.y = value0 + np.concatenate(([0.0], np.cumsum(slopes * np.diff(self.x))))
+
+   # Payoff at the given underlying price(s)
+   def evaluate(self, spotPrice):
+      spotPrice = np.asarray(spotPrice, dtype = float)
+      # Beyond the last node the payoff is linear with slope rightSlope
+      value = np.where(spotPrice > self.x[-1]
+                       , self.y[-1] + self.rightSlope * (spotPrice - self.x[-1])
+                       , np.interp(spotPrice, self.x, self.y)
+                       )
+      return value if value.ndim > 0 else float(value)
+
+   # Lowest payoff (-Inf if the loss is unbounded as the underlying price goes up)
+   def maxLoss(self):
+      if self.rightSlope < 0:
+         return float("-inf")
+      return float(self.y.min())
+
+   # Highest payoff (Inf if the gain is unbounded as the underlying price goes up)
+   def maxGain(self):
+      if self.rightSlope > 0:
+         return float("inf")
+      return float(self.y.max())
+
+   # Underlying prices at which the P&L of the position at expiration (premium + payoff) is zero
+   def breakevens(self):
+      x = self.x
+      y = self.y + self.premium
+      # Nodes where the P&L is exactly zero
+      roots = [x[y == 0]]
+      # Segments where the P&L changes sign: linear interpolation
+      idx = np.flatnonzero(y[:-1]*y[1:] < 0)
+      roots.append(x[idx] - y[idx]*(x[idx+1] - x[idx])/(y[idx+1] - y[idx]))
+      # Tail beyond the last node
+      if y[-1]*self.rightSlope < 0:
+         roots.append([x[-1] - y[-1]/self.rightSlope])
+      return np.unique(np.concatenate(roots)).tolist()
@@ -0,0 +1,343 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+import numpy as np
+import pandas as pd
+
+# Set of fields of a book record, resolved once (i.e. for each strategy and combination of legs) and shared by all the records with the same fields
+class PositionLayout:
+
+   def __init__(self, fieldIds):
+      # Field ids, in the order of the values of the record
+      self.fieldIds = np.asarray(fieldIds, dtype = int)
+      # Set of the field ids (membership test)
+      self.fieldSet = frozenset(fieldIds)
+
+   def __len__(self):
+      return len(self.fieldIds)
+
+
+# Columnar book of all the positions (struct of arrays): one growable NumPy column per field, one row per position.
+#  - Numeric fields are stored in a single float64 block (one slot of the block per field, the column of the field is a view of its slot),
+#    all the other fields (strings, dates, flags, ...) in object columns. A field in the block only accepts numbers (None -> NaN)
+#  - Each field has an integer id (its column), so a record is a row index plus the layout of the fields it contains
+#  - book[orderId] returns a dict-like view of the record, so the existing code can keep reading and writing the fields by name
+#  - The book is converted into a DataFrame (one column per field) without going through a dictionary of dictionaries
+class PositionBook:
+
+   def __init__(self, capacity = 64, blockWidth = 64):
+      # Number of allocated rows
+      self.capacity = capacity
+      # Number of used rows
+      self.size = 0
+      # Field name -> field id
+      self.fieldIds = {}
+      # Field id -> field name
+      self.fieldNames = []
+      # Field id -> column
+      self.columns = []
+      # Block of the numeric fields (rows x slots) and number of used slots
+      self.block = np.full((capacity, blockWidth), float("NaN"))
+      self.blockSize = 0
+      # Field id -> slot of the field in the numeric block (-1 -> object column)
+      self.slots = []
+      # orderId -> row (insertion order)
+      self.rows = {}
+      # Row -> orderId
+      self.orderIds = []
+      # Row -> set of the field ids of the record
+      self.rowFields = []
+      # (set of field ids, field id) -> extended set of field ids (shared by all the rows with the same fields)
+      self.fieldSetExtensions = {}
+
+   def __len__(self):
+      return len(self.rows)
+
+   def __contains__(self, orderId):
+      return orderId in self.rows
+
+   def __iter__(self):
+      return iter(self.rows)
+
+   def __getitem__(self, orderId):
+      return PositionView(self, self.rows[orderId])
+
+   def __setitem__(self, orderId, position):
+      self.add(orderId, position)
+
+   def get(self, orderId, default = None):
+      if orderId in self.rows:
+         return self[orderId]
+      return default
+
+   def keys(self):
+      return self.rows.keys()
+
+   def values(self):
+      return [PositionView(self, row) for row in self.rows.values()]
+
+   def items(self):
+      return [(orderId, PositionView(self, row)) for orderId, row in self.rows.items()]
+
+   # Remove a position from the book (the row is left unused). Returns the record as a dictionary
+   def pop(self, orderId):
+      position = self[orderId].asDict()
+      self.rows.pop(orderId)
+      return position
+
+   # Type of the column used to store a value
+   def columnType(self, value):
+      if isinstance(value, (float, np.floating)):
+         return np.float64
+      return object
+
+   # Add a new field to the book. The type of the column is inferred from its first value
+   def addField(self, name, value = None):
+      fieldId = self.fieldIds.get(name)
+      if fieldId == None:
+         fieldId = len(self.fieldNames)
+         self.fieldIds[name] = fieldId
+         self.fieldNames.append(name)
+         if self.columnType(value) == object:
+            self.columns.append(np.full(self.capacity, None, dtype = object))
+            self.slots.append(-1)
+         else:
+            self.columns.append(None)
+            self.slots.append(-1)
+            self.assignSlot(fieldId)
+      return fieldId
+
+   # Store a field in a new slot of the numeric block
+   def assignSlot(self, fieldId):
+      if self.blockSize == self.block.shape[1]:
+         self.resizeBlock(self.capacity, 2*self.block.shape[1])
+      slot = self.blockSize
+      self.blockSize += 1
+      self.slots[fieldId] = slot
+      self.columns[fieldId] = self.block[:, slot]
+
+   # Reallocate the numeric block and point the numeric columns to the new block
+   def resizeBlock(self, capacity, width):
+      block = np.full((capacity, width), float("NaN"))
+      block[:self.size, :self.blockSize] = self.block[:self.size, :self.blockSize]
+      self.block = block
+      for fieldId, slot in enumerate(self.slots):
+         if slot >= 0:
+            self.columns[fieldId] = block[:, slot]
+
+   # Slots of the given fields in the numeric block. Object columns (i.e. fields initialized with None) are converted into numeric fields
+   def numericSlots(self, fieldIds):
+      for fieldId in fieldIds:
+         if self.slots[fieldId] < 0:
+            values = np.array(self.columns[fieldId][:self.size], dtype = float)
+            self.assignSlot(fieldId)
+            self.columns[fieldId][:self.size] = values
+      return np.array([self.slots[fieldId] for fieldId in fieldIds], dtype = int)
+
+   # Resolve the fields of a record (dictionary) into a layout. The fields that are not yet in the book are added
+   def resolve(self, position):
+      return PositionLayout([self.addField(name, value) for name, value in position.items()])
+
+   # Add a position (dictionary) to the book. The layout (if specified) must have been resolved from a record with the same fields
+   def add(self, orderId, position, layout = None):
+      if layout == None or len(layout) != len(position):
+         layout = self.resolve(position)
+      # Make room for the new row
+      if self.size == self.capacity:
+         self.grow()
+      row = self.size
+      self.size += 1
+      self.rows[orderId] = row
+      self.orderIds.append(orderId)
+      self.rowFields.append(layout.fieldSet)
+      # Store the values
+      for fieldId, value in zip(layout.fieldIds, position.values()):
+         self.setValue(row, fieldId, value)
+      return PositionView(self, row)
+
+   # Double the number of rows of all the columns
+   def grow(self):
+      capacity = 2*self.capacity
+      for fieldId, column in enumerate(self.columns):
+         if self.slots[fieldId] < 0:
+            newColumn = np.full(capacity, None, dtype = object)
+            newColumn[:self.size] = column[:self.size]
+            self.columns[fieldId] = newColumn
+      self.resizeBlock(capacity, self.block.shape[1])
+      self.capacity = capacity
+
+   def getValue(self, row, fieldId):
+      return self.columns[fieldId][row]
+
+   def setValue(self, row, fieldId, value):
+      # The fields in the numeric block never move to a different slot (the slots are cached by LegStatsLayout): they only accept numbers
+      if self.slots[fieldId] >= 0:
+         value = self.numericValue(fieldId, value)
+      self.columns[fieldId][row] = value
+
+   # Check a value written to a field of the numeric block: None is stored as NaN, integers only if they can be stored exactly as floats
+   def numericValue(self, fieldId, value):
+      if value is None:
+         return float("NaN")
+      if isinstance(value, (bool, np.bool_)) or not isinstance(value, (int, float, np.integer, np.floating)):
+         raise TypeError(f"Field {self.fieldNames[fieldId]} is numeric: cannot store a value of type {type(value).__name__}")
+      if isinstance(value, (int, np.integer)) and abs(int(value)) > 2**53:
+         raise TypeError(f"Field {self.fieldNames[fieldId]} is numeric: the integer {value} cannot be stored exactly")
+      return value
+
+   # Add a field to the set of fields of a row
+   def extendRow(self, row, fieldId):
+      fieldSet = self.rowFields[row]
+      key = (fieldSet, fieldId)
+      if key not in self.fieldSetExtensions:
+         self.fieldSetExtensions[key] = fieldSet | {fieldId}
+      self.rowFields[row] = self.fieldSetExtensions[key]
+
+   # Field ids of the positions in the book, in order of first appearance (same column order as a DataFrame built from a dictionary of records)
+   def usedFieldIds(self):
+      fieldIds = {}
+      for fieldSet in dict.fromkeys(self.rowFields[row] for row in self.rows.values()):
+         fieldIds.update(dict.fromkeys(sorted(fieldSet)))
+      return list(fieldIds)
+
+   # Convert the book into a DataFrame (one row per position, indexed by orderId)
+   def toDataFrame(self):
+      rows = np.fromiter(self.rows.values(), dtype = int, count = len(self.rows))
+      fieldIds = self.usedFieldIds()
+      if len(rows) == self.size:
+         # No rows have been removed: use a view of the used rows of each column
+         data = {self.fieldNames[fieldId]: self.columns[fieldId][:self.size] for fieldId in fieldIds}
+      else:
+         data = {self.fieldNames[fieldId]: self.columns[fieldId][rows] for fieldId in fieldIds}
+      # Infer the types of the object columns (i.e. integers -> int64/float64 columns), as in a DataFrame built from a dictionary of records
+      return pd.DataFrame(data, index = list(self.rows.keys()), copy = False).infer_objects()
+
+
+# Dictionary-like view of a record of the book
+class PositionView:
+
+   __slots__ = ("book", "row")
+
+   def __init__(self, book, row):
+      self.book = book
+      self.row = row
+
+   # Id of a field of the record (None if the record does not have the field)
+   def fieldId(self, name):
+      fieldId = self.book.fieldIds.get(name)
+      if fieldId == None or fieldId not in self.book.rowFields[self.row]:
+         return None
+      return fieldId
+
+   def __getitem__(self, name):
+      fieldId = self.fieldId(name)
+      if fieldId == None:
+         raise KeyError(name)
+      return self.book.getValue(self.row, fieldId)
+
+   def __setitem__(self, name, value):
+      book = self.book
+      fieldId = book.fieldIds.get(name)
+      if fieldId == None:
+         fieldId = book.addField(name, value)
+      if fieldId not in book.rowFields[self.row]:
+         book.extendRow(self.row, fieldId)
+      book.setValue(self.row, fieldId, value)
+
+   def __contains__(self, name):
+      return self.fieldId(name) != None
+
+   def __iter__(self):
+      return iter(self.keys())
+
+   def __len__(self):
+      return len(self.book.rowFields[self.row])
+
+   def get(self, name, default = None):
+      fieldId = self.fieldId(name)
+      if fieldId == None:
+         return default
+      return self.book.getValue(self.row, fieldId)
+
+   def keys(self):
+      return [self.book.fieldNames[fieldId] for fieldId in sorted(self.book.rowFields[self.row])]
+
+   def values(self):
+      return [self.book.getValue(self.row, fieldId) for fieldId in sorted(self.book.rowFields[self.row])]
+
+   def items(self):
+      return list(zip(self.keys(), self.values()))
+
+   def asDict(self):
+      return dict(self.items())
+
+
+# Layout of the stats of the legs of a position in the book, resolved once for each strategy and combination of legs:
+# slots in the numeric block of the book of the Min/Max/Close/EMA/Avg fields of each leg and variable (Greeks, midPrice, IV, PnL).
+# The stats of all the variables of all the legs of a position are updated at once, with a gather from the block and a scatter back into it.
+class LegStatsLayout:
+
+   # Stats of each variable, in the order of the first axis of the slots array
+   stats = ["Min", "Max", "Close", "EMA", "Avg"]
+
+   def __init__(self, book, name, sidesDesc, vars, emaMemory):
+      # Leg description -> leg index
+      self.legs = {legDesc: n for n, legDesc in enumerate(sidesDesc)}
+      # Prefix of the fields of each leg
+      fieldPrefixes = [f"{name}.{legDesc}" for legDesc in sidesDesc]
+      # Variables tracked for each leg
+      self.vars = list(vars)
+      # Flag of the PnL variable (its EMA is initialized on the first update)
+      self.isPnL = np.array([var == "PnL" for var in self.vars])
+      # Slots of the stats fields: shape = (stats, legs, vars)
+      fieldIds = [[[book.fieldIds[f"{fieldPrefix}.{var}.{stat}"] for var in self.vars]
+                   for fieldPrefix in fieldPrefixes
+                   ]
+                  for stat in [stat if stat != "EMA" else f"EMA({emaMemory})" for stat in LegStatsLayout.stats]
+                  ]
+      self.slots = book.numericSlots(np.ravel(fieldIds)).reshape(np.shape(fieldIds))
+      # Slots of the open fill price of each leg and of the update counter of the position
+      self.openFillPriceSlots = book.numericSlots([book.fieldIds[f"{fieldPrefix}.openFillPrice"] for fieldPrefix in fieldPrefixes])
+      self.countSlot = book.numericSlots([book.fieldIds["statsUpdateCount"]])[0]
+
+   # Update the stats of the given legs (indices) of the position stored in the given row of the book.
+   #  - values: latest value of each variable (shape = (legs, vars))
+   #  - active: flag of the variables that must be updated (i.e. the PnL is only available once the leg has been filled)
+   # The counter of the position is incremented once for each leg, in the order of the legs (the average of each leg uses its own count)
+   def update(self, book, row, legs, values, active, emaDecay):
+      block = book.block
+      # Update counter of each leg
+      statsUpdateCount = block[row, self.countSlot] + np.arange(1, len(legs)+1)
+      block[row, self.countSlot] = statsUpdateCount[-1]
+      statsUpdateCount = statsUpdateCount[:, np.newaxis]
+      # Current stats
+      slots = self.slots[:, legs, :]
+      minValue, maxValue, closeValue, emaValue, avgValue = block[row, slots]
+      # Initialize the EMA of the PnL on its first update
+      emaValue = np.where(self.isPnL & (statsUpdateCount == 2), values, emaValue)
+      # Min, Max, Close, EMA and Avg (the EMA uses the previous value, the Avg the number of updates)
+      newStats = np.array([np.where(values < minValue, values, minValue)
+                           , np.where(values > maxValue, values, maxValue)
+                           , values
+                           , emaDecay * emaValue + (1-emaDecay)*values
+                           , (avgValue*(statsUpdateCount-1) + values)/statsUpdateCount
+                           ])
+      # Store the stats of the active variables
+      block[row, slots] = np.where(active, newStats, block[row, slots])
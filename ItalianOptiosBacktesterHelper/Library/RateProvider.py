@@ -0,0 +1,91 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+import numpy as np
+from datetime import date
+
+# Day number (days since 1970-01-01) of a date/datetime object
+epochOrdinal = date(1970, 1, 1).toordinal()
+
+# Point-in-time lookup of an interest rate time series: for any given date, returns the most recent rate published on or before that date.
+# The series is expanded into a dense array with one entry per calendar day, so each lookup is just an index operation.
+class RateProvider:
+
+   def __init__(self, dates, rates):
+      # Sort the series by date
+      days = np.asarray(dates, dtype = "datetime64[D]").astype(np.int64)
+      rates = np.asarray(rates, dtype = float)
+      order = np.argsort(days, kind = "stable")
+      days = days[order]
+      rates = rates[order]
+      # Sorted day numbers and rates of the original series
+      self.days = days
+      self.rates = rates
+      # First and last day of the series
+      self.firstDay = int(days[0])
+      self.lastDay = int(days[-1])
+      # For each calendar day between the first and the last date, get the position of the most recent entry of the series
+      idx = np.searchsorted(days, np.arange(self.firstDay, self.lastDay + 1), side = "right") - 1
+      # Dense arrays (one entry per calendar day)
+      self.denseDays = days[idx]
+      self.denseRates = rates[idx]
+
+   def __len__(self):
+      return len(self.days)
+
+   # Convert a date (date, datetime, np.datetime64 or pd.Timestamp) into a day number
+   def dayNumber(self, date):
+      if hasattr(date, "toordinal"):
+         return date.toordinal() - epochOrdinal
+      return int(np.datetime64(date, "D").astype(np.int64))
+
+   # Get the most recent rate as of the given date. Returns a tuple (rateDate, rate) or (None, None) if the date is before the start of the series
+   def lookup(self, date):
+      day = self.dayNumber(date)
+      if day < self.firstDay:
+         return None, None
+      # Any date after the end of the series gets the last available rate
+      n = min(day, self.lastDay) - self.firstDay
+      return np.datetime64(int(self.denseDays[n]), "D").astype(object), float(self.denseRates[n])
+
+   # Get the most recent rate as of the given date (or the default value if the date is before the start of the series)
+   def getRate(self, date, default = None):
+      rateDate, rate = self.lookup(date)
+      if rateDate == None:
+         return default
+      return rate
+
+   # Vectorized version of getRate: returns an array with the most recent rate as of each of the given dates
+   def getRates(self, dates, default = np.nan):
+      days = np.asarray(dates, dtype = "datetime64[D]").astype(np.int64)
+      # Clip the dates to the range of the series
+      n = np.clip(days, self.firstDay, self.lastDay) - self.firstDay
+      return np.where(days < self.firstDay, default, self.denseRates[n])
+
+
+# Shared instance based on the FRED data (created the first time it is requested)
+fredRateProvider = None
+
+def getFredRateProvider():
+   global fredRateProvider
+   if fredRateProvider == None:
+      from fred import fredArrays
+      fredRateProvider = RateProvider(*fredArrays())
+   return fredRateProvider
@@ -125,22 +125,28 @@ class TEBombShelterStrategy(OptionStrategy):
       context = self.context
       
       if expiryList == None:
-         # List of expiry dates, sorted in reverse order
-         expiryList = sorted(set([contract.Expiry for contract in chain]), reverse = True)
+         if isinstance(chain, ChainSnapshot):
+            # List of expiry dates from the snapshot of the chain, sorted in reverse order
+            expiryList = chain.getExpiryList(0, float("inf"))
+         else:
+            # List of expiry dates, sorted in reverse order
+            expiryList = sorted(set([contract.Expiry for contract in chain]), reverse = True)
          # Log the list of expiration dates found in the chain
          self.logger.debug("Expiration dates in the chain:")
          for expiry in expiryList:
             self.logger.debug(f" -> {expiry}")
 
+      # Exit if there are no expiration dates to process
+      if not expiryList:
+         return
+
       # Get the furthest expiry date (Back cycle)
       backExpiry = expiryList[0]
       
-      # Get the list of expiry dates that are within the front-cycle DTE requirement
-      frontExpiryList = sorted([expiry for expiry in expiryList 
-                                   if (expiry.date() - context.Time.date()).days <= self.parameters["frontDte"]
-                               ]
-                               , reverse = True
-                               )
+      # Get the list of expiry dates that are within the front-cycle DTE requirement (the list is already sorted in reverse order)
+      frontExpiryList = [expiry for expiry in expiryList 
+                           if (expiry.date() - context.Time.date()).days <= self.parameters["frontDte"]
+                         ]
 
       # Exit if we could not find any front-cycle expiration
       if not frontExpiryList:
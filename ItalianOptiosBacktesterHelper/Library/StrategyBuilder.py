@@ -21,6 +21,9 @@ from AlgorithmImports import *
 from Logger import *
 from ContractUtils import *
 from BSMLibrary import *
+from ChainIndex import *
+from bisect import bisect_right
+import numpy as np
 
 class StrategyBuilder:
 
@@ -30,15 +33,21 @@ class StrategyBuilder:
    #    - maxOrderQuantity: (Optional) Caps the number of contracts that are bought/sold (Default: 1). 
    #         If targetPremium == None  -> This is the number of contracts bought/sold.
    #         If targetPremium != None  -> The order is executed only if the number of contracts required to reach the target credit/debit does not exceed the maxOrderQuantity
-   def __init__(self, context):
+   #    - deltaSearchMethod: (Optional) controls how getDeltaContract finds the contract with the requested Delta (Default: Vectorized). Valid options are (case insensitive):
+   #         Bisection  -> Bisection over the strikes, computing the Greeks of each contract being probed
+   #         Vectorized -> Computes the Greeks of all the contracts in one pass and resolves the requested deltas with a binary search (same result as the Bisection)
+   # \param[in] bsm is an optional BSM pricing model to share with the caller (a new one is created if not specified)
+   def __init__(self, context, bsm = None):
       # Set the context (QCAlgorithm object)
       self.context = context
       # Initialize the BSM pricing model
-      self.bsm = BSM(context)
+      self.bsm = bsm or BSM(context)
       # Set the logger
       self.logger = Logger(context, className = type(self).__name__, logLevel = context.logLevel)
       # Initialize the contract utils
       self.contractUtils = ContractUtils(context)
+      # Method used to find the contract with the requested Delta
+      self.deltaSearchMethod = getattr(context, "deltaSearchMethod", "Vectorized")
 
 
    # Returns True/False based on whether the option contract is of the specified type (Call/Put)
@@ -61,6 +70,10 @@ class StrategyBuilder:
       # Initialize result
       atm_contracts = []
 
+      # If the contracts have been indexed, only consider the contracts around the current price of the underlying
+      if isinstance(contracts, ChainIndex) and contracts.isSingleExpiry():
+         contracts = self.getATMCandidates(contracts, type = type)
+
       # Sort the contracts based on how close they are to the current price of the underlying. 
       # Filter them by the selected contract type (Put/Call or both)
       sorted_contracts = sorted([contract 
@@ -85,6 +98,21 @@ class StrategyBuilder:
       return atm_contracts
 
 
+   # Get the contracts with the strike closest to the current price of the underlying (two on each side of the price, for each type), in their original order
+   def getATMCandidates(self, chainIndex, type = None):
+      # Get the current price of the underlying (resolved once per bar if the chain is a snapshot)
+      if isinstance(chainIndex, ChainSnapshot):
+         spotPrice = chainIndex.getSpotPrice()
+      else:
+         spotPrice = self.contractUtils.getUnderlyingLastPrice(chainIndex[0])
+      # Filter by the selected contract type (Put/Call or both)
+      rights = {"put": [OptionRight.Put], "call": [OptionRight.Call]}.get((type or "").lower(), [OptionRight.Put, OptionRight.Call])
+      candidates = []
+      for right in rights:
+         candidates += chainIndex.getSide(right).nearest(spotPrice, n = 2)
+      # Restore the original order of the contracts (this is used to break the ties when sorting by distance from the ATM)
+      return [contract for position, contract in sorted(candidates, key = lambda x: x[0])]
+
    def getATMStrike(self, contracts):
       ATMStrike = None
       # Get the ATM contracts
@@ -106,6 +134,10 @@ class StrategyBuilder:
       # Skip processing if the option type or Delta has not been specified
       if delta == None or not contracts:
          return
+
+      # Check if we can compute the Greeks for all the contracts at once
+      if self.deltaSearchMethod.lower() == "vectorized":
+         return self.getDeltaContracts(contracts, [delta])[0]
       
       leftIdx = 0
       rightIdx = len(contracts)-1
@@ -169,6 +201,93 @@ class StrategyBuilder:
 
 
 
+   # Returns the contracts with the closest Delta to each of the requested deltas: this is the same contract that getDeltaContract would find with the 
+   # Bisection method, but the Greeks are computed for all the contracts in one pass and all the deltas are resolved at once.
+   # Same assumptions as getDeltaContract:
+   #  - Input list contracts must be sorted by ascending strike
+   #  - All contracts in the list must be of the same type (Call|Put)
+   def getDeltaContracts(self, contracts, deltas):
+      # Skip processing if there are no contracts
+      if not contracts:
+         return [None] * len(deltas)
+
+      # Compute the Greeks for all the contracts in one pass
+      contracts = list(contracts)
+      self.bsm.setGreeks(contracts)
+
+      # Absolute value of the Delta of each contract (sorted by ascending strike)
+      absDelta = np.abs(np.array([contract.BSMGreeks.Delta for contract in contracts], dtype = float))
+      # Requested deltas
+      targets = np.asarray(deltas, dtype = float)/100.0
+
+      # Index of the last contract
+      lastIdx = len(contracts)-1
+      if lastIdx == 0:
+         return [contracts[0]] * len(deltas)
+
+      isCall = contracts[lastIdx].Right == OptionRight.Call
+      # The absolute Delta is decreasing with the strike for the Calls and increasing for the Puts
+      if isCall:
+         isMonotonic = np.all(np.diff(absDelta) <= 0)
+      else:
+         isMonotonic = np.all(np.diff(absDelta) >= 0)
+
+      if not isMonotonic:
+         # The binary search is only valid if the deltas are monotonic: replicate the steps of the Bisection method using the deltas computed above
+         return [contracts[self.deltaBisection(absDelta, target, isCall)] for target in targets]
+
+      # Find the two contracts around each of the requested deltas
+      if isCall:
+         # Last contract with a Delta higher than the requested Delta
+         leftIdx = np.searchsorted(-absDelta, -targets, side = "left") - 1
+      else:
+         # Last contract with a Delta lower than or equal to the requested Delta
+         leftIdx = np.searchsorted(absDelta, targets, side = "right") - 1
+      leftIdx = np.clip(leftIdx, 0, lastIdx-1)
+      rightIdx = leftIdx + 1
+      # Choose the contract with the closest Delta (the one on the left in case of a tie)
+      deltaIdx = np.where(np.abs(absDelta[rightIdx] - targets) < np.abs(absDelta[leftIdx] - targets), rightIdx, leftIdx)
+
+      # Check if the requested Delta is outside of the range
+      if isCall:
+         # Furthest OTM Call has a Delta higher than the requested Delta -> furthest OTM Call. Furthest ITM Call has a Delta lower than the requested Delta -> furthest ITM Call
+         deltaIdx = np.where(absDelta[lastIdx] > targets, lastIdx, np.where(absDelta[0] < targets, 0, deltaIdx))
+      else:
+         # Furthest OTM Put has a Delta higher than the requested Delta -> furthest OTM Put. Furthest ITM Put has a Delta lower than the requested Delta -> furthest ITM Put
+         deltaIdx = np.where(absDelta[0] > targets, 0, np.where(absDelta[lastIdx] < targets, lastIdx, deltaIdx))
+
+      return [contracts[n] for n in deltaIdx]
+
+   # Bisection method used by getDeltaContract, applied to a list of precomputed absolute deltas (sorted by ascending strike). Returns the index of the contract with the closest Delta
+   def deltaBisection(self, absDelta, target, isCall):
+      leftIdx = 0
+      rightIdx = len(absDelta)-1
+      # Check if the requested Delta is outside of the range
+      if isCall:
+         if absDelta[rightIdx] > target:
+            return rightIdx
+         elif absDelta[leftIdx] < target:
+            return leftIdx
+      else:
+         if absDelta[leftIdx] > target:
+            return leftIdx
+         elif absDelta[rightIdx] < target:
+            return rightIdx
+      # The requested Delta is inside the range
+      while (rightIdx-leftIdx) > 1:
+         # Get the middle point
+         middleIdx = round((leftIdx + rightIdx)/2.0)
+         # Determine which side we need to continue the search
+         if (absDelta[middleIdx] > target) == isCall:
+            leftIdx = middleIdx
+         else:
+            rightIdx = middleIdx
+      # Choose the contract with the closest Delta
+      if abs(absDelta[rightIdx] - target) < abs(absDelta[leftIdx] - target):
+         return rightIdx
+      return leftIdx
+
+
    def getDeltaStrike(self, contracts, delta = None):
       deltaStrike = None
       # Get the contract with the closest Delta
@@ -181,9 +300,18 @@ class StrategyBuilder:
       return deltaStrike
 
    def getFromDeltaStrike(self, contracts, delta = None, default = None):
-      fromDeltaStrike = default
-      # Get the call with the closest Delta
+      # Get the contract with the closest Delta
+      deltaContract = self.getDeltaContract(contracts, delta = delta)
+      return self.fromDeltaContractStrike(deltaContract, delta = delta, default = default)
+
+   def getToDeltaStrike(self, contracts, delta = None, default = None):
+      # Get the contract with the closest Delta
       deltaContract = self.getDeltaContract(contracts, delta = delta)
+      return self.toDeltaContractStrike(deltaContract, delta = delta, default = default)
+
+   # Lower bound of the From Delta range (Puts) or upper bound (Calls), given the contract with the closest Delta
+   def fromDeltaContractStrike(self, deltaContract, delta = None, default = None):
+      fromDeltaStrike = default
       # Check if we found the contract
       if deltaContract:
          if abs(deltaContract.BSMGreeks.Delta) >= delta/100.0:
@@ -196,10 +324,9 @@ class StrategyBuilder:
             fromDeltaStrike = deltaContract.Strike + offset
       return fromDeltaStrike
 
-   def getToDeltaStrike(self, contracts, delta = None, default = None):
+   # Upper bound of the To Delta range (Puts) or lower bound (Calls), given the contract with the closest Delta
+   def toDeltaContractStrike(self, deltaContract, delta = None, default = None):
       toDeltaStrike = default
-      # Get the put with the closest Delta
-      deltaContract = self.getDeltaContract(contracts, delta = delta)
       # Check if we found the contract
       if deltaContract:
          if abs(deltaContract.BSMGreeks.Delta) <= delta/100.0:
@@ -212,6 +339,18 @@ class StrategyBuilder:
             toDeltaStrike = deltaContract.Strike + offset
       return toDeltaStrike
 
+   # Returns the contracts with the closest Delta to fromDelta and toDelta (None if the Delta has not been specified).
+   # With the Vectorized search both deltas are resolved with a single pass of the Greeks (same assumptions as getDeltaContract)
+   def getFromToDeltaContracts(self, contracts, fromDelta = None, toDelta = None):
+      if self.deltaSearchMethod.lower() != "vectorized" or not contracts:
+         return self.getDeltaContract(contracts, delta = fromDelta), self.getDeltaContract(contracts, delta = toDelta)
+      # Only search for the deltas that have been specified
+      deltas = [delta for delta in [fromDelta, toDelta] if delta != None]
+      deltaContracts = iter(self.getDeltaContracts(contracts, deltas))
+      fromContract = None if fromDelta == None else next(deltaContracts)
+      toContract = None if toDelta == None else next(deltaContracts)
+      return fromContract, toContract
+
 
    def getPutFromDeltaStrike(self, contracts, delta = None):   
       return self.getFromDeltaStrike(contracts, delta = delta, default = 0.0)
@@ -236,32 +375,12 @@ class StrategyBuilder:
       # Get the Put contracts, sorted by ascending strike. Apply the Strike/Price constraints
       puts = []
       if type == None or type.lower() == "put":
-         puts = sorted([contract 
-                         for contract in contracts 
-                            if self.optionTypeFilter(contract, "Put")
-                            # Strike constraint
-                            and (fromStrike <= contract.Strike <= toStrike)
-                            # Option price constraint (based on the mid-price)
-                            and (fromPrice <= self.contractUtils.midPrice(contract) <= toPrice)
-                       ]
-                       , key = lambda x: x.Strike
-                       , reverse = False
-                       )
+         puts = self.getSortedContracts(contracts, OptionRight.Put, fromStrike = fromStrike, toStrike = toStrike, fromPrice = fromPrice, toPrice = toPrice)
                     
       # Get the Call contracts, sorted by ascending strike. Apply the Strike/Price constraints
       calls = []
       if type == None or type.lower() == "call":
-         calls = sorted([contract 
-                          for contract in contracts 
-                             if self.optionTypeFilter(contract, "Call")
-                             # Strike constraint
-                             and (fromStrike <= contract.Strike <= toStrike)
-                             # Option price constraint (based on the mid-price)
-                             and (fromPrice <= self.contractUtils.midPrice(contract) <= toPrice)
-                        ]
-                        , key = lambda x: x.Strike
-                        , reverse = False
-                        )
+         calls = self.getSortedContracts(contracts, OptionRight.Call, fromStrike = fromStrike, toStrike = toStrike, fromPrice = fromPrice, toPrice = toPrice)
 
 
       deltaFilteredPuts = puts
@@ -269,16 +388,18 @@ class StrategyBuilder:
       # Check if we need to filter by Delta
       if (fromDelta or toDelta):
          # Find the strike range for the Puts based on the From/To Delta
-         putFromDeltaStrike = self.getPutFromDeltaStrike(puts, delta = fromDelta)
-         putToDeltaStrike = self.getPutToDeltaStrike(puts, delta = toDelta)
+         putFromContract, putToContract = self.getFromToDeltaContracts(puts, fromDelta = fromDelta, toDelta = toDelta)
+         putFromDeltaStrike = self.fromDeltaContractStrike(putFromContract, delta = fromDelta, default = 0.0)
+         putToDeltaStrike = self.toDeltaContractStrike(putToContract, delta = toDelta, default = float('Inf'))
          # Filter the Puts based on the delta-strike range
          deltaFilteredPuts = [contract for contract in puts
                                  if putFromDeltaStrike <= contract.Strike <= putToDeltaStrike
                               ]
 
          # Find the strike range for the Calls based on the From/To Delta
-         callFromDeltaStrike = self.getCallFromDeltaStrike(calls, delta = fromDelta)
-         callToDeltaStrike = self.getCallToDeltaStrike(calls, delta = toDelta)
+         callFromContract, callToContract = self.getFromToDeltaContracts(calls, fromDelta = fromDelta, toDelta = toDelta)
+         callFromDeltaStrike = self.fromDeltaContractStrike(callFromContract, delta = fromDelta, default = float('Inf'))
+         callToDeltaStrike = self.toDeltaContractStrike(callToContract, delta = toDelta, default = 0)
          # Filter the Puts based on the delta-strike range. For the calls, the Delta decreases with increasing strike, so the order of the filter is inverted
          deltaFilteredCalls = [contract for contract in calls
                                  if callToDeltaStrike <= contract.Strike <= callFromDeltaStrike
@@ -294,6 +415,25 @@ class StrategyBuilder:
       return result   
 
 
+   # Get the contracts of the given type (OptionRight.Put|OptionRight.Call) sorted by ascending strike, within the Strike/Price constraints
+   def getSortedContracts(self, contracts, right, fromStrike = 0, toStrike = float('inf'), fromPrice = 0, toPrice = float('inf')):
+      # Use the strike-sorted arrays if the contracts have been indexed
+      if isinstance(contracts, ChainIndex) and contracts.isSingleExpiry():
+         return contracts.getSide(right).getContracts(fromStrike = fromStrike, toStrike = toStrike, fromPrice = fromPrice, toPrice = toPrice)
+
+      return sorted([contract 
+                      for contract in contracts 
+                         if contract.Right == right
+                         # Strike constraint
+                         and (fromStrike <= contract.Strike <= toStrike)
+                         # Option price constraint (based on the mid-price)
+                         and (fromPrice <= self.contractUtils.midPrice(contract) <= toPrice)
+                    ]
+                    , key = lambda x: x.Strike
+                    , reverse = False
+                    )
+
+
    def getPuts(self, contracts, fromDelta = None, toDelta = None, fromStrike = None, toStrike = None, fromPrice = None, toPrice = None):
 
       # Sort the Put contracts by their strike in reverse order. Filter them by the specified criteria (Delta/Strike/Price constrains)
@@ -338,20 +478,19 @@ class StrategyBuilder:
       if len(contracts) > 1 and wingSize > 0:
          # Get the short strike
          firstLegStrike = contracts[0].Strike
+         # The distance from the first leg is increasing along the list: find the last contract within the specified wing size
+         wingIdx = bisect_right(contracts, wingSize, lo = 1, key = lambda contract: abs(contract.Strike - firstLegStrike))
          # keep track of the wing size based on the long contract being selected
          currentWings = 0
-         # Loop through all contracts
-         for contract in contracts[1:]:
+         if wingIdx > 1:
             # Select the long contract as long as it is within the specified wing size
-            if abs(contract.Strike - firstLegStrike) <= wingSize:
-               currentWings = abs(contract.Strike - firstLegStrike)
+            wingContract = contracts[wingIdx-1]
+            currentWings = abs(wingContract.Strike - firstLegStrike)
+         if wingIdx < len(contracts):
+            # Check if the distance to the requested wing size of the first contract exceeding it is closer than the contract previously selected
+            contract = contracts[wingIdx]
+            if (abs(contract.Strike - firstLegStrike) - wingSize < wingSize - currentWings):
                wingContract = contract
-            else:
-               # We have exceeded the wing size, check if the distance to the requested wing size is closer than the contract previously selected
-               if (abs(contract.Strike - firstLegStrike) - wingSize < wingSize - currentWings):
-                  wingContract = contract
-               break
-         ### Loop through all contracts
       ### if wingSize > 0
 
       return wingContract
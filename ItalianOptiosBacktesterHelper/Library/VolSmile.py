@@ -0,0 +1,98 @@
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+# Parametric volatility smile of a single expiry, based on the raw SVI parameterization of the total implied variance (w = IV^2 * tau)
+# as a function of the log-moneyness k = log(K/F):
+#    w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + sigma^2))
+# Once fitted, the IV of any strike is obtained by evaluating the formula (no root search).
+
+import numpy as np
+from scipy.optimize import least_squares
+
+
+# Total implied variance of the raw SVI model
+def sviTotalVariance(k, a, b, rho, m, sigma):
+   km = k - m
+   return a + b*(rho*km + np.sqrt(km*km + sigma*sigma))
+
+
+# Least squares fit of the raw SVI parameters to a sample of log-moneyness (k) / total implied variance (w) points.
+# Returns a tuple (a, b, rho, m, sigma) or None if the fit did not succeed
+def fitSVI(k, w, weights = None):
+   k = np.asarray(k, dtype = float)
+   w = np.asarray(w, dtype = float)
+   if weights is None:
+      weights = np.ones(len(k))
+   # Initial guess: vertex of the smile at the point with the lowest variance
+   minIdx = np.argmin(w)
+   x0 = [0.5*w[minIdx], 0.1, -0.5, k[minIdx], 0.1]
+   # Bounds: b >= 0 (slope of the wings), |rho| < 1, sigma > 0 (curvature at the vertex), vertex within the range of the data (with some margin)
+   kRange = max(k.max() - k.min(), 0.1)
+   lowerBounds = [-w.max(), 0.0, -0.999, k.min() - kRange, 1e-4]
+   upperBounds = [w.max(), 10.0, 0.999, k.max() + kRange, 10.0]
+   x0 = np.clip(x0, lowerBounds, upperBounds)
+
+   def residuals(params):
+      return weights*(sviTotalVariance(k, *params) - w)
+
+   try:
+      result = least_squares(residuals, x0, bounds = (lowerBounds, upperBounds), x_scale = "jac")
+   except ValueError:
+      return None
+   if not result.success:
+      return None
+   return tuple(result.x)
+
+
+# Fitted smile of a single expiry
+class SVISmile:
+
+   def __init__(self, params, forward, tau, rmse = None, points = None):
+      # SVI parameters (a, b, rho, m, sigma)
+      self.params = params
+      # Forward price of the underlying
+      self.forward = forward
+      # Time to expiration (fraction of the year) used for the fit
+      self.tau = tau
+      # Root mean square error of the fit (IV) and number of points used
+      self.rmse = rmse
+      self.points = points
+
+   # Total implied variance of the given strikes
+   def totalVariance(self, strikes):
+      k = np.log(np.asarray(strikes, dtype = float)/self.forward)
+      # The variance cannot be negative
+      return np.maximum(sviTotalVariance(k, *self.params), 0.0)
+
+   # Implied Volatility of the given strikes
+   def IV(self, strikes):
+      return np.sqrt(self.totalVariance(strikes)/self.tau)
+
+
+# Fit a smile to a sample of strike/IV points of a single expiry. Returns an SVISmile object or None if there are not enough points or the fit did not succeed
+def fitSmile(strikes, IV, forward, tau, minPoints = 5):
+   strikes = np.asarray(strikes, dtype = float)
+   IV = np.asarray(IV, dtype = float)
+   if tau <= 0 or len(strikes) < minPoints:
+      return None
+   # Fit the total variance as a function of the log-moneyness
+   params = fitSVI(np.log(strikes/forward), IV**2 * tau)
+   if params is None:
+      return None
+   smile = SVISmile(params, forward, tau, points = len(strikes))
+   # Fitting error (in terms of IV)
+   smile.rmse = float(np.sqrt(np.mean((smile.IV(strikes) - IV)**2)))
+   return smile
@@ -3,14 +3,68 @@ from AlgorithmImports import *
 #endregion
 
 import fred_data_2000_2006, fred_data_2007_2023
-from io import StringIO
-import pandas as pd
+import numpy as np
+import base64, zlib
 
-fred_csv_data = """
+# The FRED data is loaded lazily (on first use):
+#  - fredArrays(): returns a tuple (days, rates) of NumPy arrays. It uses the packed copy of the data (fred_packed.py) unless it is missing or stale
+#  - fred: pandas DataFrame with the columns date and ir (parsed from the csv data)
+#  - fred_csv_data: the csv data (date,ir)
+# To regenerate fred_packed.py after updating the csv data, run: python Scripts/pack_fred_data.py
+
+# Scale factor of the rates in the packed data (the rates have 4 decimals)
+fredRateScale = 10000
+
+# Cache of the arrays (days, rates)
+fredArraysCache = None
+
+# Get the csv data
+def fredCsvData():
+   fred_csv_data = """
 date,ir
 """
-
-fred_csv_data += fred_data_2000_2006.fred_csv_data + fred_data_2007_2023.fred_csv_data
+   fred_csv_data += fred_data_2000_2006.fred_csv_data + fred_data_2007_2023.fred_csv_data
+   return fred_csv_data
 
 # Parse the csv data
-fred = pd.read_csv(StringIO(fred_csv_data), parse_dates = ["date"])
+def parseFredCsvData():
+   from io import StringIO
+   import pandas as pd
+   return pd.read_csv(StringIO(fredCsvData()), parse_dates = ["date"])
+
+# Unpack the data in fred_packed.py. Returns None if the packed data is missing or it was not generated from the current csv data
+def unpackFredData():
+   try:
+      import fred_packed
+   except ImportError:
+      return None
+   # Check if the packed data is up to date (checksum of the csv data it was generated from)
+   if fred_packed.fred_packed_source_crc32 != zlib.crc32((fred_data_2000_2006.fred_csv_data + fred_data_2007_2023.fred_csv_data).encode("utf-8")):
+      return None
+   rows = fred_packed.fred_packed_rows
+   # Decode the data: int32 day numbers followed by int32 scaled rates
+   raw = np.frombuffer(zlib.decompress(base64.b64decode(fred_packed.fred_packed_data)), dtype = "<i4")
+   days = raw[:rows].astype("datetime64[D]")
+   rates = raw[rows:]/fredRateScale
+   return days, rates
+
+# Get the FRED data as a tuple (days, rates) of NumPy arrays
+def fredArrays():
+   global fredArraysCache
+   if fredArraysCache == None:
+      # Use the packed data if available, else fall back to parsing the csv data
+      fredArraysCache = unpackFredData()
+      if fredArraysCache == None:
+         fred = parseFredCsvData()
+         fredArraysCache = (fred["date"].values.astype("datetime64[D]"), fred["ir"].values)
+   return fredArraysCache
+
+# Lazy loading of the module attributes fred and fred_csv_data
+def __getattr__(name):
+   if name == "fred":
+      globals()["fred"] = parseFredCsvData()
+      return globals()["fred"]
+   elif name == "fred_csv_data":
+      globals()["fred_csv_data"] = fredCsvData()
+      return globals()["fred_csv_data"]
+   raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,124 @@
+#region imports
+from AlgorithmImports import *
+#endregion
+
+# Packed copy of the FRED data in fred_data_2000_2006.py and fred_data_2007_2023.py (loaded by fred.py)
+# Generated by Scripts/pack_fred_data.py: DO NOT EDIT. Run the script again whenever the csv data is updated.
+#  - fred_packed_source_crc32: CRC-32 checksum of the csv strings used to generate this file (used to detect stale data)
+#  - fred_packed_rows: number of rows
+#  - fred_packed_data: base64(zlib(int32 day numbers since 1970-01-01 + int32 rates * 10000))
+
+fred_packed_source_crc32 = 1272364788
+
+fred_packed_rows = 3041
+
+fred_packed_data = """
+eNqV3HnYTVX/OP56KvM8RYYipKLJUCpUitKAKCTJGI0KZQpJhmROQjMq8zwUhWSKRKkkopIGhVBSqu/r/J73uX77uq9bT58/Xtd7
+7TXttfbZe5+197n54JwTTtjEZj7kIz7hU7byGdv4gp3s4kt28w17+Jbv2MuP/MQ+9nOQQxzmF37lKL/zB8f4kxPPPeGE/3ASJ5OV
+bGQnBznJQ17ykZ8CFKYIp1KUYpSgJKU4nTM4k7KUozxncQ7nUpFKnMeFXERlqlCVS6jOZVxOLa7gSmpTh7rU40Zuoj4NaEhjbuFW
+mtCU5txOC+6gJW1oSzva05G7uYd7uY9OPMhDdKYLj9CN7vSgJ73pQ18eox9PMJBBDOYphjKM4YxgNE8zhmcYy3gm8BzP8wIv8woT
+mcRkXmcKU5nGdGYxmznMZR4LWcRi3uBN3uJtlrOCVaxmDWvZwEY+4EM+Ygsf8wmfsY3t7GAXX/IVX7Ob7/ieH9jLPvZzgJ85yC/8
+yhGOcoy/+JsTKjo/OZlTyEJWcpCTXOQmD/kpQEEKU5RinEZxSnA6Z1CaMpxJec6iAmdzDpU4jwu4kKpU4xIupwY1qcVV1OZqrqEO
+9bieG7iRBjTkZhrRmCY0pRm30Zw7aMmdtKYd7bmLDnTkPu7nATrRmS505RF60otH6c1jPE5/nmAQg3mSITzFcEYwklGM5hnG8izj
+GM/zvMCLvMTLTGIyr/IarzON6cxgJrOYyzzms4CFvMGbLGEpb7GcFbzDu6xhLet4j/V8wCY28yEf8wmfspXP2M4OvmAnu/iab9jD
+t/zAXn7kJ/bxMwc5zC/8xlF+5xh/c0Il90/+w0lkIRvZyUFu8pCXfOSnEIUpwqkUpTglKEkpTqcMZ1KWcpTnbM6hIpW4kIuoTBUu
+pjqXchk1qcUVXMlVXEMd6nIt13EDN3IT9WlAY26hCbfRnNtpwR20ojVtaEs7OnA393AvD9CJB3mIzjxCN7rTg0fpTR8eoz9PMICB
+DGIITzGUYQxnFKN5mjE8wzjG8xzP8xKvMJFJvMYUpjKN2cxhLgtYyCIW8wZv8TbLWM5K3mU1a3iP9WzgfTaymQ/5iC18zGds43O2
+s5NdfMlXfM0evuU7vucHfmIf+znAzxzmF37lCL/xB8f4k7/4O3VOnuec5GROIQvZyUFOcpGbfOSnAAUpxKkUpRinUZxSnM4ZlKYM
+5SjPWVSgIpU4j/O5gMpUoSrVuJjLuJwa1ORKrqI2V3MN13Id9bieG6hPAxpyM424lSY0pRm30YI7aEkr2tKO9txFB+7hXu7jfh7g
+ITrTha48THd60JNePEpfHqMf/RnIIAbzJEMYxnBGMJJRjOEZxvIs43ieF3iRl5jIJCbzKq8xlWlMZwYzmcNc5jGfBSzmTZawlGUs
+ZwXvsJI1rGUd7/E+G/mATWxmCx/zCZ+ylc/Zzg6+YCdfs5tv2MP3/MBefuQnDvAzBznMEX7jKL/zB39xwvnOWU4hC1nJRnZykZu8
+5KMghSjCqZxGcUpQitKU4UzKUo6zOYdzqcj5XMCFXERlqnEx1bmUGtSkFldwJddQh7pcy/XcwE3UpxGNuYVbacZtNOd2WnAnrWhD
+W+6iAx25m3u4nwfoxIM8RFce5hG60Z1ePEpv+tCXx+nPEwzkSYbwFEMZxkhG8TRjeJZxjGcCz/ESrzCR13idqcxgJrOYzRzms4CF
+LGYJS3mLZbzDSt5lFatZx3usZwOb2MyHfMQWPmUrn7GNz/mCneziS77iG/bwLd/xPT+xj/0c4BCH+YVfOcLv/MEx/uQvTrzAuchJ
+nMwpZCcHOclFXvJRgIIU4VSKcRolKcXpnEFpylKO8pxFBSpSifM4n8pUoSrVqM6lXE4NruBKrqI2V1OXa6nH9dxEAxpyM7dwK01p
+RgvuoA1taUd77uJu7uFeHuQhutCVbnSnB33oy2M8zgAGMojBDGUYwxnBSMbwDGN5lgk8x/O8wIu8wkQmMZlXmcJUpjODOcxlPotY
+zBu8yRKWsYJ3WM0a1rKODbzPRjbxEVv4hE/5nO3s4Au+5Ct28w3f8QN7+ZH9HOAgh/iVI/zGUf7ib0640HnFyZxCFrKSjZzkIi8F
+KERhilCcEpSmDGdyFhU4m3M4lwu4kIuoSjUu5hKqU4OaXEFtrqYOdanHjdxEQxrRmFtoSjNuozm305I7aUVr2tCeu+hAR+7jAR6k
+C115mEfoRi8epTd96Mfj9OcJBjCYJxnCUwxlJKMYzdOM5VnGMZ4JvMhLvMwrTOZVXuN1pjCdGcxkFvOYzwIWsog3WcJS3mYF77CS
+tazjPTbwAZvYzId8xCd8ylY+Yxs7+IKd7OJLdvMNe/iW79jLT+xjPwc5xK8c5Xf+4FjqvLrI/YqTOJlsZCcHOclDXvKRnwIUpgin
+UpRilKAkpTidMyhLOcpzFudwLhWpxHlcyEVUpgpVuYTqXMplXE4truBKrqI2dajLtVxHPW7kJurTgIY05hZupQlNac7t3EFLWtOG
+trSjPR25m3u4j0505hG60Z0e9KQPfRnAQAYxmKcYynBG8zRjeIaxjGcCz/E8L/AyE5nEZKYwlWlMZxZzmMtCFrGYN3iTt3ibZazg
+XVaxmjWsZT0beJ+NfMCHfMQWPuYTPmMbn7OdHXzJV3zNbr7je35gH/s5wM8c5FeO8BtHOcaf/MXfnFDZ+cfJZCErOclFbvKQnwIU
+ojDFOI3ilOB0zqAMZ1Kes6jA2VTiPM7nAi6kClWpxiVcxuXUoBZXUZuruYY6XEc9rucGbqQhN9OIxjSlGbfRnJbcSSta0472dKAj
+93E/D9CJznShKw/zCD3oyaP0ph+P058nGMRgnmQIIxjJKEbzDOMYzyQm8yqv8TrTmM4MZjKLucxjPgtYyBu8yXJW8A4reZc1rGUd
+77GejXzAJjbzIR/zCZ+yle3s4At2sovdfMMe9vIjP7GPgxziML/wG0f5g2P8zQlV3Nc4iSxkJRvZyU0e8pKP/BTiVIpSnBKUpBRl
+OJOylKM8Z1ORSlzAhVxEZapwMZdQnUupSS2u4Equ4hrqciM3UZ8GNOYWbuU2mnM7d9CK1rShLe3oQEfu5h7u5QE68SCdeYRu9OBR
+etOHvjxGfwYwkCE8xVCGMZxRjGYM4xjPBJ7jeV7iZV5hEq/xOlOYyjRmMovZzGEhi3mDpbzNMpbzLqtYzRrWs4H32chmPuQjtvAx
+n7GNz9nOTnbxJV/xNd/yHd/zAz+xj/0c4DC/8CtH+I1j/Mlf/J06r6o6rziZU8hCdnKQk3wUoCCFOJXTKE4pTucMSlOGcpTnLCpQ
+kUqcx/lcQGWqUJVqXMylXMbl1OBKrqI2V3Md13MD9WlAQxrRhKY04zZacietaEs72tOBe7iX+3mAh+hMF7ryMN3pQU8e5TEepz+D
+eJIhDGM4IxjJGJ5hLM8yjud4nhd4kYlM5lVeYyrTmM4MZjKHucxjPgtYzBu8yVKWs4J3WMlq1rCWdbzH+2zkAzaxmS18zCd8ylY+
+Zzs7+IKdfM1uvuF7fmAvP/ITB/iZgxziMEf4jaP8zh/8xd+cUM36jP+QhaxkIzt5yEdBClGYIpzKaRSnBCUpRWnKcCZlKUcFzuYc
+zqUi53MhF1GZalxCdS6lBrW4kqupQ12u5QZu5CbqczONaMwt3EozbqM5t9OCO2lFa9rQlg505G7u4X4eoBMP8hBdeZhH6EZ3evEo
+velDXx6nP08wgIEM4SmGMoyRjGI0TzOGZxnHeCbwHC/yMq8wkVd5jdeZwlRmMJNZzGYO81nAQhaxmCUs5S2W8Q4reZdVrOY91rOB
+99nEZj5kC5+ylc/Yxud8wU528SVf8Q17+Jbv+J4f+Yl97OcQh/mFXznC7/zBMf7kr9Q5ebFzkpM4mVPIRnZykJNc5CU/BShIEU6l
+KMU4jZKU4nTOoDRlKUd5zqICFanEeZzPRVSmClWpRnUu5TIupwZXcCVXUZurqcu1XEc9rucm6tOAhtzMrTShKc24nRbcQUvupA1t
+aUd77uJu7udBOtOVbnSnJ73oQ18e43EGMojBPMkwhjOCkTzNGJ5hLC/yChOZxKtMYSrTmM4MZjOXecxnMW/wJkt4m2UsZwWrWMsG
+3mcjH7CJLXzMJ3zKNj5nB1/xNbv5gb38yH5+5iCH+JWj/M6fnHiJc4hs5CQXechLAQpSmCIU4zSKU4KSlKYMZanAuZzH+VzAhVTj
+YqpzOTWoSS2u4GrqUI8buJGGNKIxt9CUZtxGc26nJa1oTXs60JH76UQXuvIw3ejF4/RnMEMZyWjGMo7xvMwrTOZVXmc6s5jNfBaw
+kEUsYSlv8S6reI9P2Mo2vmAXe9jLT+znIL9yYnXXNCdxMtnJQz7yU5iiFOMMylKesziHC6lMFapyKVdwJbWpw7VcRz1upD4NaEhj
+bqEJTWlOC9rQkXu4l/t4iG70oCe9GcRghjKc8TzHy0xkMlOYxhwW8SZv8TbLWM67rGI1a1jLRj7gQz5mGzv4iq/Zzbfs5QA/c5Bf
+OMJRjqWO66XuleQkF7kpQEGKcRrFKcHplOFMKnA2F3AhVajFNdShHjfSgJtpTBOa0orWtKcD93If99OZLnSlJ4/Sm8foR3+eZAQj
+Gc0zjOUFXmIyrzKdGbzBmyxhKct5lzWsZyOb2cpnbOcLdrGbPXzLD+zlRw6S5TLrH7KRnRzkJT9FKU4JynA2FbmIKlSnFjdRnwY0
+ojG3cCtNuI3mtOAOWtORe+nEI/ShLwMYzihGM4WpzGQWc5jLW7zNKtbwHht4ny18zbf8wD4O8xt/8TcnX27u5KAQp1Gc0zmDMpSj
+AhdQlWpcTA1qcw3XcgP1aUBDbqYJTWnGbbTgDlpyJ61oS3s6cB8P0ZPHGMhghjCcEYxiDGN5lud5gZeYyCRmMJM5zGUe81nMGyxh
+OStYwxfs5Gt2s4efOMghDnOE3/idP/iLvzmxhmNIHvJRkMIU4TRKUJJSlKYMNanFNdTlWq7nBm6mMc1oTgta0ZoOdKQTD/IQD9ON
+7vSiL/15goEMYSgjGcWzjGMCz/EiL/EyrzCR15jCVGYyi9nMYT4LWMhi3mM9m/mILWxlJ7v4kq/Yw7d8zz4OcIjD/MKvHOEYf/IX
+J9b0vcFJZCcXeSnKuVTkPM7nIipTjcu4nBpcRW2u5lrqcT31aUBL7qQN7bibe7iX++hMV3rQkz70ZTBPMpZXmcJc5jGfRSxjNWt5
+nx/ZzwF+5iBHOLGWa5EsFKM4Z1CaMpzJWVTgXM7nAi6iOjWoyTVczw3cyO205E5acTc96UVv+vE4IxjJeCawiCV8wqdsZRdf8itH
++Z0/yHqF+ybZKUBhinAmZSlHZapSm7rcRH0a0JDG3EoTmtKcjtxHJx6iC93pTV8eYwADGcRghjKM0TzNeKYxnbdZwSrWsp732cYO
+vuU7vuc3jnKMPznpSvMkBwUoTFFKU56zqMXVXMNttKYdnenKY/TjSYYzimd4kZeYxHwW8hbL2cRmtrKdHXzBLvbyB8dSY7nKOcMl
+VOda6tOARtxKE5rTmYd5mjHMZQFvsZkP2c8B/iJ3bd+DVOI8rqMezejAPfRnIJN5lfmsZDVf8TUnXu1aphSlqUktbqcFHbib++nO
+o4xnAgtZxCreYwNb+JStfM8hDnPGNc45ylOJltzPQwxgMM8zkRnMZj6L2cD7bOIjtrCNHVxcxz2FmlxBbRrRmFtoSWva0IGOPEAn
+HqYXfejHEwxlBCN5mgm8wIu8xCtM5nWmMJ0ZzGMJS3mLFaxkPZvZxpfs5jv28iM/sY9f+JWj/M4fHONPstV1jlOAIhSlGCUoRVWq
+U4e6tKQ9nelCTwYwmNGM4XleZhKTmcJUZjGbOcxlDWtZz0b2c5AjHOOka52LnEYJTqc05bmca6jDOCaxlZ18zQ/s5TAlrzMXLuUy
+atKE5txDN7rzDOOYwlwWsogtfMzPHCZ/PceLC6hML2bwKSde75znFKrThqG8zSpW8ymfsY1v2M/p/zFPSnIOF1KTypzPeVSkLmdy
+BkU5mzJUiDapetdTmypcxqVcwcURa0d+Kl4X+dWi3jVcGfVqxHaqzlWRd3nkXxL1Un3UinpXc1OifZ3Iv43buZWWsZ1Kt6Ejd8X2
+nbSgUcRbaBgxVXZ3bKfKbo59NaEpd0Rf6bJmNEj0ldpXD9rxIIMZwlMMZBAj6MuLTGMc/aNeqs6TDIt0Kg6I+EKkh0S/A6Pf1PbY
+6DfVdhIzWZYo7xexD72jXmp7VPTzRKLuU7GfwZFOje3ZRD9PRN6AiIOi3pPR39jIG5go7xflI2IuI6O/cdF2TJQNjXrp4zA8+ugb
+20Ojv2GxPZqneS5xbFJlj8c+BkRfA6LuE9HHsER/gyMOiTpjonxQlA1KHJdBMab0mIdnMv/BkR4Q8ZkYY3rOgxKf3+AY68AYw6jE
+/AfF3EdFWeqanUDPOOfqxvncKM7LFrF9b5ybDaNe0zi3U+WtaRz1boprvxLl49ouG+kzIl0mtitFOlk3tX0u5eLekcorTpEoKxV1
+y0ZZibj3/IejJ1oLsY8jkU7lZVWWnwL8ZfuXRL2DHGA/v0bZKeodEj9iGQtZzBusZh0ro/x95rE8ypdFXBJ1lkX6VZ5mCKMYzlCG
+8STjGMPrvMBoBjOQQdFmdNR/OtJPRvmwKB8WfT5CJ/rF/ibwIF3owAN0pkfU7R3bXelOr8h7gsejTs/I6xl9Pxj1H4zyVLuHorwb
+fSL/fu6lFS1pE7E1d9A+6qTG1II7aRplbbme6nx8gjUWj/AFF0dZKlagCgU5j73Kv+YXDvJ7xP38wZGIv0f6GL/xJ39F2d/kSJ0L
+HIq+UmPYwHpW8yFbYzyp7XWsYgVLo+66iJvZyPtR/hZLWM7bzGcBb0bbVJ1pzGMur0ebNxjPs9F2Oi8zM9pPi/qzmBLtUnmLo3x+
+lKf7TfU3J9pP4tVIp9rOjv5nRdsZUXd2xGnRXzpvUWKsE6N8TvQ1K/JnxL7nR/lr0WZmlM+K/CmJcS1NzC8Vp8a40v0tij4XJ/LS
+fafTqfEtjHoLIr00tmfEfqdH3ZmJ47c42mbc5+yoszQxn3kxlhlRf1aibvo4ptstTMxzVuxzTqTnJo73osS4pifGOTP6mpahzsxI
+z4n2ryXmMitxLOYl6s2M/NejbGaMYUli3uk4I+KCxLwXxvaSxLGbluhreiIuShzHKdFvus28xPn5RuJ4JdvPSBzXpRHT409+1vMT
+n3f6mC1M1E2d60/Th4d5jK4RB9KdbvSMOql7T396x3Y6v1eke0WbHtFHqv6gqJ9K9410KnaOmO6/C/3oFO27JfroHX33i5gqezwx
+ju5R1jPyUu2eiLzukd89+uoR232jfGD0+WiiTt/o/4nYV7pNt0RfPaNOv4jdMtTplRhLKj4Z6UeirEdiPL0SxzF1fAckjlOvRB+9
+Iu+xqP944pj0ibI+ifn0jPL0Z9AzMc/+0U/fxDHskdjPo4kx9opj0StxLLrHZ5g6b+7nXkbyAO24k7a0SKRbcw8PRp32tImYKu9I
+B+7KkO4Q5bfSlJbRZ7p9uxjXkKif2mezyG+TaN860qn8u6OP1hHbRL9to9/UPFrFdnqM7aL/exPj6hp102NpnWFOqbr3Rd3WGeac
+7q917Kt9bLePvLaJ/tom+u+QoTzZV6tEm3RslTgO6ePVOjHGdJvUcbsjylN5t8d2cv/tMsylbYa5tk/UvyvRV9vE59Eu0a5don2b
+DMc7+dm3yRDTfXXMZHzJ49866tyVaJfcd9vEsWuTyb6SY77rOGO5M/F5tI/9ZVavfSafSdvEXDOOL30d3BfXTOoe8lRck/0S12rG
+++OjiXtun7jO+yWu9/R13C/uA6l74HCeYWx8JwyPe9mQRP6EWHONj/S4RP3xkR4T22NjrM/H2uyF+L6ZGt9t8xPfa6n4Tqz75iS+
+z2Yn1nLpdde8xPfvzAx9TE/UWRTlyfVaen2SWjO+F2vR1Jp1TaxR10b+uljfvhfr1rVRb0Oi7vuxnt3GLr7lK3ZGTOV9yQ+xDt8V
+ZbtiffxtlO/KUP+bKPs8tr+KvO9j7f5brNkPRP7RxDo+XfZHIv6ZIf/EE/+b93es848l+k22OxrpY7F9UjwHpNrnIg95yUf+eO4o
+yqmRVyCeSYpTJFGvUNRN5RWO7VSb0yK/QCKeFvWyUpqzOYezODfSqViJiyJdMZ5/KiXKqkZexUSdClF2QcQLE+WVorxc5FemBldQ
+nwbUjbo1uYrakXcDteJ57ZrIS8VrE9upZ7Z6if6axnNf6nmvObcnnhM7chvtorx1lKXrt4m81DPjPVGvRcTbE/WaRb3UM+bdEbvE
+M2v6WbVrpHvHc3f6ubdblHWJuaefddPPzOk+Ho6yxxiQeMYfyYhID0k8p4+OZ/WnYntE5KXbjI44PNIjom36nUHqfcFL8b7gNaYy
+gynM5NlIT46yibwS7ebG+4jXI06J9PRoOzvR7+vRPlU2nwW8Ge87lkVcmUi/G9tLeYt3Ij/13mRFhnrvRN13E32sYUPEVJv32JR6
+/mcHn0R6O4f5NtJfsC3iV+yK9NZo81mU74iY2t7JHnZH+ku+5rtom4qH4p1Q+j3R4Xhv9EPkH4r3Rkcj/pwh/3BsH47tffGu6cfU
+e4ro90iU/c6x6Cv3f9xryBExtZ2XPOSL/JxRlo7p8oKRzp2IuaIsmU7F1LuubIn83NFf7ugnd9TNnthP9kRfOTOU5Y33bLkj5ot3
+d4UT9XNEfu5omy/RR44MY8wZfRbMpDxHojx3vOPLnZhP/sQ8CyX6TB+fHLHfHImx5Y+y7BmOV/44VrkjpueWKzH29LHKm2GOOTPM
+KT2f9PwKR/+5EvXSbfIl2uRPHOOcibkViLySieOUN5NzJ3+GMeZKjDFv4h1p+hhmT8wzT2Lf6WObqpM1MdacibxcieOfPXGckudx
+/kzmmyuRny9xXmXNMPY8iXGlz8G8iXEm51owcRxyZLgWCiX6yZ1Jfnqu+eJYJD/D1PHeEveN1L3q07j+98Y1/X3cb1L3kb9P/P+v
+jcNxL0mNJct//nsPSN2H/oh7QCrvz7gHpM6NHxP3ru2R/ir6/SnukT/GPWtLou7euLd+HmPckrh/7ojxfhT198Q9c3f0k7oHr4/7
+/oz4nlgU+1oR7703xLxXxr18LRuj3qq4h3+YuNfPirap9+NvR7/p75zXo/yl+H5bEGUj4vvnxfg+vCjeZ0+J77NpUf5a4vsslX45
+3lM3iXVFh8Qao06sWy6JdVZqLVee82PNcwZnxrrp/Fh7lY81UqXYTqVLxjrposivRpnIOzfWUefGmu3sxJot94n/fW+8Kd4db4r3
+03tivbw51p37Yo39eWKdnFpHb4+6P/HdCf99351O7451+rZoszvWyjuiztZ4b5Z6v7Ys1vNrYl2efu+8PspWRtn6WPOvif1vinar
+4zliZeL9d+q54d3IW5d41lgS71LfiX5Wx75WJfpOvYv/KNouT4xrTeLd+saYw8oY17vR16p4RtkY7+nXRr/r43huiDrrok163umx
+b455LYsxJuezLo5N+nnpnQx9rIrxpvK2xL5Tvw1kO/G/bYrG551+NhwV78J6xnuD52KcqXdKteOdUqqv1DmzK54l60d+6p1AIy6n
+TtRvGO8vWsZ7i1ReWUpRhFMpTknOpAzlKP/ff05/QnVqchlV//vPBVP/jcj/10chcpGbnOQhLwXIH2Wp/Oyp30sipupkS+TnTJTl
+SLQvGP2nxlc4kZeOqfyiEYtEukhiu1iibaFoUzjKCmXILxD7LZQYezrmi7J8Mc/0HHMnypL56TbpWCD6LZKh/3wZ+s+TYb8FE2NM
+xnR5es7FIhZOzCV/Yn/JcWQ23jyJ+eU9ztwzjjNvhuOS9zjzSZ8XWSPmTpwvyZjzf+RnVp7nOPVOiXSOTNqlt/Nk0sc/jSlPhjnm
+zfB5Z/xcsyfyCyY+/8IZ8gofJxbMcG4WPM55mR5L9gxlyXOowL/or2Am+y18nHaZjblg4vop+A99Hu/czqxOvkTdzK7XgvHZZGyT
+2bHK7FrOLObJ5NrInTiXkvexbBGT51qODHUyi5nVyxbXSDpmSWznTIw9V6L+8fo5XsySyX7+qU26Xo5M2p2c2M5s/zkzufdny3AM
+ch3nWGeP7Vz/8Dnl/of2+f7F/SkZj3c/zp7JNZKsm9m+M4v/5pzL/j/q/K/x5v8X88t+nPt4eqzpdK5/mFNmY/+neR0vP1fisz7e
+ePJkqJ88p453vv/TdZo873IkzvF/c+0cL/6baynjdZfZfSBjedZ/uc8s/yNmNo7jHbfs/4f7SY5/GTObT9bjlGV2j8x2nO/jLP+w
+TshynLXD/yrLLGbJZG2QLZO1QrZM1iV5EnXzHKcsTybnfrZEvayJfWTNZJ/J66RcrMnPjO/Jsol1fMmI5RKxZKJOOhaLWCpRJ93m
+LCqknjui/OzYLpUhlkzUOz1DvCr1t1kRL4lYPWJzbo7YKEPsEr9Ld4nfyZPxePmp35+HMix+ox8Wfz8wLH7XGxa/5Y2Ivzd5LcPf
+naTj2/HctzyTuCLxDL79/xBTv1H9nIiHIh6M9OH4m7J0nf3xvJ9M74/tffHs/mMinax7INH3z4k2BzL0n4qfxPPxluPET+K3tz0R
+3453BYsivTSxvTBD+cL4rfP5eKadkElM/376Ei9G/WS8L55zi8U5njfD/Tx9nzsl1ijJmNk98f9678v6P+7Bp2SIORJrqKyZjPN4
+67JkLB3XwQvxW+d3EavEb1Nz4r3buuPE1G8W/w+7WAPD
+"""
@@ -0,0 +1,55 @@
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+# Consistency tests of the binomial lattice: without dividends an American Call is never exercised early, so its price and Greeks must match the BSM values.
+# Run from this directory with: python -m unittest test_AmericanKernels
+
+import unittest
+import numpy as np
+import BSMKernels
+import AmericanKernels
+
+
+class AmericanCallTest(unittest.TestCase):
+
+   def setUp(self):
+      # Strikes within +/-20% of the spot, expirations from one week to two years, plus a one year ATM Call and a one week ITM Call
+      rng = np.random.default_rng(3)
+      n = 200
+      self.spotPrice = np.full(n, 100.0)
+      self.strikePrice = np.round(rng.uniform(80.0, 120.0, n), 1)
+      self.tau = rng.uniform(7.0, 730.0, n)/365.0
+      self.ir = rng.uniform(0.0, 0.06, n)
+      self.sigma = rng.uniform(0.1, 0.6, n)
+      self.strikePrice[:2] = [100.0, 90.0]
+      self.tau[:2] = [1.0, 7.0/365.0]
+      self.ir[:2] = 0.05
+      self.sigma[:2] = 0.15
+      self.lattice = AmericanKernels.americanLattice(self.spotPrice, self.strikePrice, True, self.tau, self.ir, self.sigma, steps = 200)
+      # Theta per year, consistently with the lattice
+      self.expected = BSMKernels.bsmGreeks(self.spotPrice, self.strikePrice, True, self.tau, self.ir, self.sigma, tradingDays = 1.0)
+
+   def test_price(self):
+      np.testing.assert_allclose(self.lattice["price"], BSMKernels.bsmPrice(self.spotPrice, self.strikePrice, True, self.tau, self.ir, self.sigma), rtol = 1e-6, atol = 1e-8)
+
+   def test_greeks(self):
+      np.testing.assert_allclose(self.lattice["Delta"], self.expected["Delta"], rtol = 0.0, atol = 2e-3, err_msg = "Delta")
+      np.testing.assert_allclose(self.lattice["Gamma"], self.expected["Gamma"], rtol = 0.02, atol = 1e-4, err_msg = "Gamma")
+      np.testing.assert_allclose(self.lattice["Theta"], self.expected["Theta"], rtol = 0.02, atol = 0.02, err_msg = "Theta")
+
+
+if __name__ == "__main__":
+   unittest.main()
@@ -0,0 +1,154 @@
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+# Parity tests of the kernel backends: the NumbaKernels functions must return the same results as the NumPy path of BSMKernels.
+# Without Numba the compiled kernels run as plain Python functions, so the parity is checked on every machine (slowly).
+# Run from this directory with: python -m unittest test_BSMKernels
+
+import unittest
+import numpy as np
+import BSMKernels
+import NumbaKernels
+
+
+# Synthetic chain: a mix of Calls and Puts, strikes within +/-50% of the spot, expirations from 0-DTE to two years, plus the edge cases
+def makeChain(n = 400, seed = 7):
+   rng = np.random.default_rng(seed)
+   spotPrice = np.full(n, 100.0)
+   strikePrice = np.round(rng.uniform(50.0, 150.0, n), 1)
+   isCall = rng.random(n) < 0.5
+   tau = rng.uniform(0.0, 2.0, n)**2
+   ir = rng.uniform(0.0, 0.06, n)
+   sigma = rng.uniform(0.05, 1.5, n)
+   # Edge cases: expired contracts and zero volatility
+   tau[:10] = 0.0
+   sigma[10:20] = 0.0
+   return spotPrice, strikePrice, isCall, tau, ir, sigma
+
+
+class KernelParityTest(unittest.TestCase):
+
+   def setUp(self):
+      # Make sure the reference values come from the NumPy path
+      self.backend = BSMKernels.kernelBackend
+      BSMKernels.useKernelBackend("numpy")
+      self.chain = makeChain()
+
+   def tearDown(self):
+      BSMKernels.useKernelBackend(self.backend)
+
+   def assertClose(self, actual, expected, field):
+      actual = np.asarray(actual)
+      expected = np.asarray(expected)
+      self.assertEqual(actual.shape, expected.shape, field)
+      # Same NaN/Inf pattern
+      np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected), err_msg = field)
+      np.testing.assert_array_equal(np.isposinf(actual), np.isposinf(expected), err_msg = field)
+      np.testing.assert_array_equal(np.isneginf(actual), np.isneginf(expected), err_msg = field)
+      finite = np.isfinite(expected)
+      np.testing.assert_allclose(actual[finite], expected[finite], rtol = 1e-9, atol = 1e-12, err_msg = field)
+
+   def test_price(self):
+      self.assertClose(NumbaKernels.bsmPrice(*self.chain), BSMKernels.bsmPrice(*self.chain), "price")
+
+   def test_price_broadcast(self):
+      spotPrice, strikePrice, isCall, tau, ir, sigma = self.chain
+      # Scenario grid: spot prices x contracts
+      spotPrices = np.linspace(80.0, 120.0, 5)[:, None]
+      self.assertClose(NumbaKernels.bsmPrice(spotPrices, strikePrice, isCall, tau, 0.03, sigma)
+                       , BSMKernels.bsmPrice(spotPrices, strikePrice, isCall, tau, 0.03, sigma)
+                       , "price"
+                       )
+      # Scalar inputs
+      self.assertClose(NumbaKernels.bsmPrice(100.0, 95.0, True, 0.25, 0.03, 0.2), BSMKernels.bsmPrice(100.0, 95.0, True, 0.25, 0.03, 0.2), "price")
+
+   def test_greeks(self):
+      midPrice = BSMKernels.bsmPrice(*self.chain)
+      expected = BSMKernels.bsmGreeks(*self.chain, midPrice = midPrice, tradingDays = 252.0)
+      # Without Numba the kernel runs on NumPy scalars, which warn about the NaN Vomma of the expired contracts (same value as the NumPy path)
+      with np.errstate(all = "ignore"):
+         actual = NumbaKernels.bsmGreeks(*self.chain, midPrice = midPrice, tradingDays = 252.0)
+      self.assertEqual(sorted(actual), sorted(expected))
+      for field in expected:
+         self.assertClose(actual[field], expected[field], field)
+
+   def test_implied_volatility(self):
+      spotPrice, strikePrice, isCall, tau, ir, sigma = self.chain
+      targetPrice = BSMKernels.bsmPrice(*self.chain)
+      # Add some prices outside of the no-arbitrage bounds
+      targetPrice[20:25] = -1.0
+      targetPrice[25:30] = np.nan
+      for x0 in [None, np.where(np.arange(sigma.size) % 3 == 0, np.nan, sigma * 1.1)]:
+         expected = BSMKernels.bsmImpliedVolatility(targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0 = x0)
+         # Without Numba the kernel runs on NumPy scalars, which warn about the Inf/NaN steps that the solver discards
+         with np.errstate(all = "ignore"):
+            actual = NumbaKernels.bsmImpliedVolatility(targetPrice, spotPrice, strikePrice, isCall, tau, ir, x0 = x0)
+         np.testing.assert_array_equal(actual[1], expected[1])
+         # Where the Vega is negligible the price is flat in the volatility and any IV in the flat region is a root: compare the prices instead
+         _, vega, _ = BSMKernels.bsmPriceVegaVomma(spotPrice, strikePrice, isCall, tau, ir, expected[0])
+         flat = vega < 1e-6
+         self.assertClose(actual[0][~flat], expected[0][~flat], "IV")
+         converged = flat & expected[1]
+         self.assertClose(BSMKernels.bsmPrice(spotPrice, strikePrice, isCall, tau, ir, actual[0])[converged], targetPrice[converged], "price")
+         # The number of iterations can only differ when a step lands within a rounding error from the tolerance
+         self.assertLessEqual(np.mean(actual[2] != expected[2]), 0.01)
+
+   def test_iv_initial_guess(self):
+      spotPrice, strikePrice, isCall, tau, ir, sigma = self.chain
+      valid = tau > 0
+      targetPrice = BSMKernels.bsmPrice(*self.chain)
+      expected = BSMKernels.bsmIVInitialGuess(targetPrice[valid], spotPrice[valid], strikePrice[valid], isCall[valid], tau[valid], ir[valid])
+      actual = [NumbaKernels.ivInitialGuess(*args)
+                for args in zip(targetPrice[valid], spotPrice[valid], strikePrice[valid], isCall[valid], tau[valid], ir[valid])]
+      self.assertClose(actual, expected, "x0")
+
+
+class KernelBackendTest(unittest.TestCase):
+
+   def setUp(self):
+      self.backend = BSMKernels.kernelBackend
+
+   def tearDown(self):
+      BSMKernels.useKernelBackend(self.backend)
+
+   def test_selection(self):
+      self.assertEqual(BSMKernels.useKernelBackend("numpy"), "numpy")
+      # Numba falls back to NumPy when it is not installed
+      self.assertEqual(BSMKernels.useKernelBackend("Numba"), "numba" if NumbaKernels.available else "numpy")
+      with self.assertRaises(ValueError):
+         BSMKernels.useKernelBackend("cuda")
+
+   @unittest.skipUnless(NumbaKernels.available, "Numba is not installed")
+   def test_dispatch(self):
+      chain = makeChain(n = 2000, seed = 11)
+      BSMKernels.useKernelBackend("numpy")
+      expected = BSMKernels.bsmGreeks(*chain)
+      BSMKernels.useKernelBackend("numba")
+      actual = BSMKernels.bsmGreeks(*chain)
+      for field in expected:
+         finite = np.isfinite(expected[field])
+         np.testing.assert_allclose(actual[field][finite], expected[field][finite], rtol = 1e-9, atol = 1e-12, err_msg = field)
+      # The scenario values go through the dispatched bsmPrice
+      strikePrice, isCall, sigma = chain[1][:4], chain[2][:4], chain[5][:4] + 0.1
+      tau = np.array([[0.1, 0.2, 0.3, 0.4], [0.05, 0.15, 0.25, 0.35]])
+      actual = BSMKernels.bsmScenarioValues(np.linspace(90, 110, 7), strikePrice, isCall, tau, 0.03, sigma, [1, -1, 2, -2], volShifts = [0.0, 0.05])
+      BSMKernels.useKernelBackend("numpy")
+      expected = BSMKernels.bsmScenarioValues(np.linspace(90, 110, 7), strikePrice, isCall, tau, 0.03, sigma, [1, -1, 2, -2], volShifts = [0.0, 0.05])
+      np.testing.assert_allclose(actual, expected, rtol = 1e-9, atol = 1e-12)
+
+
+if __name__ == "__main__":
+   unittest.main()
@@ -0,0 +1,120 @@
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+# Tests of the BSM class on a synthetic option chain. They need the QuantConnect AlgorithmImports module and are skipped without it.
+# Run from this directory with: python -m unittest test_BSMLibrary
+
+import unittest
+import numpy as np
+from datetime import datetime, timedelta
+import BSMKernels
+
+try:
+   from AlgorithmImports import OptionRight
+   from BSMLibrary import BSM
+   available = True
+except ImportError:
+   available = False
+
+
+class Timer:
+   def start(self, methodName = None):
+      pass
+
+   def stop(self, methodName = None):
+      pass
+
+
+class Security:
+   def __init__(self, price = 0.0, bidPrice = 0.0, askPrice = 0.0):
+      self.Price = price
+      self.BidPrice = bidPrice
+      self.AskPrice = askPrice
+
+
+class Contract:
+   def __init__(self, symbol, strike, right, expiry, bidPrice, askPrice):
+      self.Symbol = symbol
+      self.Strike = strike
+      self.Right = right
+      self.Expiry = expiry
+      self.BidPrice = bidPrice
+      self.AskPrice = askPrice
+      self.UnderlyingSymbol = "SPX"
+      self.UnderlyingLastPrice = None
+
+
+# Minimal algorithm context: the attributes and methods used by the BSM class
+class Context:
+   def __init__(self, time, spotPrice, **parameters):
+      self.Time = time
+      self.logLevel = 0
+      self.riskFreeRate = 0.01
+      self.executionTimer = Timer()
+      self.Securities = {"SPX": Security(price = spotPrice)}
+      for key, value in parameters.items():
+         setattr(self, key, value)
+
+   def GetLastKnownPrice(self, security):
+      return security
+
+   def Log(self, message):
+      pass
+
+
+@unittest.skipUnless(available, "AlgorithmImports is not available")
+class ScenarioValuesTest(unittest.TestCase):
+
+   # 45-DTE SPX chain priced with a continuous dividend yield: the spot price and the rate of the parity forward differ from the quoted spot and the FRED rate
+   def makeChain(self, context, bsm, spotPrice = 4400.0, rate = 0.03, dividendYield = 0.015, vol = 0.18):
+      expiry = context.Time.replace(hour = 0, minute = 0) + timedelta(days = 45)
+      contracts = []
+      for strike in np.arange(3900.0, 4905.0, 25.0):
+         for right in [OptionRight.Call, OptionRight.Put]:
+            contract = Contract(f"SPX {right} {strike}", float(strike), right, expiry, 0.0, 0.0)
+            tau = bsm.optionTau(contract)
+            price = float(BSMKernels.bsmPrice(spotPrice*np.exp(-dividendYield*tau), strike, right == OptionRight.Call, tau, rate, vol + 0.1*abs(np.log(strike/spotPrice))))
+            contract.BidPrice = round(price - 0.05, 2)
+            contract.AskPrice = round(price + 0.05, 2)
+            context.Securities[contract.Symbol] = Security(bidPrice = contract.BidPrice, askPrice = contract.AskPrice)
+            contracts.append(contract)
+      return contracts
+
+   def test_zero_shock_with_parity_forward(self):
+      context = Context(datetime(2021, 6, 1, 10, 0), 4400.0, useParityForward = True)
+      bsm = BSM(context)
+      contracts = self.makeChain(context, bsm)
+      bsm.fitParityForwards(contracts)
+      self.assertIsNotNone(bsm.getParityForward(contracts[0].Expiry))
+      bsm.setGreeks(contracts)
+      # Short 4300 Put, Iron Condor and a single long Call
+      legs = {(contract.Strike, contract.Right): contract for contract in contracts}
+      positions = [[(4300.0, OptionRight.Put, -1)]
+                   , [(4200.0, OptionRight.Put, 1), (4300.0, OptionRight.Put, -1), (4500.0, OptionRight.Call, -1), (4600.0, OptionRight.Call, 1)]
+                   , [(4700.0, OptionRight.Call, 2)]
+                   ]
+      for position in positions:
+         positionContracts = [legs[(strike, right)] for strike, right, _ in position]
+         sides = [side for _, _, side in position]
+         midPrices = [0.5*(contract.BidPrice + contract.AskPrice) for contract in positionContracts]
+         values = bsm.computeScenarioValues(positionContracts, sides, [4400.0, 4400.0*0.9], volShifts = [0.0, 0.05])
+         self.assertEqual(values.shape, (2, 1, 2))
+         # The zero-shock, zero-vol-shift value reproduces the mid-prices
+         self.assertAlmostEqual(float(values[0, 0, 0]), float(np.dot(sides, midPrices)), places = 4)
+
+
+if __name__ == "__main__":
+   unittest.main()
@@ -0,0 +1,125 @@
+########################################################################################
+#                                                                                      #
+# Licensed under the Apache License, Version 2.0 (the "License");                      #
+# you may not use this file except in compliance with the License.                     #
+# You may obtain a copy of the License at http://www.apache.org/licenses/LICENSE-2.0   #
+#                                                                                      #
+# Unless required by applicable law or agreed to in writing, software                  #
+# distributed under the License is distributed on an "AS IS" BASIS,                    #
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.             #
+# See the License for the specific language governing permissions and                  #
+# limitations under the License.                                                       #
+#                                                                                      #
+# Copyright [2021] [Rocco Claudio Cannizzaro]                                          #
+#                                                                                      #
+########################################################################################
+
+# Tests of the columnar position book: the book must behave like the dictionary of records it replaces.
+# PositionBook needs the QuantConnect AlgorithmImports module: the tests are skipped without it.
+# Run from this directory with: python -m unittest test_PositionBook
+
+import unittest
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+try:
+   from PositionBook import PositionBook, LegStatsLayout
+   available = True
+except ImportError:
+   available = False
+
+
+# Records with a mix of numeric, integer, string, date, flag and missing values (and a field that only some of the records have)
+def makeRecord(n):
+   record = {"orderId": n
+             , "orderTag": f"IC-{n}"
+             , "expiry": datetime(2021, 1, 15) + timedelta(days = 7*n)
+             , "openPremium": 1.25*n
+             , "orderQuantity": n + 1
+             , "filled": n % 2 == 0
+             , "closeDttm": None
+             }
+   if n % 3 == 0:
+      record["targetProfit"] = 0.5*n
+   return record
+
+
+@unittest.skipUnless(available, "AlgorithmImports is not available")
+class PositionBookTest(unittest.TestCase):
+
+   def assertSameFrame(self, book, records):
+      expected = pd.DataFrame.from_dict(records, orient = "index")
+      pd.testing.assert_frame_equal(book.toDataFrame(), expected)
+
+   def test_round_trip(self):
+      # Small capacity and block width: adding the records grows the rows and the numeric block
+      book = PositionBook(capacity = 2, blockWidth = 2)
+      records = {}
+      for n in range(20):
+         records[n] = makeRecord(n)
+         book.add(n, makeRecord(n))
+      self.assertSameFrame(book, records)
+      # Update the existing fields and add new ones through the views
+      for n in range(0, 20, 4):
+         for name, value in [("openPremium", -0.5*n), ("closeDttm", datetime(2021, 3, 1)), ("closePremium", 2.0*n), ("closeReason", "Profit target")]:
+            book[n][name] = value
+            records[n][name] = value
+      self.assertSameFrame(book, records)
+      # The views read back the stored values
+      self.assertEqual(book[4].asDict(), records[4])
+      # Remove some positions
+      for n in [1, 7]:
+         self.assertEqual(book.pop(n), records.pop(n))
+      self.assertSameFrame(book, records)
+
+   def test_numeric_fields(self):
+      book = PositionBook()
+      book.add(1, {"premium": 1.5, "tag": "a"})
+      slot = book.slots[book.fieldIds["premium"]]
+      # None is stored as NaN, integers as floats
+      book[1]["premium"] = None
+      self.assertTrue(np.isnan(book[1]["premium"]))
+      book[1]["premium"] = 3
+      self.assertEqual(book[1]["premium"], 3.0)
+      # Non numeric values are rejected: the field keeps its slot in the numeric block
+      for value in ["x", True, datetime(2021, 1, 4), 2**60]:
+         with self.assertRaises(TypeError):
+            book[1]["premium"] = value
+      with self.assertRaises(TypeError):
+         book.add(2, {"premium": "x", "tag": "b"})
+      self.assertEqual(book.slots[book.fieldIds["premium"]], slot)
+      self.assertEqual(book[1]["premium"], 3.0)
+
+   def test_leg_stats_layout(self):
+      book = PositionBook(capacity = 2, blockWidth = 2)
+      legs = ["shortPut", "longPut"]
+      vars = ["Delta", "PnL"]
+      record = {"statsUpdateCount": 0}
+      for leg in legs:
+         record[f"IC.{leg}.openFillPrice"] = None
+         for var in vars:
+            for stat in ["Min", "Max", "Close", "EMA(10)", "Avg"]:
+               record[f"IC.{leg}.{var}.{stat}"] = 0.0
+      book.add(1, dict(record))
+      layout = LegStatsLayout(book, "IC", legs, vars, 10)
+      # Grow the book after the layout has been resolved
+      for n in range(2, 10):
+         book.add(n, dict(record))
+      row = book.rows[1]
+      layout.update(book, row, [0, 1], np.array([[0.2, 1.0], [-0.1, 2.0]]), np.array([True, True]), 0.9)
+      layout.update(book, row, [0, 1], np.array([[0.4, 3.0], [-0.3, 4.0]]), np.array([True, True]), 0.9)
+      position = book[1]
+      self.assertEqual(position["statsUpdateCount"], 4.0)
+      self.assertEqual(position["IC.longPut.Delta.Min"], -0.3)
+      self.assertEqual(position["IC.shortPut.Delta.Max"], 0.4)
+      self.assertEqual(position["IC.longPut.PnL.Close"], 4.0)
+      # Writing None to a stats field does not move it out of the block: the next update is still visible
+      position["IC.longPut.PnL.Close"] = None
+      layout.update(book, row, [1], np.array([[-0.2, 5.0]]), np.array([True, True]), 0.9)
+      self.assertEqual(position["IC.longPut.PnL.Close"], 5.0)
+      self.assertEqual(book.toDataFrame().loc[1, "IC.longPut.PnL.Close"], 5.0)
+
+
+if __name__ == "__main__":
+   unittest.main()
@@ -23,6 +23,9 @@ import pandas as pd
 import time as timer
 from System.Drawing import Color
 from Strategies import *
+from ChainIndex import *
+from ExpiryCalendar import *
+from PositionBook import *
 from Logger import *
 
 from ItalianOptiosBacktesterHelper.Library.Strategies import PutSpreadStrategy
@@ -104,11 +107,16 @@ class StrategyBacktest(QCAlgorithm):
       # - Theta: the profit target is calculated based on the theta value of the position evaluated at self.thetaProfitDays from the time of entering the trade
       # - TReg: the profit target is calculated as a percentage of the TReg (MaxLoss + openPremium)
       # - Margin: the profit target is calculted as a percentage of the margin requirement (calculated based on self.portfolioMarginStress percentage upside/downside movement of the underlying)
+      # - Stress: the profit target is calculated as a percentage of the worst case P&L over the stress grid (see stressGridSpotSteps and stressGridVolShifts)
       self.profitTargetMethod = "Premium"
       # Number of days into the future at which the theta of the position is calculated. Used if profitTargetMethod = "Theta"
       self.thetaProfitDays = None
       # Upside/Downside stress applied to the underlying to calculate the portfolio margin requirement of the position
       self.portfolioMarginStress = 0.12
+      # Stress grid used to estimate the worst case margin requirement of the position: number of evenly spaced moves of the underlying within
+      # +/- portfolioMarginStress and absolute shifts applied to the IV of all the legs
+      self.stressGridSpotSteps = 9
+      self.stressGridVolShifts = [-0.05, 0.05, 0.1]
 
       
       # Stop Loss Multiplier, expressed as a function of the profit target (rather than the credit received)
@@ -160,6 +168,7 @@ class StrategyBacktest(QCAlgorithm):
       # Controls whether to include details on each leg (open/close fill price and descriptive statistics about mid-price, Greeks, and IV)
       self.includeLegDetails = False
       # Specify which Greeks should be included in the trade log (Set an empty list if you don't want any of the greeks)
+      # The higher order Greeks (Vanna, Charm, Speed, Zomma, Color, Veta) can also be included
       self.greeksIncluded = ["Delta", "Gamma", "Vega", "Theta", "Rho", "Vomma", "Elasticity"]
       # self.greeksIncluded = []
 
@@ -368,11 +377,13 @@ class StrategyBacktest(QCAlgorithm):
       # Number of current working orders to open
       self.currentWorkingOrdersToOpen = 0
       
-      # Initialize the dictionary to keep track of all positions
-      self.allPositions = {}
+      # Initialize the book to keep track of all positions (columnar storage, one record per position)
+      self.allPositions = PositionBook()
       
-      # Dictionary to keep track of all the available expiration dates at any given date
-      self.expiryList = {}
+      # Sorted calendar of the available expiration dates (maintained incrementally, past dates are evicted once a day)
+      self.expiryCalendar = ExpiryCalendar()
+      # Date of the last log of the expiration dates
+      self.lastExpiryLogDt = None
 
       # Dictionary to keep track of all leg details across time
       self.positionTracking = {}
@@ -421,6 +432,9 @@ class StrategyBacktest(QCAlgorithm):
    def OnSecuritiesChanged(self, changes):
       for security in changes.AddedSecurities:
          self.securityInitializer(security)
+         # Register the expiration date of the new option contracts
+         if security.Type in [SecurityType.Option, SecurityType.IndexOption]:
+            self.expiryCalendar.add(security.Symbol.ID.Date)
       
 
    # Called every time a security (Option or Equity/Index) is initialized
@@ -581,33 +595,26 @@ class StrategyBacktest(QCAlgorithm):
          self.logger.debug(" -> No chains inside currentSlice!")
          return
 
-      # The list of expiry dates will change once a day (at most). See if we have already processed this list for the current date
-      if self.Time.date() in self.expiryList:
-         # Get the expiryList from the dictionary
-         expiryList = self.expiryList.get(self.Time.date())
-      else:
-         # Start the timer
-         self.executionTimer.start(methodName = "runStrategies -> getExpiryList")
-      
-         # Set the DTE range (make sure values are not negative)
-         minDte = max(0, self.dte - self.dteWindow)
-         maxDte = max(0, self.dte)
-         # Get the list of expiry dates, sorted in reverse order
-         expiryList = sorted(set([contract.Expiry for contract in chain 
-                                    if minDte <= (contract.Expiry.date() - self.Time.date()).days <= maxDte
-                                  ]
-                                 )
-                             , reverse = True
-                             )
-         # Add the list to the dictionary
-         self.expiryList[self.Time.date()] = expiryList
-         # Log the list of expiration dates found in the chain
+      # Build the snapshot of the chain (contracts indexed by expiry, type and strike, plus the market state of the bar) once for all the strategies
+      chain = ChainSnapshot(self, chain)
+
+      # Start the timer
+      self.executionTimer.start(methodName = "runStrategies -> getExpiryList")
+
+      # Set the DTE range (make sure values are not negative)
+      minDte = max(0, self.dte - self.dteWindow)
+      maxDte = max(0, self.dte)
+      # Get the list of expiry dates, sorted in reverse order (binary search on the expiry calendar)
+      expiryList = chain.getExpiryList(minDte, maxDte)
+      # Log the list of expiration dates found in the chain (once a day)
+      if self.Time.date() != self.lastExpiryLogDt:
+         self.lastExpiryLogDt = self.Time.date()
          self.logger.debug(f"Expiration dates in the chain: {len(expiryList)}")
          for expiry in expiryList:
             self.logger.debug(f" -> {expiry}")
-         
-         # Start the timer
-         self.executionTimer.stop(methodName = "runStrategies -> getExpiryList")
+
+      # Stop the timer
+      self.executionTimer.stop(methodName = "runStrategies -> getExpiryList")
 
       # Exit if we haven't found any Expiration cycles to process
       if not expiryList:
@@ -669,14 +676,20 @@ class StrategyBacktest(QCAlgorithm):
 
    def OnEndOfAlgorithm(self):
    
-      # Convert the dictionary into a Pandas Data Frame
-      dfAllPositions = pd.DataFrame.from_dict(self.allPositions, orient = "index")
+      # Convert the position book into a Pandas Data Frame
+      dfAllPositions = self.allPositions.toDataFrame()
    
       self.Log("")
       self.Log("---------------------------------")
       self.Log("     Execution  Statistics       ")
       self.Log("---------------------------------")
       self.executionTimer.showStats()
+      # Show the number of iterations needed to compute the IV
+      for strategy in self.strategies:
+         strategy.bsm.showIVStats()
+      # Show the Greeks cache stats (the cache is shared by all the strategies)
+      if self.strategies:
+         self.strategies[0].bsm.showGreeksCacheStats()
       self.Log("")
       self.Log("")
    
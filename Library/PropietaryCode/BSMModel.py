@@ -1,5 +1,11 @@
-import scipy.stats as sp
+import math
 import numpy as np
+from scipy.special import ndtr
+
+# Normal CDF/PDF evaluated through math.erfc/math.exp (scalars) or the ndtr/exp ufuncs (arrays) instead of scipy.stats.norm,
+# which adds a lot of per-call overhead. Same formulas as NormKernels in the backtester library (not importable from this project)
+INV_SQRT_2 = 1.0 / math.sqrt(2.0)
+INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
 
 class BsmModel:
     def __init__(self, option_type, price, strike, interest_rate, expiry, volatility, dividend_yield=0):
@@ -14,11 +20,15 @@ class BsmModel:
 
     def n(self, d):
         # cumulative probability distribution function of standard normal distribution
-        return sp.norm.cdf(d)
+        if isinstance(d, float):
+            return 0.5 * math.erfc(-d * INV_SQRT_2)
+        return ndtr(d)
 
     def dn(self, d):
         # the first order derivative of n(d)
-        return sp.norm.pdf(d)
+        if isinstance(d, float):
+            return math.exp(-0.5 * d * d) * INV_SQRT_2PI
+        return np.exp(-0.5 * np.square(d)) * INV_SQRT_2PI
 
     def d1(self):
         return (np.log(self.s / self.k) + (self.r - self.q + self.sigma ** 2 * 0.5) * self.T) / (
@@ -0,0 +1,100 @@
+# Import necessary packages
+import os
+import sys
+import timeit  # For timing the pricers
+import argparse  # For parsing command-line arguments
+import numpy as np
+
+# Make the backtester library importable
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, "..", "ItalianOptiosBacktesterHelper", "Library")))
+
+import BSMKernels  # noqa: E402
+import AmericanKernels  # noqa: E402
+
+
+# Define main function
+def main():
+    # Parse command-line arguments
+    args = parse_arguments()
+
+    # Synthetic equity option chain: strikes within +/-30% of the spot, a mix of Puts and Calls and expirations up to one year
+    rng = np.random.default_rng(42)
+    n = args.contracts
+    spot = np.full(n, args.spot)
+    strikes = np.round(args.spot * rng.uniform(0.7, 1.3, n))
+    is_call = rng.random(n) < 0.5
+    tau = rng.uniform(5.0, 365.0, n) / 365.0
+    sigma = rng.uniform(0.15, 0.6, n)
+    ir = args.rate
+    q = args.dividend_yield
+
+    # Reference prices: American lattice with a large number of steps
+    reference = AmericanKernels.americanPrice(spot, strikes, is_call, tau, ir, sigma, steps=args.reference_steps, dividendYield=q)
+    european = BSMKernels.bsmPrice(spot * np.exp(-q * tau), strikes, is_call, tau, ir, sigma)
+
+    print(f"Pricing {n} contracts (contracts/sec, max and RMS absolute error against a {args.reference_steps}-step lattice)")
+    report("European (BSM)", lambda: BSMKernels.bsmPrice(spot * np.exp(-q * tau), strikes, is_call, tau, ir, sigma), european - reference, n, args.repeat)
+    for steps in args.steps:
+        prices = AmericanKernels.americanPrice(spot, strikes, is_call, tau, ir, sigma, steps=steps, dividendYield=q)
+        report(f"American ({steps} steps)",
+               lambda: AmericanKernels.americanPrice(spot, strikes, is_call, tau, ir, sigma, steps=steps, dividendYield=q),
+               prices - reference, n, args.repeat)
+
+    # Greeks: Delta, Gamma and Theta (per year) read from the lattice, against the reference lattice
+    greeks = ["Delta", "Gamma", "Theta"]
+    reference_greeks = AmericanKernels.americanLattice(spot, strikes, is_call, tau, ir, sigma, steps=args.reference_steps, dividendYield=q)
+    print(f"\nGreeks of {n} contracts (max and RMS absolute error against a {args.reference_steps}-step lattice)")
+    for steps in args.steps:
+        lattice = AmericanKernels.americanLattice(spot, strikes, is_call, tau, ir, sigma, steps=steps, dividendYield=q)
+        errors = "   ".join(f"{greek} max {np.max(np.abs(lattice[greek] - reference_greeks[greek])):.2e} rms {rms(lattice[greek] - reference_greeks[greek]):.2e}"
+                           for greek in greeks)
+        print(f"  American ({steps} steps)".ljust(28) + errors)
+    # Without dividends the American Calls are never exercised early: their Greeks must match the BSM Greeks
+    calls = np.flatnonzero(is_call)
+    bsm_greeks = BSMKernels.bsmGreeks(spot[calls], strikes[calls], True, tau[calls], ir, sigma[calls], tradingDays=1.0)
+    print(f"\nGreeks of {calls.size} Calls without dividends (max and RMS absolute error against the BSM Greeks)")
+    for steps in args.steps:
+        lattice = AmericanKernels.americanLattice(spot[calls], strikes[calls], True, tau[calls], ir, sigma[calls], steps=steps)
+        errors = "   ".join(f"{greek} max {np.max(np.abs(lattice[greek] - bsm_greeks[greek])):.2e} rms {rms(lattice[greek] - bsm_greeks[greek]):.2e}"
+                           for greek in greeks)
+        print(f"  American ({steps} steps)".ljust(28) + errors)
+
+    # IV inversion: recover the volatility from the American prices
+    print(f"\nImplied Volatility of {n} contracts (contracts/sec, max and RMS absolute IV error on the converged contracts)")
+    for steps in args.steps:
+        prices = AmericanKernels.americanPrice(spot, strikes, is_call, tau, ir, sigma, steps=steps, dividendYield=q)
+        iv, converged, iterations = AmericanKernels.americanImpliedVolatility(prices, spot, strikes, is_call, tau, ir, steps=steps, dividendYield=q)
+        report(f"American ({steps} steps)",
+               lambda: AmericanKernels.americanImpliedVolatility(prices, spot, strikes, is_call, tau, ir, steps=steps, dividendYield=q),
+               (iv - sigma)[converged], n, args.repeat)
+        print(f"    converged: {np.mean(converged):.1%}, iterations per contract: {np.mean(iterations):.2f}")
+
+
+# Define function to parse command-line arguments
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark of the American option pricer against the European (BSM) pricing path")
+    parser.add_argument("--contracts", type=int, default=500, help="Number of contracts in the synthetic chain")
+    parser.add_argument("--spot", type=float, default=150.0, help="Price of the underlying")
+    parser.add_argument("--rate", type=float, default=0.04, help="Risk free rate")
+    parser.add_argument("--dividend-yield", type=float, default=0.01, help="Continuous dividend yield of the underlying")
+    parser.add_argument("--steps", type=int, nargs="+", default=[25, 50, 100, 200], help="Number of lattice steps to benchmark")
+    parser.add_argument("--reference-steps", type=int, default=2000, help="Number of lattice steps of the reference prices")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of repetitions (the best one is reported)")
+    return parser.parse_args()
+
+
+# Define function to time a callable and print the throughput along with the error statistics
+def report(label, func, errors, count, repeat):
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"  {label:<24} {count / best:>14,.0f}   max {np.max(np.abs(errors)):.2e}   rms {rms(errors):.2e}")
+
+
+# Define function to compute the root mean square of the errors
+def rms(errors):
+    return np.sqrt(np.mean(np.square(errors)))
+
+
+# Call the main function if the script is executed
+if __name__ == "__main__":
+    main()
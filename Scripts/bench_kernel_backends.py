@@ -0,0 +1,68 @@
+# Import necessary packages
+import os
+import sys
+import timeit  # For timing the kernels
+import argparse  # For parsing command-line arguments
+import numpy as np
+
+# Make the backtester library importable
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, "..", "ItalianOptiosBacktesterHelper", "Library")))
+
+import BSMKernels  # noqa: E402
+import NumbaKernels  # noqa: E402
+
+
+# Define main function
+def main():
+    # Parse command-line arguments
+    args = parse_arguments()
+
+    # Synthetic equity option chain: strikes within +/-30% of the spot, a mix of Puts and Calls and expirations up to one year
+    rng = np.random.default_rng(42)
+    n = args.contracts
+    spot = np.full(n, args.spot)
+    strikes = np.round(args.spot * rng.uniform(0.7, 1.3, n))
+    is_call = rng.random(n) < 0.5
+    tau = rng.uniform(1.0, 365.0, n) / 365.0
+    sigma = rng.uniform(0.1, 0.8, n)
+    ir = np.full(n, args.rate)
+    BSMKernels.useKernelBackend("numpy")
+    prices = BSMKernels.bsmPrice(spot, strikes, is_call, tau, ir, sigma)
+
+    backends = ["numpy"]
+    if NumbaKernels.available:
+        backends.append("numba")
+    else:
+        print("Numba is not installed: only the NumPy backend is benchmarked")
+
+    print(f"Throughput on {n} contracts (contracts/sec)")
+    print(f"  {'backend':<10} {'price':>14} {'greeks':>14} {'implied vol':>14}")
+    for backend in backends:
+        BSMKernels.useKernelBackend(backend)
+        # Warm-up (compiles the Numba kernels)
+        BSMKernels.bsmImpliedVolatility(prices[:10], spot[:10], strikes[:10], is_call[:10], tau[:10], ir[:10])
+        rates = [n / best_time(func, args.repeat) for func in [lambda: BSMKernels.bsmPrice(spot, strikes, is_call, tau, ir, sigma),
+                                                              lambda: BSMKernels.bsmGreeks(spot, strikes, is_call, tau, ir, sigma),
+                                                              lambda: BSMKernels.bsmImpliedVolatility(prices, spot, strikes, is_call, tau, ir)]]
+        print(f"  {backend:<10} {rates[0]:>14,.0f} {rates[1]:>14,.0f} {rates[2]:>14,.0f}")
+
+
+# Define function to parse command-line arguments
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark of the NumPy and Numba backends of the BSM kernels")
+    parser.add_argument("--contracts", type=int, default=100000, help="Number of contracts in the synthetic chain")
+    parser.add_argument("--spot", type=float, default=150.0, help="Price of the underlying")
+    parser.add_argument("--rate", type=float, default=0.04, help="Risk free rate")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of repetitions (the best one is reported)")
+    return parser.parse_args()
+
+
+# Define function to time a callable (best of several repetitions)
+def best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+# Call the main function if the script is executed
+if __name__ == "__main__":
+    main()
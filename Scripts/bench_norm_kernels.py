@@ -0,0 +1,83 @@
+# Import necessary packages
+import os
+import sys
+import timeit  # For timing the kernels
+import argparse  # For parsing command-line arguments
+import numpy as np
+from scipy.stats import norm
+
+# Make the backtester library importable
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(script_dir, "..", "ItalianOptiosBacktesterHelper", "Library")))
+
+import NormKernels  # noqa: E402
+import BSMKernels  # noqa: E402
+
+
+# Define main function
+def main():
+    # Parse command-line arguments
+    args = parse_arguments()
+
+    rng = np.random.default_rng(42)
+    scalars = rng.normal(0.0, 2.0, 1000).tolist()
+    array = rng.normal(0.0, 2.0, args.array_size)
+
+    print(f"Scalar calls (calls/sec, {len(scalars)} different arguments)")
+    report("scipy.stats.norm.cdf", lambda: [norm.cdf(x) for x in scalars], len(scalars), args.repeat)
+    report("scipy.stats.norm.pdf", lambda: [norm.pdf(x) for x in scalars], len(scalars), args.repeat)
+    with_table(None)
+    report("NormKernels.normCdf", lambda: [NormKernels.normCdf(x) for x in scalars], len(scalars), args.repeat)
+    report("NormKernels.normPdf", lambda: [NormKernels.normPdf(x) for x in scalars], len(scalars), args.repeat)
+    with_table(args.accuracy)
+    report(f"NormKernels.normCdf (table {args.accuracy:g})", lambda: [NormKernels.normCdf(x) for x in scalars], len(scalars), args.repeat)
+    report(f"NormKernels.normPdf (table {args.accuracy:g})", lambda: [NormKernels.normPdf(x) for x in scalars], len(scalars), args.repeat)
+    with_table(None)
+
+    print(f"\nArray calls (values/sec, {args.array_size} values per call)")
+    report("scipy.stats.norm.cdf", lambda: norm.cdf(array), args.array_size, args.repeat)
+    report("scipy.stats.norm.pdf", lambda: norm.pdf(array), args.array_size, args.repeat)
+    report("NormKernels.normCdf", lambda: NormKernels.normCdf(array), args.array_size, args.repeat)
+    report("NormKernels.normPdf", lambda: NormKernels.normPdf(array), args.array_size, args.repeat)
+    with_table(args.accuracy)
+    report(f"NormKernels.normCdf (table {args.accuracy:g})", lambda: NormKernels.normCdf(array), args.array_size, args.repeat)
+    report(f"NormKernels.normPdf (table {args.accuracy:g})", lambda: NormKernels.normPdf(array), args.array_size, args.repeat)
+    with_table(None)
+
+    # Full chain Greeks (the batch pricing path)
+    n = args.array_size
+    spot = 4000.0
+    strikes = np.linspace(0.7 * spot, 1.3 * spot, n)
+    is_call = np.arange(n) % 2 == 0
+    tau = np.full(n, 30.0 / 365.0)
+    sigma = np.full(n, 0.2)
+    print(f"\nBSMKernels.bsmGreeks (contracts/sec, {n} contracts per call)")
+    report("exact", lambda: BSMKernels.bsmGreeks(spot, strikes, is_call, tau, 0.01, sigma), n, args.repeat)
+    with_table(args.accuracy)
+    report(f"table {args.accuracy:g}", lambda: BSMKernels.bsmGreeks(spot, strikes, is_call, tau, 0.01, sigma), n, args.repeat)
+    with_table(None)
+
+
+# Define function to parse command-line arguments
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark of the normal CDF/PDF kernels used by the BSM pricing code")
+    parser.add_argument("--array-size", type=int, default=10000, help="Number of values for the array benchmarks")
+    parser.add_argument("--accuracy", type=float, default=1e-7, help="Accuracy of the table-interpolated approximation")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of repetitions (the best one is reported)")
+    return parser.parse_args()
+
+
+# Define function to switch the table-interpolated approximation on (accuracy) or off (None)
+def with_table(accuracy):
+    NormKernels.useNormTable(accuracy)
+
+
+# Define function to time a callable and print the throughput
+def report(label, func, count, repeat):
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"  {label:<40} {count / best:>14,.0f}")
+
+
+# Call the main function if the script is executed
+if __name__ == "__main__":
+    main()
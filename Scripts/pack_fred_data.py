@@ -0,0 +1,109 @@
+# Import necessary packages
+import os
+import ast  # For reading the CSV string literals without importing the QuantConnect modules
+import zlib  # For compressing the packed data
+import base64  # For embedding the packed data into a Python module
+import logging  # For error handling and logging
+import argparse  # For parsing command-line arguments
+import numpy as np
+
+# Setup logging configuration
+logging.basicConfig(level=logging.INFO)
+
+# Source modules containing the FRED csv data (in chronological order)
+FRED_DATA_MODULES = ["fred_data_2000_2006.py", "fred_data_2007_2023.py"]
+
+# Generated module
+FRED_PACKED_MODULE = "fred_packed.py"
+
+# Scale factor applied to the rates before storing them as integers (the rates have 4 decimals)
+FRED_RATE_SCALE = 10000
+
+FRED_PACKED_TEMPLATE = '''#region imports
+from AlgorithmImports import *
+#endregion
+
+# Packed copy of the FRED data in fred_data_2000_2006.py and fred_data_2007_2023.py (loaded by fred.py)
+# Generated by Scripts/pack_fred_data.py: DO NOT EDIT. Run the script again whenever the csv data is updated.
+#  - fred_packed_source_crc32: CRC-32 checksum of the csv strings used to generate this file (used to detect stale data)
+#  - fred_packed_rows: number of rows
+#  - fred_packed_data: base64(zlib(int32 day numbers since 1970-01-01 + int32 rates * {scale}))
+
+fred_packed_source_crc32 = {source_crc32}
+
+fred_packed_rows = {rows}
+
+fred_packed_data = """
+{data}
+"""
+'''
+
+
+# Define main function
+def main():
+    # Parse command-line arguments
+    args = parse_arguments()
+    library_path = args.library_path
+
+    # Read the csv data from the source modules
+    csv_data = [read_fred_csv_data(os.path.join(library_path, module_name)) for module_name in FRED_DATA_MODULES]
+
+    # Parse the csv data
+    days, rates = parse_fred_csv_data("".join(csv_data))
+
+    # Generate the packed module
+    packed_path = os.path.join(library_path, FRED_PACKED_MODULE)
+    with open(packed_path, "w") as file:
+        file.write(format_packed_module(days, rates, fred_csv_crc32(csv_data)))
+    logging.info(f"Packed {len(days)} rows ({days[0]} -> {days[-1]}) into {packed_path}")
+
+
+# Define function to parse command-line arguments
+def parse_arguments():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    default_library_path = os.path.abspath(os.path.join(script_dir, "..", "ItalianOptiosBacktesterHelper", "Library"))
+    parser = argparse.ArgumentParser(description="Regenerate the packed FRED rate data used by fred.py")
+    parser.add_argument("library_path", type=str, nargs="?", default=default_library_path,
+                        help="Path to the folder containing fred.py and the FRED csv data")
+    return parser.parse_args()
+
+
+# Define function to extract the fred_csv_data string literal from a source module
+def read_fred_csv_data(module_path):
+    with open(module_path, "r") as file:
+        tree = ast.parse(file.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(target, "id", None) == "fred_csv_data" for target in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"fred_csv_data not found in {module_path}")
+
+
+# Define function to parse the csv rows (date,ir) into arrays of day numbers and rates
+def parse_fred_csv_data(csv_data):
+    rows = [line.split(",") for line in csv_data.splitlines() if line.strip()]
+    days = np.array([row[0] for row in rows], dtype="datetime64[D]")
+    rates = np.array([float(row[1]) for row in rows])
+    return days, rates
+
+
+# Define function to compute the checksum of the csv data (must match fred.unpackFredData)
+def fred_csv_crc32(csv_data):
+    return zlib.crc32("".join(csv_data).encode("utf-8"))
+
+
+# Define function to format the packed module
+def format_packed_module(days, rates, source_crc32):
+    scaled_rates = np.round(rates * FRED_RATE_SCALE)
+    # Make sure the rates can be restored exactly
+    if not np.array_equal(scaled_rates / FRED_RATE_SCALE, rates):
+        raise ValueError(f"The rates cannot be stored with a scale factor of {FRED_RATE_SCALE}")
+    raw = days.astype("<i4").tobytes() + scaled_rates.astype("<i4").tobytes()
+    data = base64.b64encode(zlib.compress(raw, 9)).decode("ascii")
+    # Split the data into lines of 100 characters
+    data = "\n".join(data[i:i + 100] for i in range(0, len(data), 100))
+    return FRED_PACKED_TEMPLATE.format(scale=FRED_RATE_SCALE, source_crc32=source_crc32, rows=len(days), data=data)
+
+
+# Execute main function if script is run directly
+if __name__ == "__main__":
+    main()